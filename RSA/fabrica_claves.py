@@ -0,0 +1,230 @@
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from pathlib import Path
+from Crypto.PublicKey import RSA
+
+# Fabrica de pares RSA: genera claves en un pool de procesos en segundo plano
+# y mantiene un stock de pares listos. obtener() entrega un par del stock de
+# inmediato; solo espera si el stock esta vacio (rafaga mas grande que el stock).
+#
+# Con directorio=None el stock vive en memoria. Con un directorio, cada par
+# listo se guarda como par_<id>_priv.pem / par_<id>_pub.pem y sobrevive entre
+# ejecuciones; al entregarlo se borran los archivos.
+
+
+def generar_par_pem(bits: int):
+    # Se ejecuta en el pool: retorna (privada PEM, publica PEM, segundos)
+    inicio = time.perf_counter()
+    key = RSA.generate(bits)
+    return key.export_key(), key.publickey().export_key(), time.perf_counter() - inicio
+
+
+class FabricaClaves:
+    def __init__(self, bits: int = 3072, stock: int = 4, procesos: int = None,
+                 directorio: str = None):
+        if stock < 1:
+            raise ValueError("El stock debe ser al menos 1")
+        self.bits = bits
+        self.stock = stock
+        self.directorio = Path(directorio) if directorio else None
+        self._listos = deque()        # pares en memoria o nombres de archivo en disco
+        self._en_curso = 0
+        self._cond = threading.Condition()
+        self._latencias = []          # segundos de generacion de cada par
+        self._esperas = []            # segundos que obtener() tuvo que esperar
+        self._entregas = 0
+        self._cerrada = False
+        self._error = None            # ultimo fallo de generacion, para quien espera
+        self._pool = ProcessPoolExecutor(max_workers=procesos or os.cpu_count() or 1)
+
+        if self.directorio:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            for ruta in sorted(self.directorio.glob("par_*_priv.pem")):
+                nombre = ruta.name[:-len("_priv.pem")]
+                if (self.directorio / f"{nombre}_pub.pem").exists():
+                    self._listos.append(nombre)
+
+        with self._cond:
+            self._reponer()
+
+    # --- generacion en segundo plano ---
+
+    def _reponer(self):
+        # Llamar con el lock tomado: encola trabajos hasta completar el stock
+        while not self._cerrada and len(self._listos) + self._en_curso < self.stock:
+            try:
+                futuro = self._pool.submit(generar_par_pem, self.bits)
+            except RuntimeError as error:
+                # Pool roto (BrokenProcessPool) o cerrado: el trabajo no se cuenta
+                # y quien espera en obtener() recibe el error
+                self._error = error
+                self._cond.notify_all()
+                return
+            # Se cuenta antes del callback: si el futuro ya termino, se ejecuta aqui mismo
+            self._en_curso += 1
+            futuro.add_done_callback(self._terminado)
+
+    def _terminado(self, futuro):
+        try:
+            privada, publica, segundos = futuro.result()
+            par = self._guardar(privada, publica) if self.directorio else (privada, publica)
+        except (Exception, CancelledError) as error:
+            # Si el pool se cerro, fallo la generacion o no se pudo guardar el
+            # par: se descuenta y se despierta a quien espera; el proximo
+            # obtener() vuelve a reponer el stock
+            with self._cond:
+                self._en_curso -= 1
+                self._error = error
+                self._cond.notify_all()
+            return
+
+        with self._cond:
+            self._en_curso -= 1
+            self._latencias.append(segundos)
+            self._listos.append(par)
+            self._cond.notify_all()
+
+    def _guardar(self, privada: bytes, publica: bytes) -> str:
+        nombre = f"par_{time.time_ns()}_{os.urandom(4).hex()}"
+        ruta_privada = self.directorio / f"{nombre}_priv.pem"
+        # La clave privada se crea solo legible por el usuario
+        fd = os.open(ruta_privada, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(privada)
+        (self.directorio / f"{nombre}_pub.pem").write_bytes(publica)
+        return nombre
+
+    def _cargar(self, nombre: str):
+        ruta_privada = self.directorio / f"{nombre}_priv.pem"
+        ruta_publica = self.directorio / f"{nombre}_pub.pem"
+        par = ruta_privada.read_bytes(), ruta_publica.read_bytes()
+        ruta_privada.unlink()
+        ruta_publica.unlink()
+        return par
+
+    # --- API ---
+
+    def obtener(self, timeout: float = None):
+        # Retorna (privada PEM, publica PEM) y repone el stock en segundo plano
+        inicio = time.perf_counter()
+        with self._cond:
+            if self._cerrada:
+                raise RuntimeError("La fabrica esta cerrada")
+            self._error = None
+            self._reponer()
+            # Se despierta tambien si la fabrica se cierra o si fallaron todas
+            # las generaciones en curso, para no esperar para siempre
+            if not self._cond.wait_for(
+                lambda: self._listos or self._cerrada or (self._error and self._en_curso == 0),
+                timeout=timeout,
+            ):
+                raise TimeoutError("No hubo un par de claves listo a tiempo")
+            if not self._listos:
+                if self._cerrada:
+                    raise RuntimeError("La fabrica se cerro mientras se esperaba un par")
+                error = self._error
+                raise RuntimeError(f"No se pudo generar un par de claves: {error}") from error
+            par = self._listos.popleft()
+            self._entregas += 1
+            self._esperas.append(time.perf_counter() - inicio)
+            self._reponer()
+
+        if self.directorio:
+            par = self._cargar(par)
+        return par
+
+    def _devolver(self, privada: bytes, publica: bytes):
+        # Reintegra al frente del stock un par entregado que no se pudo usar
+        par = self._guardar(privada, publica) if self.directorio else (privada, publica)
+        with self._cond:
+            self._listos.appendleft(par)
+            self._entregas -= 1
+            self._cond.notify_all()
+
+    def guardar_par(self, ruta_privada: str, ruta_publica: str, timeout: float = None):
+        # Si ruta_privada ya existe lanza FileExistsError y no consume un par del stock
+        if os.path.exists(ruta_privada):
+            raise FileExistsError(f"Ya existe la clave privada: {ruta_privada}")
+        privada, publica = self.obtener(timeout)
+        try:
+            # Igual que en _guardar: la clave privada se crea solo legible por el usuario
+            fd = os.open(ruta_privada, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except OSError:
+            # Otro proceso la creo entre la comprobacion y la escritura: el par vuelve al stock
+            self._devolver(privada, publica)
+            raise
+        with os.fdopen(fd, "wb") as f:
+            f.write(privada)
+        Path(ruta_publica).write_bytes(publica)
+
+    def metricas(self) -> dict:
+        with self._cond:
+            latencias = list(self._latencias)
+            esperas = list(self._esperas)
+            resultado = {
+                "bits": self.bits,
+                "stock_listo": len(self._listos),
+                "en_curso": self._en_curso,
+                "generados": len(latencias),
+                "entregados": self._entregas,
+            }
+
+        def resumen(valores):
+            if not valores:
+                return None
+            ordenados = sorted(valores)
+            return {
+                "media": statistics.fmean(ordenados),
+                "p50": ordenados[len(ordenados) // 2],
+                "p95": ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))],
+                "max": ordenados[-1],
+            }
+
+        resultado["latencia_generacion_s"] = resumen(latencias)
+        resultado["espera_entrega_s"] = resumen(esperas)
+        return resultado
+
+    def cerrar(self):
+        with self._cond:
+            self._cerrada = True
+            self._cond.notify_all()
+        # Los pares en memoria se descartan; los del directorio quedan para la proxima vez
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    with FabricaClaves(bits=2048, stock=3) as fabrica:
+        # Primera entrega: espera a que termine la generacion inicial
+        priv, pub = fabrica.obtener()
+        time.sleep(3)  # tiempo para reponer el stock en segundo plano
+
+        # Rafaga: los pares ya estan listos y se entregan al instante
+        rafaga = [fabrica.obtener() for _ in range(3)]
+        assert len({p for p, _ in rafaga + [(priv, pub)]}) == 4
+        key = RSA.import_key(rafaga[0][0])
+        assert key.publickey().export_key() == rafaga[0][1]
+        print(fabrica.metricas())
+
+    # Stock en disco: los pares sobreviven al cerrar la fabrica
+    with tempfile.TemporaryDirectory() as directorio:
+        with FabricaClaves(bits=2048, stock=2, directorio=directorio) as fabrica:
+            fabrica.obtener()
+            time.sleep(3)
+        pendientes = len(list(Path(directorio).glob("par_*_priv.pem")))
+        with FabricaClaves(bits=2048, stock=2, directorio=directorio) as fabrica:
+            assert fabrica.metricas()["stock_listo"] == pendientes
+            fabrica.guardar_par(os.path.join(directorio, "a_priv.pem"),
+                                os.path.join(directorio, "a_pub.pem"))
+        print(f"Pares listos en disco al reabrir: {pendientes}")
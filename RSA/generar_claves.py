@@ -1,6 +1,7 @@
 from Crypto.PublicKey import RSA
 
-def generar_par_claves(bits: int = 3072):
+def generar_par_claves(bits: int = 3072, ruta_publica: str = "public_key.pem",
+                       ruta_privada: str = "private_key.pem"):
     # genera el par
     key = RSA.generate(bits)
 
@@ -8,10 +9,10 @@ def generar_par_claves(bits: int = 3072):
     public_key = key.publickey().export_key()
     private_key = key.export_key()
 
-    with open("public_key.pem", "wb") as f:
+    with open(ruta_publica, "wb") as f:
         f.write(public_key)
 
-    with open("private_key.pem", "wb") as f:
+    with open(ruta_privada, "wb") as f:
         f.write(private_key)
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+from Crypto.PublicKey import RSA
+from Crypto.Cipher import PKCS1_OAEP
+
+# Llavero: cada PEM se parsea una sola vez. La clave ya importada, su
+# cifrador OAEP y su id (SHA-256 de la clave publica en DER, igual para el
+# PEM publico y el privado) se guardan en un cache LRU acotado, indexado por
+# la huella SHA-256 del PEM. PKCS1_OAEP no guarda estado entre llamadas, asi que el
+# mismo objeto sirve para cifrar/descifrar muchos mensajes.
+
+
+def huella(pem: bytes) -> str:
+    return sha256(pem).hexdigest()
+
+
+class LlaveroRSA:
+    def __init__(self, capacidad: int = 16):
+        if capacidad < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()  # huella -> (clave, cifrador OAEP, id de clave)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _entrada(self, pem: bytes):
+        id_clave = huella(pem)
+        with self._lock:
+            entrada = self._entradas.get(id_clave)
+            if entrada is not None:
+                self._entradas.move_to_end(id_clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+
+        # Parsear fuera del lock (decodificar una clave privada es lo costoso)
+        clave = RSA.import_key(pem)
+        id_clave_publica = sha256(clave.publickey().export_key(format="DER")).digest()
+        entrada = (clave, PKCS1_OAEP.new(clave), id_clave_publica)
+
+        with self._lock:
+            self._entradas[id_clave] = entrada
+            self._entradas.move_to_end(id_clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def clave(self, pem: bytes):
+        return self._entrada(pem)[0]
+
+    def oaep(self, pem: bytes):
+        return self._entrada(pem)[1]
+
+    def id_clave(self, pem: bytes) -> bytes:
+        return self._entrada(pem)[2]
+
+    def encrypt_many(self, mensajes, public_key_pem: bytes) -> list:
+        cipher = self.oaep(public_key_pem)
+        return [cipher.encrypt(mensaje) for mensaje in mensajes]
+
+    def decrypt_many(self, cifrados, private_key_pem: bytes) -> list:
+        cipher = self.oaep(private_key_pem)
+        return [cipher.decrypt(cifrado) for cifrado in cifrados]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {"entradas": len(self._entradas), "capacidad": self.capacidad,
+                    "aciertos": self.aciertos, "fallos": self.fallos}
+
+
+# Llavero compartido por rsa_OAEP, rsa_AES_GCM y rsa_AES_GCM_stream
+LLAVERO = LlaveroRSA()
+
+
+def encrypt_many(mensajes, public_key_pem: bytes) -> list:
+    return LLAVERO.encrypt_many(mensajes, public_key_pem)
+
+
+def decrypt_many(cifrados, private_key_pem: bytes) -> list:
+    return LLAVERO.decrypt_many(cifrados, private_key_pem)
+
+
+if __name__ == '__main__':
+    import os
+    import time
+    from generar_claves import generar_par_claves
+    from rsa_OAEP import descifrar_con_rsa
+    # Usar el modulo importado (no __main__) para compartir el llavero con rsa_OAEP
+    import llavero_rsa
+
+    generar_par_claves(2048)
+    with open("public_key.pem", "rb") as f: pub = f.read()
+    with open("private_key.pem", "rb") as f: priv = f.read()
+
+    claves_aes = [os.urandom(32) for _ in range(300)]
+    cifradas = llavero_rsa.encrypt_many(claves_aes, pub)
+    assert llavero_rsa.decrypt_many(cifradas, priv) == claves_aes
+
+    # Comparar contra parsear el PEM en cada mensaje (lo que hacia descifrar_con_rsa)
+    inicio = time.perf_counter()
+    for c in cifradas:
+        PKCS1_OAEP.new(RSA.import_key(priv)).decrypt(c)
+    sin_cache = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = [descifrar_con_rsa(c, priv) for c in cifradas]
+    con_cache = time.perf_counter() - inicio
+    assert resultado == claves_aes
+
+    print(f"Descifrar {len(cifradas)} claves AES sin cache: {sin_cache:.2f} s")
+    print(f"Descifrar {len(cifradas)} claves AES con llavero: {con_cache:.2f} s")
+    print(llavero_rsa.LLAVERO.estadisticas())
@@ -1,7 +1,7 @@
 import os
-from Crypto.PublicKey import RSA
-from Crypto.Cipher import AES, PKCS1_OAEP
+from Crypto.Cipher import AES
 from generar_claves import generar_par_claves
+from llavero_rsa import LLAVERO
 
 
 def encrypt_document(document: bytes, recipient_public_key_pem: bytes) -> bytes:
@@ -15,8 +15,7 @@ def encrypt_document(document: bytes, recipient_public_key_pem: bytes) -> bytes:
     nonce = aes_cipher.nonce
 
     # c) Cifrar la clave AES con la clave pública RSA usando OAEP
-    recipient_public_key = RSA.import_key(recipient_public_key_pem)
-    rsa_cipher = PKCS1_OAEP.new(recipient_public_key)
+    rsa_cipher = LLAVERO.oaep(recipient_public_key_pem)
     encrypted_aes_key = rsa_cipher.encrypt(aes_key)
 
     # Empaquetar todo en un solo bloque de bytes
@@ -53,8 +52,7 @@ def decrypt_document(pkg: bytes, recipient_private_key_pem: bytes) -> bytes:
     ciphertext = pkg[end + 32:]
 
     # 3) Descifrar la clave AES con la clave privada RSA
-    recipient_private_key = RSA.import_key(recipient_private_key_pem)
-    rsa_cipher = PKCS1_OAEP.new(recipient_private_key)
+    rsa_cipher = LLAVERO.oaep(recipient_private_key_pem)
     aes_key = rsa_cipher.decrypt(encrypted_aes_key)
 
     # 4) Descifrar el documento con AES-GCM
@@ -63,6 +61,81 @@ def decrypt_document(pkg: bytes, recipient_private_key_pem: bytes) -> bytes:
 
     return document
 
+# Sobre para varios destinatarios: el documento se cifra una sola vez con
+# AES-GCM y solo la clave AES se envuelve con RSA-OAEP para cada destinatario.
+#
+# Formato:
+# [4 bytes: MAGIC "RGM1"]
+# [2 bytes: numero de destinatarios N]
+# N veces: [32 bytes: id de clave] [2 bytes: longitud] [clave AES cifrada con OAEP]
+# [12 bytes nonce] [16 bytes tag] [ciphertext]
+#
+# El id de clave es el SHA-256 de la clave publica (DER). Toda la tabla va
+# como AAD, asi no se pueden agregar ni quitar destinatarios sin romper el tag.
+
+MULTI_MAGIC = b"RGM1"
+KEY_ID_SIZE = 32
+
+
+def encrypt_document_multi(document: bytes, recipient_public_key_pems) -> bytes:
+    aes_key = os.urandom(32)
+
+    # Tabla de destinatarios (sin repetir claves)
+    entries = {}
+    for pem in recipient_public_key_pems:
+        key_id = LLAVERO.id_clave(pem)
+        if key_id not in entries:
+            entries[key_id] = LLAVERO.oaep(pem).encrypt(aes_key)
+    if not entries:
+        raise ValueError("Se necesita al menos un destinatario")
+
+    table = [MULTI_MAGIC, len(entries).to_bytes(2, byteorder="big")]
+    for key_id, encrypted_aes_key in entries.items():
+        table += [key_id, len(encrypted_aes_key).to_bytes(2, byteorder="big"), encrypted_aes_key]
+    header = b"".join(table)
+
+    # Una sola pasada de AES-GCM sobre el documento
+    aes_cipher = AES.new(aes_key, AES.MODE_GCM, nonce=os.urandom(12))
+    aes_cipher.update(header)
+    ciphertext, tag = aes_cipher.encrypt_and_digest(document)
+
+    return header + aes_cipher.nonce + tag + ciphertext
+
+
+def read_recipient_table(pkg: bytes):
+    # Retorna ({id de clave: clave AES cifrada}, posicion donde termina la tabla)
+    if pkg[:4] != MULTI_MAGIC:
+        raise ValueError("El paquete no tiene el formato RGM1")
+    count = int.from_bytes(pkg[4:6], byteorder="big")
+    pos = 6
+    entries = {}
+    for _ in range(count):
+        key_id = pkg[pos:pos + KEY_ID_SIZE]
+        length = int.from_bytes(pkg[pos + KEY_ID_SIZE:pos + KEY_ID_SIZE + 2], byteorder="big")
+        pos += KEY_ID_SIZE + 2
+        entries[key_id] = pkg[pos:pos + length]
+        pos += length
+    if pos + 32 > len(pkg):
+        raise ValueError("Paquete incompleto")
+    return entries, pos
+
+
+def decrypt_document_multi(pkg: bytes, recipient_private_key_pem: bytes) -> bytes:
+    entries, end = read_recipient_table(pkg)
+
+    # Buscar la entrada propia por id: una sola operacion RSA
+    encrypted_aes_key = entries.get(LLAVERO.id_clave(recipient_private_key_pem))
+    if encrypted_aes_key is None:
+        raise ValueError("El paquete no tiene una entrada para esta clave")
+    aes_key = LLAVERO.oaep(recipient_private_key_pem).decrypt(encrypted_aes_key)
+
+    nonce = pkg[end:end + 12]
+    tag = pkg[end + 12:end + 28]
+    aes_cipher = AES.new(aes_key, AES.MODE_GCM, nonce=nonce)
+    aes_cipher.update(pkg[:end])
+    return aes_cipher.decrypt_and_verify(pkg[end + 28:], tag)
+
+
 if __name__ == '__main__':
     generar_par_claves(2048)
 
@@ -80,3 +153,17 @@ if __name__ == '__main__':
     pkg2 = encrypt_document(doc_grande, pub)
     assert decrypt_document(pkg2, priv) == doc_grande
     print("Archivo 1 MB: OK")
+
+    # Un documento para varios destinatarios: una sola pasada de AES
+    from Crypto.PublicKey import RSA
+    otras = [RSA.generate(2048) for _ in range(3)]
+    pubs = [pub] + [k.publickey().export_key() for k in otras]
+    pkg3 = encrypt_document_multi(doc_grande, pubs)
+    assert decrypt_document_multi(pkg3, priv) == doc_grande
+    assert decrypt_document_multi(pkg3, otras[2].export_key()) == doc_grande
+    try:
+        decrypt_document_multi(pkg3, RSA.generate(2048).export_key())
+        raise AssertionError("Se descifro sin ser destinatario")
+    except ValueError:
+        pass
+    print(f"Archivo 1 MB para {len(pubs)} destinatarios: OK")
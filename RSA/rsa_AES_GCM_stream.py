@@ -0,0 +1,161 @@
+import os
+import struct
+from Crypto.Cipher import AES
+from generar_claves import generar_par_claves
+from llavero_rsa import LLAVERO
+
+# Cifrado hibrido por segmentos: el documento se lee y se escribe por partes,
+# asi un archivo de varios GB se cifra con memoria constante.
+#
+# Formato del archivo:
+# [4 bytes: MAGIC "RGS1"]
+# [4 bytes: tamano de segmento]
+# [2 bytes: longitud de encrypted_aes_key]
+# [encrypted_aes_key]
+# [7 bytes: prefijo del nonce]
+# Luego cada segmento: [ciphertext (tamano de segmento, el ultimo puede ser menor)] [16 bytes tag]
+#
+# Nonce de cada segmento (12 bytes) = prefijo (7) + contador (4) + bandera de ultimo (1).
+# El header completo va como AAD en todos los segmentos.
+
+MAGIC = b"RGS1"
+SEGMENT_SIZE = 64 * 1024
+MAX_SEGMENT_SIZE = 16 * 1024 * 1024  # limita la memoria al leer un header ajeno
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+MAX_SEGMENTS = 2 ** 32
+
+
+def segment_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    # El contador evita reusar nonces; la bandera detecta archivos truncados
+    if counter >= MAX_SEGMENTS:
+        raise ValueError("Demasiados segmentos para un solo archivo")
+    return prefix + struct.pack(">IB", counter, 1 if last else 0)
+
+
+def encrypt_file(input_path: str, output_path: str, recipient_public_key_pem: bytes,
+                 segment_size: int = SEGMENT_SIZE):
+    if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+        raise ValueError("Tamano de segmento fuera de rango")
+
+    # 1. Clave AES-256 aleatoria, cifrada con RSA-OAEP
+    aes_key = os.urandom(32)
+    encrypted_aes_key = LLAVERO.oaep(recipient_public_key_pem).encrypt(aes_key)
+    prefix = os.urandom(NONCE_PREFIX_SIZE)
+
+    header = (MAGIC + struct.pack(">IH", segment_size, len(encrypted_aes_key)) +
+              encrypted_aes_key + prefix)
+
+    # 2. Cifrar segmento por segmento; se lee uno adelantado para saber cual es el ultimo
+    with open(input_path, "rb") as fin, open(output_path, "wb") as fout:
+        fout.write(header)
+        counter = 0
+        segment = fin.read(segment_size)
+        while True:
+            next_segment = fin.read(segment_size)
+            last = not next_segment
+            cipher = AES.new(aes_key, AES.MODE_GCM, nonce=segment_nonce(prefix, counter, last))
+            cipher.update(header)
+            ciphertext, tag = cipher.encrypt_and_digest(segment)
+            fout.write(ciphertext)
+            fout.write(tag)
+            if last:
+                break
+            segment = next_segment
+            counter += 1
+
+
+def read_header(fin):
+    magic = fin.read(4)
+    if magic != MAGIC:
+        raise ValueError("El archivo no tiene el formato RGS1")
+    fixed = fin.read(6)
+    if len(fixed) != 6:
+        raise ValueError("Header incompleto")
+    segment_size, encrypted_key_len = struct.unpack(">IH", fixed)
+    if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+        raise ValueError("Tamano de segmento fuera de rango")
+    encrypted_aes_key = fin.read(encrypted_key_len)
+    prefix = fin.read(NONCE_PREFIX_SIZE)
+    if len(encrypted_aes_key) != encrypted_key_len or len(prefix) != NONCE_PREFIX_SIZE:
+        raise ValueError("Header incompleto")
+    header = magic + fixed + encrypted_aes_key + prefix
+    return header, segment_size, encrypted_aes_key, prefix
+
+
+def decrypt_file(input_path: str, output_path: str, recipient_private_key_pem: bytes):
+    # El resultado se escribe en un archivo temporal y solo se renombra si
+    # todos los segmentos se verificaron; ante un segmento alterado se aborta
+    # de inmediato sin dejar texto plano sin autenticar en output_path.
+    partial_path = output_path + ".parcial"
+    try:
+        with open(input_path, "rb") as fin, open(partial_path, "wb") as fout:
+            header, segment_size, encrypted_aes_key, prefix = read_header(fin)
+
+            aes_key = LLAVERO.oaep(recipient_private_key_pem).decrypt(encrypted_aes_key)
+
+            record_size = segment_size + TAG_SIZE
+            counter = 0
+            record = fin.read(record_size)
+            while True:
+                if len(record) < TAG_SIZE:
+                    raise ValueError("Archivo truncado")
+                next_record = fin.read(record_size)
+                last = not next_record
+                cipher = AES.new(aes_key, AES.MODE_GCM, nonce=segment_nonce(prefix, counter, last))
+                cipher.update(header)
+                # decrypt_and_verify lanza ValueError si el tag no coincide
+                fout.write(cipher.decrypt_and_verify(record[:-TAG_SIZE], record[-TAG_SIZE:]))
+                if last:
+                    break
+                record = next_record
+                counter += 1
+        os.replace(partial_path, output_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+if __name__ == '__main__':
+    generar_par_claves(2048)
+
+    with open("public_key.pem", "rb") as f: pub = f.read()
+    with open("private_key.pem", "rb") as f: priv = f.read()
+
+    # Archivo de 5 MB (no multiplo del segmento) cifrado y descifrado por segmentos
+    with open("contrato.bin", "wb") as f:
+        f.write(os.urandom(5 * 1024 * 1024 + 123))
+
+    encrypt_file("contrato.bin", "contrato.rgs", pub)
+    decrypt_file("contrato.rgs", "contrato_descifrado.bin", priv)
+    with open("contrato.bin", "rb") as a, open("contrato_descifrado.bin", "rb") as b:
+        assert a.read() == b.read()
+    print("Archivo 5 MB por segmentos: OK")
+
+    # Alterar un byte de un segmento intermedio: se rechaza
+    with open("contrato.rgs", "r+b") as f:
+        f.seek(-(SEGMENT_SIZE + TAG_SIZE) * 70, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 1]))
+    try:
+        decrypt_file("contrato.rgs", "contrato_alterado.bin", priv)
+        raise AssertionError("Se acepto un segmento alterado")
+    except ValueError:
+        assert not os.path.exists("contrato_alterado.bin")
+        print("Segmento alterado: rechazado")
+
+    # Quitar el ultimo segmento: la bandera de ultimo segmento detecta el corte
+    encrypt_file("contrato.bin", "contrato.rgs", pub)
+    size = os.path.getsize("contrato.rgs")
+    with open("contrato.rgs", "r+b") as f:
+        f.truncate(size - (123 + TAG_SIZE))
+    try:
+        decrypt_file("contrato.rgs", "contrato_truncado.bin", priv)
+        raise AssertionError("Se acepto un archivo truncado")
+    except ValueError:
+        print("Archivo truncado: rechazado")
+
+    for ruta in ("contrato.bin", "contrato.rgs", "contrato_descifrado.bin"):
+        os.remove(ruta)
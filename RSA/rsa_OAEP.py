@@ -1,13 +1,9 @@
-from Crypto.PublicKey import RSA
-from Crypto.Cipher import PKCS1_OAEP
+from llavero_rsa import LLAVERO
  
 
 def cifrar_con_rsa(mensaje: bytes, public_key_pem: bytes) -> bytes:
-    # Cargar la clave pública
-    public_key = RSA.import_key(public_key_pem)
-    
-    # Crear un cifrador OAEP con la clave pública
-    cipher = PKCS1_OAEP.new(public_key)
+    # Cifrador OAEP de la clave pública (el PEM se parsea una vez y queda en el llavero)
+    cipher = LLAVERO.oaep(public_key_pem)
     
     # Cifrar el mensaje
     cifrado = cipher.encrypt(mensaje)
@@ -15,11 +11,8 @@ def cifrar_con_rsa(mensaje: bytes, public_key_pem: bytes) -> bytes:
     return cifrado
 
 def descifrar_con_rsa(cifrado: bytes, private_key_pem: bytes) -> bytes:
-    # Cargar la clave privada
-    private_key = RSA.import_key(private_key_pem)
-
-    # Crear un descifrador OAEP con la clave privada
-    cipher = PKCS1_OAEP.new(private_key)
+    # Descifrador OAEP de la clave privada (desde el llavero)
+    cipher = LLAVERO.oaep(private_key_pem)
 
     # Descifrar el mensaje
     descifrado = cipher.decrypt(cifrado)
@@ -0,0 +1,118 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Crypto.PublicKey import RSA
+from Crypto.Cipher import PKCS1_OAEP
+from llavero_rsa import LLAVERO
+
+# Descifrado OAEP por lotes con una misma clave privada.
+#
+# RSA.import_key calcula una sola vez los parametros CRT (dp, dq, u) y la
+# clave los reutiliza en cada descifrado. Por eso cada proceso del pool
+# importa la clave una sola vez (initializer) y luego descifra trozos de
+# ciphertexts sin volver a parsear el PEM ni crear el cifrador OAEP.
+#
+# El blinding (r aleatorio, r^e mod n y r^-1 mod n) lo hace PyCryptodome en
+# cada operacion y no se puede compartir entre mensajes sin perder su
+# proteccion contra ataques de tiempo; el benchmark mide cuanto cuesta.
+
+TAM_TROZO = 32
+
+_cipher_trabajador = None
+
+
+def inicializar_trabajador(private_key_pem: bytes):
+    global _cipher_trabajador
+    _cipher_trabajador = PKCS1_OAEP.new(RSA.import_key(private_key_pem))
+
+
+def descifrar_trozo(cifrados):
+    return [_cipher_trabajador.decrypt(c) for c in cifrados]
+
+
+class DescifradorLote:
+    # Pool de procesos con la clave privada ya cargada en cada proceso
+    def __init__(self, private_key_pem: bytes, procesos: int = None, tam_trozo: int = TAM_TROZO):
+        self.tam_trozo = tam_trozo
+        self._pool = ProcessPoolExecutor(
+            max_workers=procesos or os.cpu_count() or 1,
+            initializer=inicializar_trabajador,
+            initargs=(private_key_pem,),
+        )
+
+    def descifrar(self, cifrados) -> list:
+        cifrados = list(cifrados)
+        trozos = [cifrados[i:i + self.tam_trozo] for i in range(0, len(cifrados), self.tam_trozo)]
+        resultado = []
+        for parte in self._pool.map(descifrar_trozo, trozos):
+            resultado.extend(parte)
+        return resultado
+
+    def cerrar(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def decrypt_batch(cifrados, private_key_pem: bytes, procesos: int = None,
+                  tam_trozo: int = TAM_TROZO) -> list:
+    # Con un solo proceso se usa el llavero compartido (sin crear pool)
+    if procesos == 1:
+        return LLAVERO.decrypt_many(cifrados, private_key_pem)
+    with DescifradorLote(private_key_pem, procesos, tam_trozo) as descifrador:
+        return descifrador.descifrar(cifrados)
+
+
+def costo_blinding(key, repeticiones: int):
+    # Tiempo de solo los pasos de blinding de una operacion privada
+    from Crypto.Math.Numbers import Integer
+    n = Integer(key.n)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        r = Integer.random_range(min_inclusive=1, max_exclusive=n)
+        pow(r, key.e, n)
+        r.inverse(n)
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+if __name__ == '__main__':
+    import argparse
+    from rsa_OAEP import descifrar_con_rsa
+
+    parser = argparse.ArgumentParser(description="Benchmark de descifrado RSA-OAEP por lotes.")
+    parser.add_argument("--mensajes", type=int, default=200)
+    parser.add_argument("--bits", type=int, nargs="+", default=[2048, 3072, 4096])
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'bits':>5} {'por llamada':>14} {'llavero':>12} {'lote (pool)':>14} {'blinding':>10}")
+    for bits in args.bits:
+        key = RSA.generate(bits)
+        priv = key.export_key()
+        claves_aes = [os.urandom(32) for _ in range(args.mensajes)]
+        cifrados = LLAVERO.encrypt_many(claves_aes, key.publickey().export_key())
+
+        # Camino original de rsa_OAEP: importar la clave y crear OAEP en cada mensaje
+        muestra = cifrados[:max(1, args.mensajes // 10)]
+        inicio = time.perf_counter()
+        for c in muestra:
+            PKCS1_OAEP.new(RSA.import_key(priv)).decrypt(c)
+        por_llamada = len(muestra) / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        assert [descifrar_con_rsa(c, priv) for c in cifrados] == claves_aes
+        llavero = len(cifrados) / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        assert decrypt_batch(cifrados, priv, args.procesos) == claves_aes
+        lote = len(cifrados) / (time.perf_counter() - inicio)
+
+        # Fraccion del tiempo de una operacion (con llavero) que es blinding
+        blinding = costo_blinding(key, 50) * llavero
+
+        print(f"{bits:>5} {por_llamada:>10.0f} op/s {llavero:>8.0f} op/s {lote:>10.0f} op/s "
+              f"{blinding:>9.1%}")
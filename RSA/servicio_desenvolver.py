@@ -0,0 +1,305 @@
+import asyncio
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from Crypto.Cipher import AES
+from rsa_lote import inicializar_trabajador, descifrar_trozo
+
+# Servicio asyncio que desenvuelve (descifra con RSA-OAEP) claves AES de los
+# paquetes de rsa_AES_GCM. La operacion RSA corre en un pool de procesos, asi
+# el event loop nunca se bloquea. Escucha en localhost TCP o en un socket Unix.
+#
+# Protocolo (mismo formato en ambos sentidos):
+# [4 bytes: longitud del resto] [4 bytes: id de peticion] [1 byte: tipo] [payload]
+#
+# Peticiones: DESENVOLVER (payload = clave AES cifrada), HISTOGRAMA (sin payload)
+# Respuestas: OK (payload = clave AES o JSON) o ERROR (payload = mensaje)
+#
+# Un cliente puede enviar muchas peticiones sin esperar respuesta (pipelining);
+# cada respuesta lleva el id de su peticion y pueden llegar en otro orden.
+# Backpressure: cada conexion tiene como maximo MAX_EN_VUELO peticiones en
+# proceso; mientras tanto el servidor deja de leer el socket.
+
+DESENVOLVER = 1
+HISTOGRAMA = 2
+OK = 0
+ERROR = 1
+
+MAX_TRAMA = 64 * 1024
+MAX_EN_VUELO = 64
+LIMITES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def empaquetar(id_peticion: int, tipo: int, payload: bytes = b"") -> bytes:
+    return struct.pack(">IIB", 5 + len(payload), id_peticion, tipo) + payload
+
+
+async def leer_trama(reader):
+    # Retorna (id, tipo, payload) o None si la conexion se cerro
+    try:
+        cabecera = await reader.readexactly(4)
+    except asyncio.IncompleteReadError:
+        return None
+    longitud = struct.unpack(">I", cabecera)[0]
+    if not 5 <= longitud <= MAX_TRAMA:
+        raise ValueError(f"Trama de tamano invalido: {longitud}")
+    cuerpo = await reader.readexactly(longitud)
+    id_peticion, tipo = struct.unpack(">IB", cuerpo[:5])
+    return id_peticion, tipo, cuerpo[5:]
+
+
+class Histograma:
+    def __init__(self, limites_ms=LIMITES_MS):
+        self.limites_ms = list(limites_ms)
+        self.cuentas = [0] * (len(self.limites_ms) + 1)  # el ultimo: mayor al limite maximo
+        self.total = 0
+        self.suma_ms = 0.0
+
+    def registrar(self, ms: float):
+        self.cuentas[bisect.bisect_left(self.limites_ms, ms)] += 1
+        self.total += 1
+        self.suma_ms += ms
+
+    def percentil(self, p: float):
+        # Limite superior del bucket que contiene el percentil p
+        if not self.total:
+            return None
+        objetivo = p * self.total
+        acumulado = 0
+        for limite, cuenta in zip(self.limites_ms + [float("inf")], self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+    def como_dict(self) -> dict:
+        etiquetas = [f"<={l}ms" for l in self.limites_ms] + [f">{self.limites_ms[-1]}ms"]
+        return {
+            "total": self.total,
+            "media_ms": self.suma_ms / self.total if self.total else None,
+            "p50_ms": self.percentil(0.50),
+            "p99_ms": self.percentil(0.99),
+            "buckets": dict(zip(etiquetas, self.cuentas)),
+        }
+
+
+class ServicioDesenvolver:
+    def __init__(self, private_key_pem: bytes, procesos: int = None,
+                 max_en_vuelo: int = MAX_EN_VUELO):
+        self.max_en_vuelo = max_en_vuelo
+        self.histograma = Histograma()
+        self._private_key_pem = private_key_pem
+        self._procesos = procesos or os.cpu_count() or 1
+        self._pool = self._crear_pool()
+        self._lock_pool = threading.Lock()
+        self._servidor = None
+        self._conexiones = {}  # tarea que atiende -> writer
+
+    def _crear_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self._procesos,
+            initializer=inicializar_trabajador,
+            initargs=(self._private_key_pem,),
+        )
+
+    def _reemplazar_pool(self, roto):
+        # Si un trabajador murio el pool queda inutilizable; se crea otro para las
+        # peticiones siguientes. Solo lo reemplaza la primera peticion que lo note.
+        with self._lock_pool:
+            if self._pool is not roto:
+                return
+            self._pool = self._crear_pool()
+        roto.shutdown(wait=False)
+
+    async def iniciar_tcp(self, host: str = "127.0.0.1", puerto: int = 0):
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def iniciar_unix(self, ruta: str):
+        self._servidor = await asyncio.start_unix_server(self._atender, ruta)
+        return ruta
+
+    async def _atender(self, reader, writer):
+        self._conexiones[asyncio.current_task()] = writer
+        en_vuelo = asyncio.Semaphore(self.max_en_vuelo)
+        lock_escritura = asyncio.Lock()
+        tareas = set()
+
+        async def responder(id_peticion, tipo, payload):
+            async with lock_escritura:
+                writer.write(empaquetar(id_peticion, tipo, payload))
+                await writer.drain()
+
+        async def procesar(id_peticion, tipo, payload):
+            try:
+                if tipo == DESENVOLVER:
+                    inicio = time.perf_counter()
+                    loop = asyncio.get_running_loop()
+                    pool = self._pool
+                    try:
+                        (clave,) = await loop.run_in_executor(pool, descifrar_trozo, [payload])
+                    except ValueError as error:
+                        await responder(id_peticion, ERROR, str(error).encode())
+                        return
+                    except Exception as error:
+                        if isinstance(error, BrokenProcessPool):
+                            self._reemplazar_pool(pool)
+                        # Pool roto (BrokenProcessPool) u otra falla del trabajador:
+                        # la peticion recibe su ERROR en vez de quedar sin respuesta
+                        await responder(
+                            id_peticion, ERROR, f"Fallo del pool de procesos: {error!r}".encode()
+                        )
+                        return
+                    self.histograma.registrar((time.perf_counter() - inicio) * 1000)
+                    await responder(id_peticion, OK, clave)
+                elif tipo == HISTOGRAMA:
+                    await responder(id_peticion, OK, json.dumps(self.histograma.como_dict()).encode())
+                else:
+                    await responder(id_peticion, ERROR, f"Tipo desconocido: {tipo}".encode())
+            except ConnectionError:
+                pass
+            finally:
+                en_vuelo.release()
+
+        try:
+            while True:
+                # Sin lugar para otra peticion no se lee mas del socket
+                await en_vuelo.acquire()
+                trama = await leer_trama(reader)
+                if trama is None:
+                    en_vuelo.release()
+                    break
+                tarea = asyncio.create_task(procesar(*trama))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas)
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self._conexiones.pop(asyncio.current_task(), None)
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+        # Cerrar las conexiones abiertas: cada una termina sus peticiones en curso
+        for writer in list(self._conexiones.values()):
+            writer.close()
+        if self._conexiones:
+            await asyncio.gather(*self._conexiones, return_exceptions=True)
+        if self._servidor is not None:
+            await self._servidor.wait_closed()
+        # shutdown() espera a los procesos: en un hilo, para no bloquear el event loop
+        await asyncio.to_thread(self._pool.shutdown)
+
+
+class ClienteDesenvolver:
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._pendientes = {}
+        self._siguiente_id = 0
+        self._lector = asyncio.create_task(self._leer_respuestas())
+
+    @classmethod
+    async def conectar_tcp(cls, host: str, puerto: int):
+        return cls(*await asyncio.open_connection(host, puerto))
+
+    @classmethod
+    async def conectar_unix(cls, ruta: str):
+        return cls(*await asyncio.open_unix_connection(ruta))
+
+    async def _leer_respuestas(self):
+        try:
+            while True:
+                trama = await leer_trama(self._reader)
+                if trama is None:
+                    break
+                id_peticion, estado, payload = trama
+                futuro = self._pendientes.pop(id_peticion, None)
+                if futuro is None or futuro.done():
+                    continue
+                if estado == OK:
+                    futuro.set_result(payload)
+                else:
+                    futuro.set_exception(ValueError(payload.decode(errors="replace")))
+        finally:
+            for futuro in self._pendientes.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexion cerrada"))
+            self._pendientes.clear()
+
+    async def _pedir(self, tipo: int, payload: bytes = b"") -> bytes:
+        id_peticion = self._siguiente_id
+        self._siguiente_id = (self._siguiente_id + 1) % 2 ** 32
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes[id_peticion] = futuro
+        self._writer.write(empaquetar(id_peticion, tipo, payload))
+        await self._writer.drain()
+        return await futuro
+
+    async def desenvolver(self, encrypted_aes_key: bytes) -> bytes:
+        return await self._pedir(DESENVOLVER, encrypted_aes_key)
+
+    async def histograma(self) -> dict:
+        return json.loads(await self._pedir(HISTOGRAMA))
+
+    async def cerrar(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._lector
+
+
+async def decrypt_document_async(pkg: bytes, cliente: ClienteDesenvolver) -> bytes:
+    # Igual que rsa_AES_GCM.decrypt_document, pero la clave AES la desenvuelve el servicio
+    encrypted_key_len = int.from_bytes(pkg[:2], byteorder="big")
+    end = 2 + encrypted_key_len
+    aes_key = await cliente.desenvolver(pkg[2:end])
+    nonce, tag, ciphertext = pkg[end:end + 16], pkg[end + 16:end + 32], pkg[end + 32:]
+    return AES.new(aes_key, AES.MODE_GCM, nonce=nonce).decrypt_and_verify(ciphertext, tag)
+
+
+if __name__ == '__main__':
+    from Crypto.PublicKey import RSA
+    from rsa_AES_GCM import encrypt_document
+    from llavero_rsa import LLAVERO
+
+    async def demo():
+        key = RSA.generate(2048)
+        priv, pub = key.export_key(), key.publickey().export_key()
+
+        servicio = ServicioDesenvolver(priv)
+        host, puerto = await servicio.iniciar_tcp()
+        cliente = await ClienteDesenvolver.conectar_tcp(host, puerto)
+
+        # 200 peticiones en pipeline sobre una sola conexion
+        claves = [os.urandom(32) for _ in range(200)]
+        cifradas = LLAVERO.encrypt_many(claves, pub)
+        inicio = time.perf_counter()
+        resultado = await asyncio.gather(*(cliente.desenvolver(c) for c in cifradas))
+        segundos = time.perf_counter() - inicio
+        assert list(resultado) == claves
+        print(f"{len(claves)} claves desenvueltas en {segundos:.2f} s")
+
+        # Paquete completo de rsa_AES_GCM
+        doc = os.urandom(1024 * 1024)
+        assert await decrypt_document_async(encrypt_document(doc, pub), cliente) == doc
+
+        # Un ciphertext invalido responde con error sin cerrar la conexion
+        try:
+            await cliente.desenvolver(b"\x00" * 256)
+            raise AssertionError("Se acepto un ciphertext invalido")
+        except ValueError:
+            pass
+
+        print(json.dumps(await cliente.histograma(), indent=2))
+        await cliente.cerrar()
+        await servicio.cerrar()
+
+    asyncio.run(demo())
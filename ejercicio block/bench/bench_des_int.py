@@ -0,0 +1,50 @@
+"""
+bench_des_int.py - Compara el motor DES de cadenas (des_core) con el de enteros (des_int).
+
+Uso:
+    python bench/bench_des_int.py [--bloques N]
+"""
+import argparse
+import os
+import sys
+import time
+
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+from utils.utils import bytes_to_bin
+from utils.des_core import generar_subclaves, des_block_encrypt
+from utils.des_int import bytes_to_int, generar_subclaves_int, des_block_encrypt_int
+
+
+def medir(funcion, bloques, subclaves):
+    """Retorna bloques por segundo al cifrar todos los bloques con la funcion dada."""
+    inicio = time.perf_counter()
+    for bloque in bloques:
+        funcion(bloque, subclaves)
+    return len(bloques) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DES cadenas vs enteros.")
+    parser.add_argument("--bloques", type=int, default=2000, help="Bloques a cifrar por motor.")
+    args = parser.parse_args()
+
+    clave = os.urandom(8)
+    datos = [os.urandom(8) for _ in range(args.bloques)]
+
+    bloques_bin = [bytes_to_bin(bloque) for bloque in datos]
+    bloques_int = [bytes_to_int(bloque) for bloque in datos]
+
+    ref = medir(des_block_encrypt, bloques_bin, generar_subclaves(bytes_to_bin(clave)))
+    rapido = medir(des_block_encrypt_int, bloques_int, generar_subclaves_int(clave))
+
+    print(f"Bloques por motor: {args.bloques}")
+    print(f"des_core (cadenas): {ref:>12,.0f} bloques/s")
+    print(f"des_int (enteros):  {rapido:>12,.0f} bloques/s")
+    print(f"Aceleracion:        {rapido / ref:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
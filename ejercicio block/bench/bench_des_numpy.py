@@ -0,0 +1,61 @@
+"""
+bench_des_numpy.py - Compara el motor vectorizado (des_numpy) con des_int y PyCryptodome.
+
+Uso:
+    python bench/bench_des_numpy.py [--bloques N] [--muestra M]
+"""
+import argparse
+import os
+import sys
+import time
+
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+from Crypto.Cipher import DES, DES3
+
+from utils.des_int import bytes_to_int, generar_subclaves_int, des_block_encrypt_int
+from utils.des_numpy import ecb_encrypt_np, ctr_crypt_np
+
+
+def cronometrar(funcion):
+    """Ejecuta la funcion y retorna los segundos transcurridos."""
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DES vectorizado con NumPy.")
+    parser.add_argument("--bloques", type=int, default=1_000_000, help="Bloques por operacion.")
+    parser.add_argument("--muestra", type=int, default=20_000,
+                        help="Bloques medidos con des_int para proyectar su tiempo.")
+    args = parser.parse_args()
+
+    datos = os.urandom(8 * args.bloques)
+    key_des = os.urandom(8)
+    key_3des = DES3.adjust_key_parity(os.urandom(16))
+
+    subclaves = generar_subclaves_int(key_des)
+    muestra = [bytes_to_int(datos[i:i + 8]) for i in range(0, 8 * min(args.muestra, args.bloques), 8)]
+    escalar = cronometrar(lambda: [des_block_encrypt_int(b, subclaves) for b in muestra])
+    escalar *= args.bloques / len(muestra)
+
+    filas = [
+        ("DES-ECB des_int (proyectado)", escalar),
+        ("DES-ECB des_numpy", cronometrar(lambda: ecb_encrypt_np(key_des, datos))),
+        ("DES-ECB PyCryptodome", cronometrar(lambda: DES.new(key_des, DES.MODE_ECB).encrypt(datos))),
+        ("3DES-ECB des_numpy", cronometrar(lambda: ecb_encrypt_np(key_3des, datos))),
+        ("3DES-CTR des_numpy", cronometrar(lambda: ctr_crypt_np(key_3des, datos, b"\x00" * 4))),
+        ("3DES-CTR PyCryptodome", cronometrar(
+            lambda: DES3.new(key_3des, DES3.MODE_CTR, nonce=b"\x00" * 4).encrypt(datos))),
+    ]
+
+    print(f"Bloques: {args.bloques:,}")
+    for nombre, segundos in filas:
+        print(f"{nombre:<32}{segundos:>10.2f} s{args.bloques / segundos:>16,.0f} bloques/s")
+
+
+if __name__ == "__main__":
+    main()
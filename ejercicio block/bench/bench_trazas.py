@@ -0,0 +1,108 @@
+"""
+bench_trazas.py - Mide el costo de las trazas en los cifradores por bloques.
+
+Compara el camino silencioso (observador=None, valor por defecto) contra el
+camino con ImpresorTrazas escribiendo a os.devnull, de modo que solo se mide
+el formateo y no la velocidad de la terminal.
+
+- AES (imagenes): se cifra una imagen BMP aleatoria del tamano indicado.
+- DES y 3DES-CBC (motor de referencia de cadenas): se mide una muestra de
+  bloques y se proyecta el tiempo para el mismo tamano de entrada, porque
+  el motor de referencia tardaria minutos en procesar 10 MB completos.
+  Con --completo se procesa la entrada entera.
+
+Uso:
+    python bench/bench_trazas.py [--mb 10] [--bloques 200] [--completo]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(EJERCICIO_BLOCK_DIR, 'src')
+for ruta in (EJERCICIO_BLOCK_DIR, SRC_DIR):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from PIL import Image
+
+from utils.utils import bytes_to_bin
+from utils.trazas import ImpresorTrazas
+from des_cipher import des_encrypt
+from tripledes_cipher import triple_des_cbc_encrypt, generate_3des_key
+from aes_cipher import encrypt_image_ecb, encrypt_image_cbc, generate_aes_key
+
+
+def cronometrar(funcion):
+    """Ejecuta la funcion y retorna los segundos transcurridos."""
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def crear_imagen_bmp(ruta, tam_bytes):
+    """Crea una imagen RGB aleatoria con aproximadamente tam_bytes de pixeles."""
+    lado = int((tam_bytes / 3) ** 0.5)
+    Image.frombytes('RGB', (lado, lado), os.urandom(lado * lado * 3)).save(ruta, 'BMP')
+
+
+def imprimir_fila(nombre, silencioso, con_trazas, nota=""):
+    print(f"{nombre:<28}{silencioso:>12.3f} s{con_trazas:>14.3f} s"
+          f"{con_trazas / silencioso:>10.1f}x  {nota}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del camino silencioso vs trazas.")
+    parser.add_argument("--mb", type=float, default=10, help="Tamano de la entrada en MB.")
+    parser.add_argument("--bloques", type=int, default=200,
+                        help="Bloques DES/3DES medidos para proyectar el tiempo.")
+    parser.add_argument("--completo", action="store_true",
+                        help="Procesa la entrada completa con DES/3DES (muy lento).")
+    args = parser.parse_args()
+
+    tam_bytes = int(args.mb * 1024 * 1024)
+    bloques_totales = tam_bytes // 8
+    bloques_medidos = bloques_totales if args.completo else min(args.bloques, bloques_totales)
+    factor = bloques_totales / bloques_medidos
+
+    devnull = open(os.devnull, 'w')
+    trazas = ImpresorTrazas(destino=devnull)
+
+    print(f"Entrada: {args.mb} MB ({bloques_totales} bloques DES)")
+    print(f"{'Operacion':<28}{'Silencioso':>14}{'Con trazas':>16}{'Costo':>11}")
+    print("-" * 80)
+
+    # --- AES sobre imagen ---
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, 'entrada.bmp')
+        salida = os.path.join(directorio, 'salida.bmp')
+        crear_imagen_bmp(entrada, tam_bytes)
+        key = generate_aes_key()
+
+        for nombre, funcion in (("AES-ECB imagen", encrypt_image_ecb),
+                                ("AES-CBC imagen", encrypt_image_cbc)):
+            silencioso = cronometrar(lambda: funcion(entrada, salida, key))
+            con_trazas = cronometrar(lambda: funcion(entrada, salida, key, observador=trazas))
+            imprimir_fila(nombre, silencioso, con_trazas)
+
+    # --- DES y 3DES-CBC (motor de referencia) ---
+    bloques = [bytes_to_bin(os.urandom(8)) for _ in range(bloques_medidos)]
+    clave_des = bytes_to_bin(os.urandom(8))
+    key_3des = generate_3des_key()
+    nota = "" if args.completo else f"(proyectado desde {bloques_medidos} bloques)"
+
+    silencioso = cronometrar(lambda: des_encrypt(bloques, clave_des))
+    con_trazas = cronometrar(lambda: des_encrypt(bloques, clave_des, observador=trazas))
+    imprimir_fila("DES", silencioso * factor, con_trazas * factor, nota)
+
+    silencioso = cronometrar(lambda: triple_des_cbc_encrypt(bloques, key_3des))
+    con_trazas = cronometrar(lambda: triple_des_cbc_encrypt(bloques, key_3des, observador=trazas))
+    imprimir_fila("3DES-CBC", silencioso * factor, con_trazas * factor, nota)
+
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ Cifrado de imagenes:
 """
 import os
 import sys
+import traceback
 
 # Configurar path para imports
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -39,12 +40,16 @@ from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from PIL import Image
 import io
+import mmap
+
+from utils.trazas import ImpresorTrazas
 
 
 # --- CONSTANTES ---
 AES_BLOCK_SIZE = 16  # 128 bits
 AES_KEY_SIZE = 32    # 256 bits
 IMAGE_HEADER_SIZE = 54  # Tamano tipico de header BMP (puede variar para PNG)
+TAM_CHUNK_MMAP = 16 * 1024 * 1024  # Bytes por trozo en el cifrado con mmap
 
 
 # --- FUNCIONES DE GENERACION DE CLAVES E IV ---
@@ -231,7 +236,36 @@ def get_bmp_header_size(bmp_data: bytes) -> int:
     return int.from_bytes(bmp_data[10:14], 'little')
 
 
-def encrypt_image_ecb(input_path: str, output_path: str, key: bytes):
+def transformar_pixeles(funcion, origen, destino, inicio: int):
+    """
+    Aplica encrypt/decrypt del cifrador a los pixeles en una sola llamada.
+
+    La region alineada a 16 bytes se procesa directamente de `origen` a
+    `destino` (pueden ser el mismo buffer). Si sobra un bloque incompleto,
+    se completa con ceros, se procesa y se trunca a su tamano original,
+    igual que la version bloque por bloque.
+
+    Args:
+        funcion: cipher.encrypt o cipher.decrypt de PyCryptodome
+        origen: Buffer con la imagen completa (header + pixeles)
+        destino: bytearray/memoryview escribible del mismo tamano
+        inicio: Offset de los pixeles (tamano del header)
+    """
+    origen = memoryview(origen)
+    destino = memoryview(destino)
+    alineado = inicio + (len(origen) - inicio) // AES_BLOCK_SIZE * AES_BLOCK_SIZE
+
+    if alineado > inicio:
+        funcion(origen[inicio:alineado], output=destino[inicio:alineado])
+
+    resto = len(origen) - alineado
+    if resto:
+        # Ultimo bloque incompleto - padding temporal con ceros
+        block = bytes(origen[alineado:]) + bytes(AES_BLOCK_SIZE - resto)
+        destino[alineado:] = funcion(block)[:resto]
+
+
+def encrypt_image_ecb(input_path: str, output_path: str, key: bytes, observador=None):
     """
     Cifra una imagen usando AES-256 ECB manteniendo el header BMP intacto.
     Convierte automaticamente PNG/otros formatos a BMP.
@@ -240,6 +274,7 @@ def encrypt_image_ecb(input_path: str, output_path: str, key: bytes):
         input_path: Ruta de la imagen original
         output_path: Ruta para guardar la imagen cifrada (.bmp)
         key: Clave AES-256 de 32 bytes
+        observador: ObservadorCifrado para los mensajes informativos (None = silencio)
     """
     # Convertir a BMP primero
     bmp_data = convert_to_bmp(input_path)
@@ -247,42 +282,28 @@ def encrypt_image_ecb(input_path: str, output_path: str, key: bytes):
     # Obtener el offset real del header BMP
     header_size = get_bmp_header_size(bmp_data)
     
-    # Separar header y datos de pixeles
-    header = bmp_data[:header_size]
-    pixel_data = bmp_data[header_size:]
+    if observador is not None:
+        observador.mensaje(f"Imagen original: {len(bmp_data)} bytes")
+        observador.mensaje(f"Header BMP: {header_size} bytes (preservado)")
+        observador.mensaje(f"Datos de pixeles: {len(bmp_data) - header_size} bytes")
     
-    print(f"Imagen original: {len(bmp_data)} bytes")
-    print(f"Header BMP: {header_size} bytes (preservado)")
-    print(f"Datos de pixeles: {len(pixel_data)} bytes")
+    # Buffer de salida preasignado: header copiado, pixeles cifrados en una llamada
+    encrypted_image = bytearray(len(bmp_data))
+    encrypted_image[:header_size] = bmp_data[:header_size]
     
-    # Cifrar los datos de pixeles bloque por bloque
     cipher = AES.new(key, AES.MODE_ECB)
-    
-    # Cifrar en bloques de 16 bytes, mantener tamano original
-    encrypted_pixels = bytearray()
-    for i in range(0, len(pixel_data), AES_BLOCK_SIZE):
-        block = pixel_data[i:i+AES_BLOCK_SIZE]
-        if len(block) < AES_BLOCK_SIZE:
-            # Ultimo bloque incompleto - padding temporal
-            block = block + bytes(AES_BLOCK_SIZE - len(block))
-            encrypted_block = cipher.encrypt(block)
-            # Truncar al tamano original del bloque
-            encrypted_pixels.extend(encrypted_block[:len(pixel_data) - i])
-        else:
-            encrypted_block = cipher.encrypt(block)
-            encrypted_pixels.extend(encrypted_block)
-    
-    # Combinar header + pixeles cifrados
-    encrypted_image = header + bytes(encrypted_pixels)
+    transformar_pixeles(cipher.encrypt, bmp_data, encrypted_image, header_size)
     
     with open(output_path, 'wb') as f:
         f.write(encrypted_image)
     
-    print(f"Imagen cifrada (ECB) guardada en: {output_path}")
+    if observador is not None:
+        observador.mensaje(f"Imagen cifrada (ECB) guardada en: {output_path}")
     return encrypted_image
 
 
-def encrypt_image_cbc(input_path: str, output_path: str, key: bytes, iv: bytes = None):
+def encrypt_image_cbc(input_path: str, output_path: str, key: bytes, iv: bytes = None,
+                      observador=None):
     """
     Cifra una imagen usando AES-256 CBC manteniendo el header BMP intacto.
     Convierte automaticamente PNG/otros formatos a BMP.
@@ -292,6 +313,7 @@ def encrypt_image_cbc(input_path: str, output_path: str, key: bytes, iv: bytes =
         output_path: Ruta para guardar la imagen cifrada (.bmp)
         key: Clave AES-256 de 32 bytes
         iv: IV de 16 bytes (si None, se genera)
+        observador: ObservadorCifrado para los mensajes informativos (None = silencio)
         
     Returns:
         tuple: (encrypted_image, iv)
@@ -305,44 +327,29 @@ def encrypt_image_cbc(input_path: str, output_path: str, key: bytes, iv: bytes =
     # Obtener el offset real del header BMP
     header_size = get_bmp_header_size(bmp_data)
     
-    # Separar header y datos de pixeles
-    header = bmp_data[:header_size]
-    pixel_data = bmp_data[header_size:]
+    if observador is not None:
+        observador.mensaje(f"Imagen original: {len(bmp_data)} bytes")
+        observador.mensaje(f"Header BMP: {header_size} bytes (preservado)")
+        observador.mensaje(f"Datos de pixeles: {len(bmp_data) - header_size} bytes")
+        observador.mensaje(f"IV: {iv.hex()}")
     
-    print(f"Imagen original: {len(bmp_data)} bytes")
-    print(f"Header BMP: {header_size} bytes (preservado)")
-    print(f"Datos de pixeles: {len(pixel_data)} bytes")
-    print(f"IV: {iv.hex()}")
+    # Buffer de salida preasignado: header copiado, pixeles cifrados en una llamada
+    encrypted_image = bytearray(len(bmp_data))
+    encrypted_image[:header_size] = bmp_data[:header_size]
     
-    # Cifrar los datos de pixeles
     cipher = AES.new(key, AES.MODE_CBC, iv)
-    
-    # Cifrar en bloques, mantener tamano original
-    encrypted_pixels = bytearray()
-    prev_block = iv
-    
-    for i in range(0, len(pixel_data), AES_BLOCK_SIZE):
-        block = pixel_data[i:i+AES_BLOCK_SIZE]
-        if len(block) < AES_BLOCK_SIZE:
-            # Ultimo bloque incompleto - padding temporal
-            block = block + bytes(AES_BLOCK_SIZE - len(block))
-            encrypted_block = cipher.encrypt(block)
-            encrypted_pixels.extend(encrypted_block[:len(pixel_data) - i])
-        else:
-            encrypted_block = cipher.encrypt(block)
-            encrypted_pixels.extend(encrypted_block)
-    
-    # Combinar header + pixeles cifrados
-    encrypted_image = header + bytes(encrypted_pixels)
+    transformar_pixeles(cipher.encrypt, bmp_data, encrypted_image, header_size)
     
     with open(output_path, 'wb') as f:
         f.write(encrypted_image)
     
-    print(f"Imagen cifrada (CBC) guardada en: {output_path}")
+    if observador is not None:
+        observador.mensaje(f"Imagen cifrada (CBC) guardada en: {output_path}")
     return encrypted_image, iv
 
 
-def decrypt_image(input_path: str, output_path: str, key: bytes, mode: str, iv: bytes = None):
+def decrypt_image(input_path: str, output_path: str, key: bytes, mode: str, iv: bytes = None,
+                  observador=None):
     """
     Descifra una imagen BMP cifrada con AES.
     
@@ -352,42 +359,177 @@ def decrypt_image(input_path: str, output_path: str, key: bytes, mode: str, iv:
         key: Clave AES-256 de 32 bytes
         mode: 'ecb' o 'cbc'
         iv: IV de 16 bytes (requerido solo para CBC)
+        observador: ObservadorCifrado para los mensajes informativos (None = silencio)
     """
+    # Leer directamente en un buffer preasignado y descifrar en el mismo buffer
+    decrypted_image = bytearray(os.path.getsize(input_path))
     with open(input_path, 'rb') as f:
-        image_data = f.read()
+        f.readinto(decrypted_image)
     
     # Obtener el offset real del header BMP
-    header_size = get_bmp_header_size(image_data)
-    
-    header = image_data[:header_size]
-    encrypted_pixels = image_data[header_size:]
+    header_size = get_bmp_header_size(decrypted_image)
     
     if mode.lower() == 'ecb':
         cipher = AES.new(key, AES.MODE_ECB)
     else:
         cipher = AES.new(key, AES.MODE_CBC, iv)
     
-    # Descifrar en bloques
-    decrypted_pixels = bytearray()
-    for i in range(0, len(encrypted_pixels), AES_BLOCK_SIZE):
-        block = encrypted_pixels[i:i+AES_BLOCK_SIZE]
-        if len(block) < AES_BLOCK_SIZE:
-            block = block + bytes(AES_BLOCK_SIZE - len(block))
-            decrypted_block = cipher.decrypt(block)
-            decrypted_pixels.extend(decrypted_block[:len(encrypted_pixels) - i])
-        else:
-            decrypted_block = cipher.decrypt(block)
-            decrypted_pixels.extend(decrypted_block)
-    
-    decrypted_image = header + bytes(decrypted_pixels)
+    transformar_pixeles(cipher.decrypt, decrypted_image, decrypted_image, header_size)
     
     with open(output_path, 'wb') as f:
         f.write(decrypted_image)
     
-    print(f"Imagen descifrada guardada en: {output_path}")
+    if observador is not None:
+        observador.mensaje(f"Imagen descifrada guardada en: {output_path}")
     return decrypted_image
 
 
+# --- FUNCIONES DE IMAGEN CON MMAP (BMP MAS GRANDES QUE LA RAM) ---
+
+def _liberar_paginas(mapa, desde: int, hasta: int, escrito: bool) -> int:
+    """
+    Escribe a disco (si hubo cambios) y descarta de memoria las paginas ya
+    procesadas en [desde, hasta). Retorna el nuevo inicio alineado a pagina.
+    """
+    hasta -= hasta % mmap.PAGESIZE
+    if hasta <= desde:
+        return desde
+    if escrito:
+        mapa.flush(desde, hasta - desde)
+    # madvise no existe en Windows; ahi el sistema libera las paginas solo
+    if hasattr(mapa, 'madvise'):
+        mapa.madvise(mmap.MADV_DONTNEED, desde, hasta - desde)
+    return hasta
+
+
+def _transformar_bmp_mmap(input_path: str, output_path: str, cipher, operacion: str,
+                          tam_chunk: int):
+    """
+    Aplica cipher.encrypt o cipher.decrypt a los pixeles de un BMP por trozos,
+    con el origen y el destino mapeados en memoria (mmap).
+
+    Si input_path y output_path son el mismo archivo, se trabaja en el lugar.
+    """
+    if tam_chunk <= 0 or tam_chunk % mmap.PAGESIZE or tam_chunk % AES_BLOCK_SIZE:
+        raise ValueError(f"tam_chunk debe ser multiplo de {mmap.PAGESIZE} bytes")
+
+    en_el_lugar = os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+    tam = os.path.getsize(input_path)
+    funcion = getattr(cipher, operacion)
+
+    if tam == 0:
+        raise ValueError(f"{input_path} esta vacio; no es un BMP")
+
+    with open(input_path, 'r+b' if en_el_lugar else 'rb') as f_entrada:
+        origen = mmap.mmap(f_entrada.fileno(), 0,
+                           access=mmap.ACCESS_WRITE if en_el_lugar else mmap.ACCESS_READ)
+        f_salida = None
+        destino = None
+        completado = False
+        try:
+            if origen[:2] != b'BM':
+                raise ValueError(f"{input_path} no es un BMP; usar convert_to_bmp primero")
+            header_size = get_bmp_header_size(origen)
+
+            if en_el_lugar:
+                destino = origen
+            else:
+                # Archivo destino preasignado al mismo tamano y mapeado
+                f_salida = open(output_path, 'w+b')
+                f_salida.truncate(tam)
+                destino = mmap.mmap(f_salida.fileno(), tam)
+                destino[:header_size] = origen[:header_size]
+
+            liberado_origen = liberado_destino = 0
+            with memoryview(origen) as vista_origen, memoryview(destino) as vista_destino:
+                for inicio in range(header_size, tam, tam_chunk):
+                    fin = min(inicio + tam_chunk, tam)
+                    transformar_pixeles(funcion, vista_origen[:fin], vista_destino[:fin], inicio)
+                    liberado_destino = _liberar_paginas(destino, liberado_destino, fin, True)
+                    if destino is not origen:
+                        liberado_origen = _liberar_paginas(origen, liberado_origen, fin, False)
+
+            destino.flush()
+            completado = True
+            return header_size
+        except BaseException as error:
+            # Los frames del traceback retienen vistas de los mmap y sin
+            # soltarlas close() falla con BufferError
+            traceback.clear_frames(error.__traceback__)
+            raise
+        finally:
+            if destino is not None and destino is not origen:
+                destino.close()
+            origen.close()
+            if f_salida is not None:
+                f_salida.close()
+                # No dejar un BMP del tamano completo escrito a medias
+                if not completado:
+                    os.remove(output_path)
+
+
+def encrypt_bmp_mmap(input_path: str, output_path: str, key: bytes, mode: str = 'cbc',
+                     iv: bytes = None, tam_chunk: int = TAM_CHUNK_MMAP, observador=None):
+    """
+    Cifra un archivo BMP con AES-256 sin cargarlo completo en memoria.
+
+    A diferencia de encrypt_image_ecb/cbc, no pasa por PIL: la entrada ya
+    debe ser BMP. Origen y destino se mapean con mmap y los pixeles se cifran
+    por trozos de tam_chunk bytes; las paginas procesadas se escriben y se
+    liberan, asi la memoria usada no crece con el tamano de la imagen.
+    El resultado es identico al de encrypt_image_ecb/cbc.
+
+    Args:
+        input_path: Ruta del BMP original
+        output_path: Ruta del BMP cifrado (puede ser la misma: cifrado en el lugar)
+        key: Clave AES-256 de 32 bytes
+        mode: 'ecb' o 'cbc'
+        iv: IV de 16 bytes para CBC (si None, se genera)
+        tam_chunk: Bytes por trozo (multiplo del tamano de pagina)
+        observador: ObservadorCifrado para los mensajes informativos (None = silencio)
+
+    Returns:
+        bytes: IV usado (None en ECB)
+    """
+    if mode.lower() == 'ecb':
+        iv = None
+        cipher = AES.new(key, AES.MODE_ECB)
+    else:
+        if iv is None:
+            iv = generate_iv()
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+
+    header_size = _transformar_bmp_mmap(input_path, output_path, cipher, 'encrypt', tam_chunk)
+
+    if observador is not None:
+        observador.mensaje(f"Header BMP: {header_size} bytes (preservado)")
+        observador.mensaje(f"Imagen cifrada ({mode.upper()}, mmap) guardada en: {output_path}")
+    return iv
+
+
+def decrypt_bmp_mmap(input_path: str, output_path: str, key: bytes, mode: str,
+                     iv: bytes = None, tam_chunk: int = TAM_CHUNK_MMAP, observador=None):
+    """
+    Descifra un BMP cifrado con AES-256 usando mmap (ver encrypt_bmp_mmap).
+
+    Args:
+        input_path: Ruta del BMP cifrado
+        output_path: Ruta del BMP descifrado (puede ser la misma)
+        key: Clave AES-256 de 32 bytes
+        mode: 'ecb' o 'cbc'
+        iv: IV de 16 bytes (requerido solo para CBC)
+    """
+    if mode.lower() == 'ecb':
+        cipher = AES.new(key, AES.MODE_ECB)
+    else:
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+
+    _transformar_bmp_mmap(input_path, output_path, cipher, 'decrypt', tam_chunk)
+
+    if observador is not None:
+        observador.mensaje(f"Imagen descifrada (mmap) guardada en: {output_path}")
+
+
 # --- MAIN ---
 
 if __name__ == "__main__":
@@ -454,10 +596,12 @@ if __name__ == "__main__":
         print("(Se convierte automaticamente a BMP para visualizar patrones)")
         
         print(f"\n--- Cifrando con ECB ---")
-        encrypt_image_ecb(input_image, output_ecb, key)
+        encrypt_image_ecb(input_image, output_ecb, key, observador=ImpresorTrazas())
         
         print(f"\n--- Cifrando con CBC ---")
-        encrypted_cbc, iv_img = encrypt_image_cbc(input_image, output_cbc, key)
+        encrypted_cbc, iv_img = encrypt_image_cbc(
+            input_image, output_cbc, key, observador=ImpresorTrazas()
+        )
         
         print(f"\n{'='*70}")
         print("COMPARACION ECB vs CBC")
@@ -0,0 +1,244 @@
+"""
+aes_lote.py - Cifrado y descifrado AES-256 de muchas imagenes en paralelo.
+
+Recibe archivos, directorios o patrones glob y reparte las imagenes entre
+un pool de procesos. Cada archivo se procesa con las mismas funciones de
+aes_cipher.py (convert_to_bmp + encrypt_image_ecb/cbc, decrypt_image).
+
+- Cada imagen cifrada con CBC usa un IV aleatorio propio, guardado en hex
+  en un archivo junto a ella: <imagen>.bmp.iv
+- La clave (32 bytes) se lee de --clave; al cifrar, si el archivo no existe
+  se genera una clave nueva y se guarda ahi.
+- Como maximo --max-pendientes archivos esperan en el pool a la vez, asi la
+  lista de tareas no crece con la cantidad de imagenes.
+
+Uso:
+    python aes_lote.py cifrar ../images --salida cifradas --clave clave.bin --modo cbc
+    python aes_lote.py descifrar "cifradas/*.bmp" --salida descifradas --clave clave.bin --modo cbc
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# Configurar path para imports
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from aes_cipher import (
+    AES_KEY_SIZE, generate_aes_key, generate_iv, encrypt_image_ecb, encrypt_image_cbc,
+    decrypt_image
+)
+
+
+# --- CONSTANTES ---
+EXTENSIONES_IMAGEN = {'.bmp', '.png', '.jpg', '.jpeg', '.gif', '.tif', '.tiff', '.webp'}
+EXTENSION_IV = '.iv'
+
+
+# --- ARCHIVOS ---
+
+def resolver_imagenes(entradas):
+    """
+    Expande archivos, directorios (sin recursion) y patrones glob.
+
+    Returns:
+        list[Path]: Imagenes encontradas, sin duplicados y en orden
+    """
+    imagenes = []
+    for entrada in entradas:
+        ruta = Path(entrada)
+        if ruta.is_dir():
+            candidatos = sorted(p for p in ruta.iterdir()
+                                if p.is_file() and p.suffix.lower() in EXTENSIONES_IMAGEN)
+        elif ruta.is_file():
+            candidatos = [ruta]
+        else:
+            candidatos = sorted(Path(p) for p in glob.glob(entrada) if os.path.isfile(p))
+            if not candidatos:
+                raise FileNotFoundError(f"No se encontraron imagenes para: {entrada}")
+        imagenes.extend(p.resolve() for p in candidatos)
+    return list(dict.fromkeys(imagenes))
+
+
+def rutas_de_salida(imagenes, directorio_salida, sufijo):
+    """Asigna <directorio_salida>/<nombre><sufijo>.bmp a cada imagen."""
+    salidas = [Path(directorio_salida) / f"{imagen.stem}{sufijo}.bmp" for imagen in imagenes]
+    repetidas = {str(s) for s in salidas if salidas.count(s) > 1}
+    if repetidas:
+        raise ValueError(f"Varias imagenes producirian el mismo archivo: {sorted(repetidas)}")
+    return salidas
+
+
+def cargar_o_generar_clave(ruta_clave, generar):
+    """Lee la clave de 32 bytes; si no existe y generar es True, crea una nueva."""
+    ruta_clave = Path(ruta_clave)
+    if not ruta_clave.exists():
+        if not generar:
+            raise FileNotFoundError(f"No existe el archivo de clave: {ruta_clave}")
+        key = generate_aes_key()
+        # Solo legible por el usuario; O_EXCL evita pisar una clave creada
+        # por otro proceso entre exists() y la escritura
+        try:
+            fd = os.open(ruta_clave, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'wb') as archivo:
+                archivo.write(key)
+            return key
+
+    key = ruta_clave.read_bytes()
+    if len(key) != AES_KEY_SIZE:
+        raise ValueError(f"La clave debe tener {AES_KEY_SIZE} bytes: {ruta_clave}")
+    return key
+
+
+# --- TRABAJO DE CADA PROCESO ---
+
+def cifrar_archivo(tarea):
+    """
+    Cifra una imagen (se ejecuta en el pool).
+
+    Args:
+        tarea: (ruta_entrada, ruta_salida, key, modo)
+
+    Returns:
+        tuple: (ruta_entrada, bytes_escritos, segundos)
+    """
+    entrada, salida, key, modo = tarea
+    inicio = time.perf_counter()
+    if modo == 'ecb':
+        imagen = encrypt_image_ecb(str(entrada), str(salida), key)
+    else:
+        imagen, iv = encrypt_image_cbc(str(entrada), str(salida), key, generate_iv())
+        Path(str(salida) + EXTENSION_IV).write_text(iv.hex() + "\n", encoding="utf-8")
+    return entrada, len(imagen), time.perf_counter() - inicio
+
+
+def descifrar_archivo(tarea):
+    """
+    Descifra una imagen (se ejecuta en el pool). En CBC el IV se lee de <entrada>.iv.
+
+    Returns:
+        tuple: (ruta_entrada, bytes_escritos, segundos)
+    """
+    entrada, salida, key, modo = tarea
+    inicio = time.perf_counter()
+    iv = None
+    if modo == 'cbc':
+        ruta_iv = Path(str(entrada) + EXTENSION_IV)
+        if not ruta_iv.exists():
+            raise FileNotFoundError(f"No existe el IV: {ruta_iv}")
+        iv = bytes.fromhex(ruta_iv.read_text(encoding="utf-8").strip())
+    imagen = decrypt_image(str(entrada), str(salida), key, modo, iv)
+    return entrada, len(imagen), time.perf_counter() - inicio
+
+
+# --- EJECUCION EN PARALELO ---
+
+def procesar_lote(funcion, tareas, procesos=None, max_pendientes=None):
+    """
+    Ejecuta funcion(tarea) en un pool de procesos con cola acotada.
+
+    Imprime una linea por archivo al terminar y un resumen al final.
+
+    Returns:
+        tuple: (resultados, errores) con errores como lista de (entrada, mensaje)
+    """
+    procesos = procesos or os.cpu_count() or 1
+    max_pendientes = max_pendientes or 2 * procesos
+    resultados, errores = [], []
+    pendientes = {}
+    inicio = time.perf_counter()
+
+    def recoger(terminados):
+        for futuro in terminados:
+            entrada = pendientes.pop(futuro)
+            try:
+                resultado = futuro.result()
+            except Exception as error:
+                errores.append((entrada, str(error)))
+                print(f"ERROR {entrada.name}: {error}", file=sys.stderr)
+                continue
+            resultados.append(resultado)
+            _, tam, segundos = resultado
+            print(f"{entrada.name:<40}{tam / 1e6:>10.2f} MB{segundos:>9.2f} s")
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for tarea in tareas:
+            if len(pendientes) >= max_pendientes:
+                terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                recoger(terminados)
+            pendientes[pool.submit(funcion, tarea)] = tarea[0]
+        recoger(list(pendientes))
+
+    total = sum(tam for _, tam, _ in resultados)
+    segundos = time.perf_counter() - inicio
+    print(f"\n{len(resultados)} archivos, {total / 1e6:.2f} MB en {segundos:.2f} s "
+          f"({total / 1e6 / segundos if segundos else 0:.2f} MB/s), {len(errores)} errores")
+    return resultados, errores
+
+
+# --- CLI ---
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Cifra o descifra imagenes con AES-256 (ECB/CBC) en paralelo."
+    )
+    parser.add_argument("operacion", choices=("cifrar", "descifrar"))
+    parser.add_argument(
+        "entradas",
+        nargs="+",
+        help="Imagenes, directorios o patrones glob (por ejemplo \"fotos/*.png\").",
+    )
+    parser.add_argument("--salida", required=True, help="Directorio de salida.")
+    parser.add_argument(
+        "--clave",
+        required=True,
+        help="Archivo con la clave AES-256 (32 bytes). Al cifrar se genera si no existe.",
+    )
+    parser.add_argument("--modo", choices=("ecb", "cbc"), default="cbc")
+    parser.add_argument("--procesos", type=int, help="Procesos del pool (por defecto: CPUs).")
+    parser.add_argument(
+        "--max-pendientes",
+        type=int,
+        help="Maximo de archivos en cola a la vez (por defecto: 2 x procesos).",
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = construir_parser()
+    args = parser.parse_args(argv)
+
+    if args.procesos is not None and args.procesos < 1:
+        parser.error("--procesos debe ser al menos 1.")
+    if args.max_pendientes is not None and args.max_pendientes < 1:
+        parser.error("--max-pendientes debe ser al menos 1.")
+
+    cifrando = args.operacion == "cifrar"
+    try:
+        imagenes = resolver_imagenes(args.entradas)
+        sufijo = f"_{args.modo}" if cifrando else "_descifrada"
+        salidas = rutas_de_salida(imagenes, args.salida, sufijo)
+        key = cargar_o_generar_clave(args.clave, generar=cifrando)
+    except (FileNotFoundError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    Path(args.salida).mkdir(parents=True, exist_ok=True)
+    # Generador: las tareas se crean a medida que hay lugar en la cola
+    tareas = ((imagen, salida, key, args.modo) for imagen, salida in zip(imagenes, salidas))
+    funcion = cifrar_archivo if cifrando else descifrar_archivo
+
+    _, errores = procesar_lote(funcion, tareas, args.procesos, args.max_pendientes)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
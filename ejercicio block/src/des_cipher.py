@@ -15,10 +15,10 @@ EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '.
 if EJERCICIO_BLOCK_DIR not in sys.path:
     sys.path.insert(0, EJERCICIO_BLOCK_DIR)
 
-from utils.utils import ascii_to_bin
-from utils.des_core import (
-    generar_subclaves, des_block_encrypt, des_block_decrypt, bin_to_hex
-)
+from utils.utils import ascii_to_bin, bin_to_bytes
+from utils.des_core import des_block_encrypt, des_block_decrypt, bin_to_hex
+from utils.cache_subclaves import CACHE_SUBCLAVES
+from utils.trazas import ImpresorTrazas
 from block import padding
 
 def read_txt(file_name):
@@ -35,7 +35,7 @@ def read_txt(file_name):
     print(f"Contenido original (bytes): {data}")
     return data
 
-def generar_bloques_64bits(data_bytes):
+def generar_bloques_64bits(data_bytes, observador=None):
     """Aplica padding original de bytes y luego divide en bloques de 64 bits."""
     bloques_binarios = []
     
@@ -56,67 +56,80 @@ def generar_bloques_64bits(data_bytes):
         bloque_64 = "".join(bin_list)
         bloques_binarios.append(bloque_64)
         
-    print(f"\nTotal de bloques de 64 bits generados: {len(bloques_binarios)}")
+    if observador is not None:
+        observador.mensaje(f"Total de bloques de 64 bits generados: {len(bloques_binarios)}",
+                           separado=True)
     return bloques_binarios
 
 
-def des_encrypt(bloques_binarios, clave_bin=None):
-    """Cifra los bloques usando DES con 16 rondas."""
+def des_encrypt(bloques_binarios, clave_bin=None, observador=None):
+    """
+    Cifra los bloques usando DES con 16 rondas.
+    Si se pasa un observador (p. ej. ImpresorTrazas) recibe el detalle de cada ronda.
+    """
     # Generar clave si no se proporciona
     if clave_bin is None:
         clave_bytes = os.urandom(8)
         clave_bin = "".join(format(byte, '08b') for byte in clave_bytes)
     
-    print(f"\nClave (64 bits): {bin_to_hex(clave_bin)}")
-    
-    # Generar las 16 subclaves
-    subclaves = generar_subclaves(clave_bin)
+    if observador is not None:
+        observador.valor("Clave (64 bits)", clave_bin, separado=True)
     
     bloques_cifrados = []
     
-    for bloque in bloques_binarios:
-        print(f"\n{'='*50}")
-        print("ENCRYPTION")
-        
-        # Usar la función de cifrado de des_core
-        bloque_cifrado = des_block_encrypt(bloque, subclaves, verbose=True)
+    # Las 16 subclaves salen del cache LRU (se calculan solo la primera vez)
+    with CACHE_SUBCLAVES.usar(bin_to_bytes(clave_bin)) as esquema:
+        subclaves = esquema.k1.bin
         
-        print(f"Cipher Text: {bin_to_hex(bloque_cifrado)}")
-        bloques_cifrados.append(bloque_cifrado)
+        for bloque in bloques_binarios:
+            if observador is not None:
+                observador.seccion("ENCRYPTION")
+            
+            # Usar la función de cifrado de des_core
+            bloque_cifrado = des_block_encrypt(bloque, subclaves, observador=observador)
+            
+            if observador is not None:
+                observador.valor("Cipher Text", bloque_cifrado)
+            bloques_cifrados.append(bloque_cifrado)
     
     return bloques_cifrados, clave_bin
 
-def des_decrypt(bloques_cifrados, clave_bin):
+def des_decrypt(bloques_cifrados, clave_bin, observador=None):
     """Descifra los bloques usando DES con 16 rondas (claves en orden inverso)."""
-    # Generar las 16 subclaves
-    subclaves = generar_subclaves(clave_bin)
-    
     bloques_descifrados = []
     
-    for bloque in bloques_cifrados:
-        print(f"\n{'='*50}")
-        print("DECRYPTION")
+    # Las 16 subclaves salen del cache LRU (se calculan solo la primera vez)
+    with CACHE_SUBCLAVES.usar(bin_to_bytes(clave_bin)) as esquema:
+        subclaves = esquema.k1.bin
         
-        # Usar la función de descifrado de des_core
-        bloque_descifrado = des_block_decrypt(bloque, subclaves, verbose=True)
-        
-        print(f"Plain Text: {bin_to_hex(bloque_descifrado)}")
-        bloques_descifrados.append(bloque_descifrado)
+        for bloque in bloques_cifrados:
+            if observador is not None:
+                observador.seccion("DECRYPTION")
+            
+            # Usar la función de descifrado de des_core
+            bloque_descifrado = des_block_decrypt(bloque, subclaves, observador=observador)
+            
+            if observador is not None:
+                observador.valor("Plain Text", bloque_descifrado)
+            bloques_descifrados.append(bloque_descifrado)
     
     return bloques_descifrados
 
 if __name__ == "__main__":
+    # Mostrar el detalle de cada ronda en consola (secciones de 50 '=' sin cierre)
+    trazas = ImpresorTrazas(ancho_seccion=50, cerrar_seccion=False)
+
     # 1. Leer mensaje desde archivo
     datos = read_txt('des.txt')
     
     # 2. Agrupar y convertir a binario usando el padding de bytes
-    lista_de_bloques = generar_bloques_64bits(datos)
+    lista_de_bloques = generar_bloques_64bits(datos, observador=trazas)
     
     # 3. Cifrar con DES (16 rondas)
-    bloques_cifrados, clave_usada = des_encrypt(lista_de_bloques)
+    bloques_cifrados, clave_usada = des_encrypt(lista_de_bloques, observador=trazas)
     
     # 4. Descifrar con DES (verificación)
-    bloques_descifrados = des_decrypt(bloques_cifrados, clave_usada)
+    bloques_descifrados = des_decrypt(bloques_cifrados, clave_usada, observador=trazas)
     
     # 5. Mostrar resumen
     print(f"\n{'='*50}")
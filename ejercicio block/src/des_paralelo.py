@@ -0,0 +1,225 @@
+"""
+des_paralelo.py - Modos paralelizables de DES / 3DES-EDE con un pool de procesos.
+
+El cifrado CBC de tripledes_cipher.py y des_stream.py es secuencial: cada
+bloque depende del anterior. Estos modos no tienen esa dependencia, asi que
+los bloques se reparten en trozos entre procesos (ProcessPoolExecutor):
+
+- CTR: C[i] = P[i] XOR E(nonce || contador + i), cifrar y descifrar es igual
+- ECB: C[i] = E(P[i]), sin padding (la entrada debe ser multiplo de 8)
+- CBC (solo descifrado): P[i] = D(C[i]) XOR C[i-1], todos los C[i] son conocidos
+
+Cada trozo (TAM_TROZO bytes por defecto) es lo bastante grande para que el
+costo de serializar la tarea sea despreciable frente al cifrado en Python
+puro. Con procesos=1, o si la entrada cabe en un solo trozo, todo se procesa
+en el proceso actual con el mismo codigo (referencia de un solo hilo).
+
+Tamano de clave: 8 bytes -> DES, 16 bytes -> 3DES-EDE (2-key, K3=K1).
+El bloque de contador sigue la convencion de PyCryptodome (DES3.MODE_CTR):
+nonce de 0 a 7 bytes seguido del contador big-endian en los bytes restantes.
+"""
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Determinamos la raíz del proyecto para importar correctamente
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Al tener una carpeta con espacio ('ejercicio block'), añadimos su ruta al path
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils.cache_subclaves import CACHE_SUBCLAVES
+from des_stream import funciones_bloque
+from Crypto.Util.Padding import unpad
+
+
+# --- CONSTANTES ---
+DES_BLOCK_SIZE = 8                  # 64 bits
+TAM_TROZO = 64 * 1024               # 8192 bloques por tarea
+
+
+# --- TRABAJO DE CADA PROCESO ---
+
+def _xor_bytes(a, b):
+    """XOR de dos buffers del mismo tamano."""
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def _procesar_trozo(tarea):
+    """
+    Procesa un trozo de datos. Se ejecuta en los procesos del pool.
+
+    Args:
+        tarea: (operacion, key_bytes, datos, extra)
+            - 'ctr': extra = primer bloque de contador (entero)
+            - 'ecb_cifrar' / 'ecb_descifrar': extra = None
+            - 'cbc_descifrar': extra = bloque cifrado anterior (entero)
+
+    Returns:
+        bytes: Trozo procesado (mismo tamano que datos)
+    """
+    operacion, key_bytes, datos, extra = tarea
+    # Cada proceso tiene su propio CACHE_SUBCLAVES: el esquema se calcula
+    # una vez por proceso y se reutiliza en los trozos siguientes
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        cifrar_bloque, descifrar_bloque = funciones_bloque(esquema)
+
+        if operacion == 'ctr':
+            n = -(-len(datos) // DES_BLOCK_SIZE)
+            flujo = struct.pack(f'>{n}Q', *[cifrar_bloque(extra + i) for i in range(n)])
+            return _xor_bytes(datos, flujo[:len(datos)])
+
+        n = len(datos) // DES_BLOCK_SIZE
+        bloques = struct.unpack_from(f'>{n}Q', datos)
+
+        if operacion == 'ecb_cifrar':
+            salida = [cifrar_bloque(bloque) for bloque in bloques]
+        elif operacion == 'ecb_descifrar':
+            salida = [descifrar_bloque(bloque) for bloque in bloques]
+        elif operacion == 'cbc_descifrar':
+            anteriores = (extra,) + bloques[:-1]
+            salida = [descifrar_bloque(bloque) ^ anterior
+                      for bloque, anterior in zip(bloques, anteriores)]
+        else:
+            raise ValueError(f"Operacion desconocida: {operacion}")
+
+    return struct.pack(f'>{n}Q', *salida)
+
+
+def _ejecutar(tareas, procesos):
+    """Ejecuta las tareas en orden, en un pool si hay mas de una y mas de un proceso."""
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos < 1:
+        raise ValueError("procesos debe ser al menos 1")
+
+    if procesos == 1 or len(tareas) <= 1:
+        return b"".join(_procesar_trozo(tarea) for tarea in tareas)
+
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as pool:
+        return b"".join(pool.map(_procesar_trozo, tareas))
+
+
+def _validar(key_bytes, tam_trozo):
+    if len(key_bytes) not in (8, 16):
+        raise ValueError("La clave debe tener 8 bytes (DES) o 16 bytes (3DES)")
+    if tam_trozo <= 0 or tam_trozo % DES_BLOCK_SIZE:
+        raise ValueError("tam_trozo debe ser un multiplo positivo de 8")
+
+
+# --- MODO CTR ---
+
+def ctr_crypt(key_bytes, datos, nonce=b"", valor_inicial=0, procesos=None, tam_trozo=TAM_TROZO):
+    """
+    Cifra o descifra en modo CTR (la operacion es la misma).
+
+    Args:
+        key_bytes: 8 bytes (DES) o 16 bytes (3DES 2-key)
+        datos: Mensaje de cualquier longitud (sin padding)
+        nonce: Prefijo fijo del bloque de contador (0 a 7 bytes)
+        valor_inicial: Valor del contador para el primer bloque
+        procesos: Numero de procesos (None = os.cpu_count())
+        tam_trozo: Bytes por tarea (multiplo de 8)
+
+    Returns:
+        bytes: Resultado del mismo tamano que datos
+    """
+    _validar(key_bytes, tam_trozo)
+    if len(nonce) >= DES_BLOCK_SIZE:
+        raise ValueError("El nonce debe tener menos de 8 bytes")
+
+    bits_contador = 8 * (DES_BLOCK_SIZE - len(nonce))
+    bloques = -(-len(datos) // DES_BLOCK_SIZE)
+    if valor_inicial < 0 or valor_inicial + bloques > 1 << bits_contador:
+        raise ValueError("El contador se desbordaria con este nonce y tamano de mensaje")
+
+    base = (int.from_bytes(nonce, 'big') << bits_contador) + valor_inicial
+    datos = memoryview(datos).cast('B')
+    tareas = [('ctr', bytes(key_bytes), bytes(datos[i:i + tam_trozo]), base + i // DES_BLOCK_SIZE)
+              for i in range(0, len(datos), tam_trozo)]
+    return _ejecutar(tareas, procesos)
+
+
+# --- MODO ECB ---
+
+def _ecb(operacion, key_bytes, datos, procesos, tam_trozo):
+    _validar(key_bytes, tam_trozo)
+    if len(datos) % DES_BLOCK_SIZE:
+        raise ValueError("En ECB los datos deben ser multiplo de 8 bytes")
+    datos = memoryview(datos).cast('B')
+    tareas = [(operacion, bytes(key_bytes), bytes(datos[i:i + tam_trozo]), None)
+              for i in range(0, len(datos), tam_trozo)]
+    return _ejecutar(tareas, procesos)
+
+
+def ecb_encrypt(key_bytes, datos, procesos=None, tam_trozo=TAM_TROZO):
+    """Cifra en modo ECB, sin padding (datos multiplo de 8 bytes)."""
+    return _ecb('ecb_cifrar', key_bytes, datos, procesos, tam_trozo)
+
+
+def ecb_decrypt(key_bytes, datos, procesos=None, tam_trozo=TAM_TROZO):
+    """Descifra en modo ECB, sin quitar padding."""
+    return _ecb('ecb_descifrar', key_bytes, datos, procesos, tam_trozo)
+
+
+# --- DESCIFRADO CBC ---
+
+def cbc_decrypt(key_bytes, iv, ciphertext, procesos=None, tam_trozo=TAM_TROZO):
+    """
+    Descifra CBC en paralelo y quita el padding PKCS#7.
+
+    Cada trozo recibe el ultimo bloque cifrado del trozo anterior (o el IV)
+    para el XOR de su primer bloque.
+
+    Args:
+        key_bytes: 8 bytes (DES) o 16 bytes (3DES 2-key)
+        iv: IV de 8 bytes
+        ciphertext: Ciphertext (multiplo de 8 bytes, sin el IV)
+
+    Returns:
+        bytes: Mensaje original
+    """
+    _validar(key_bytes, tam_trozo)
+    if len(iv) != DES_BLOCK_SIZE:
+        raise ValueError("El IV debe tener 8 bytes")
+    if not ciphertext or len(ciphertext) % DES_BLOCK_SIZE:
+        raise ValueError("El ciphertext no es multiplo de 8 bytes")
+
+    datos = memoryview(ciphertext).cast('B')
+    tareas = []
+    for i in range(0, len(datos), tam_trozo):
+        anterior = datos[i - DES_BLOCK_SIZE:i] if i else iv
+        tareas.append(('cbc_descifrar', bytes(key_bytes), bytes(datos[i:i + tam_trozo]),
+                       int.from_bytes(anterior, 'big')))
+    return unpad(_ejecutar(tareas, procesos), DES_BLOCK_SIZE, style='pkcs7')
+
+
+# --- MAIN ---
+
+if __name__ == "__main__":
+    import time
+    from tripledes_cipher import generate_3des_key
+
+    key = generate_3des_key()
+    nonce = os.urandom(4)
+    mensaje = os.urandom(512 * 1024)
+
+    for procesos in (1, None):
+        inicio = time.perf_counter()
+        cifrado = ctr_crypt(key, mensaje, nonce, procesos=procesos)
+        segundos = time.perf_counter() - inicio
+        etiqueta = procesos or os.cpu_count()
+        print(f"3DES-CTR {len(mensaje) // 1024} KB con {etiqueta} proceso(s): {segundos:.2f} s")
+
+    recuperado = ctr_crypt(key, cifrado, nonce)
+    print(f"Verificacion: {'OK' if recuperado == mensaje else 'FALLO'}")
@@ -0,0 +1,299 @@
+"""
+des_stream.py - Cifrado incremental DES / 3DES-EDE en modo CBC sobre bytes.
+
+A diferencia de des_cipher.py y tripledes_cipher.py, este modulo no convierte
+el mensaje en listas de cadenas binarias: recibe y produce trozos de bytes
+(bytes, bytearray o memoryview) y usa el motor de enteros de utils/des_int.py.
+
+- update(chunk): procesa todos los bloques completos disponibles
+- finalize(): aplica / valida el padding PKCS#7 del ultimo bloque
+- cerrar() o un bloque with: liberan la clave si el flujo se abandona
+
+Tamano de clave:
+- 8 bytes  -> DES
+- 16 bytes -> 3DES-EDE (2-key, K3=K1), igual que tripledes_cipher.py
+
+Formato de archivo (igual a pack_ciphertext_with_iv): IV (8 bytes) + Ciphertext
+"""
+import os
+import struct
+import sys
+
+# Determinamos la raíz del proyecto para importar correctamente
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Al tener una carpeta con espacio ('ejercicio block'), añadimos su ruta al path
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils.des_int import des_block_encrypt_int
+from utils.cache_subclaves import CACHE_SUBCLAVES
+from Crypto.Util.Padding import pad, unpad
+
+
+# --- CONSTANTES ---
+DES_BLOCK_SIZE = 8                  # 64 bits
+TAM_CHUNK_ARCHIVO = 1024 * 1024     # 1 MiB por lectura
+
+
+# --- PREPARACION DE CLAVES ---
+
+def funciones_bloque(esquema):
+    """
+    Retorna (cifrar, descifrar) de un bloque entero para DES o 3DES.
+
+    Descifrar DES equivale a cifrar con las subclaves en orden inverso, asi
+    que se usan las listas int_inv ya calculadas en el cache.
+    """
+    k1, k2 = esquema.k1, esquema.k2
+    if k2 is None:
+        return (lambda bloque: des_block_encrypt_int(bloque, k1.int),
+                lambda bloque: des_block_encrypt_int(bloque, k1.int_inv))
+
+    # 3DES-EDE: E(K1) -> D(K2) -> E(K1) y su inversa D(K1) -> E(K2) -> D(K1)
+    return (lambda bloque: des_block_encrypt_int(
+                des_block_encrypt_int(des_block_encrypt_int(bloque, k1.int), k2.int_inv), k1.int),
+            lambda bloque: des_block_encrypt_int(
+                des_block_encrypt_int(des_block_encrypt_int(bloque, k1.int_inv), k2.int), k1.int_inv))
+
+
+class _CBCBase:
+    """Estado comun: subclaves, bloque anterior (IV) y bytes pendientes."""
+
+    def __init__(self, key_bytes, iv):
+        if len(iv) != DES_BLOCK_SIZE:
+            raise ValueError("El IV debe tener 8 bytes")
+        # Subclaves desde el cache LRU; la reserva se libera en finalize(),
+        # cerrar(), al salir del bloque with o si update() falla
+        self._esquema = CACHE_SUBCLAVES.reservar(key_bytes)
+        self._cifrar_bloque, self._descifrar_bloque = funciones_bloque(self._esquema)
+        self.iv = bytes(iv)
+        self._anterior = int.from_bytes(self.iv, 'big')
+        self._pendiente = bytearray()
+        self._finalizado = False
+
+    def _verificar_abierto(self):
+        if self._finalizado:
+            raise ValueError("finalize() ya fue llamado")
+
+    def _cerrar(self):
+        """Marca el objeto como finalizado y libera el esquema de claves una sola vez."""
+        self._pendiente.clear()
+        self._finalizado = True
+        if self._esquema is not None:
+            CACHE_SUBCLAVES.liberar(self._esquema)
+            self._esquema = None
+
+    def cerrar(self):
+        """Abandona el flujo sin producir salida y libera la clave."""
+        self._cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cerrar()
+
+
+class CBCEncryptor(_CBCBase):
+    """
+    Cifrador incremental CBC.
+
+    C[i] = E(P[i] XOR C[i-1]), con C[0] = IV. El IV no se incluye en la
+    salida de update(); se obtiene de self.iv.
+    """
+
+    def __init__(self, key_bytes, iv=None):
+        super().__init__(key_bytes, os.urandom(DES_BLOCK_SIZE) if iv is None else iv)
+
+    def _cifrar(self, datos):
+        """Cifra un buffer cuyo tamano es multiplo de 8 bytes."""
+        n = len(datos) // DES_BLOCK_SIZE
+        if n == 0:
+            return b""
+        cifrar_bloque = self._cifrar_bloque
+        anterior = self._anterior
+        salida = []
+        for bloque in struct.unpack_from(f'>{n}Q', datos):
+            anterior = cifrar_bloque(bloque ^ anterior)
+            salida.append(anterior)
+        self._anterior = anterior
+        return struct.pack(f'>{n}Q', *salida)
+
+    def update(self, chunk):
+        """Cifra los bloques completos disponibles y guarda el resto."""
+        self._verificar_abierto()
+        try:
+            return self._update(chunk)
+        except BaseException:
+            self._cerrar()
+            raise
+
+    def _update(self, chunk):
+        datos = memoryview(chunk).cast('B')
+        partes = []
+
+        # Completar primero el bloque pendiente de la llamada anterior
+        if self._pendiente:
+            faltan = DES_BLOCK_SIZE - len(self._pendiente)
+            self._pendiente += datos[:faltan]
+            datos = datos[faltan:]
+            if len(self._pendiente) < DES_BLOCK_SIZE:
+                return b""
+            partes.append(self._cifrar(self._pendiente))
+            self._pendiente.clear()
+
+        completos = len(datos) - len(datos) % DES_BLOCK_SIZE
+        partes.append(self._cifrar(datos[:completos]))
+        self._pendiente += datos[completos:]
+        return b"".join(partes)
+
+    def finalize(self):
+        """Aplica padding PKCS#7 a los bytes pendientes y cifra el ultimo bloque."""
+        self._verificar_abierto()
+        try:
+            return self._cifrar(pad(bytes(self._pendiente), DES_BLOCK_SIZE, style='pkcs7'))
+        finally:
+            self._cerrar()
+
+
+class CBCDecryptor(_CBCBase):
+    """
+    Descifrador incremental CBC.
+
+    P[i] = D(C[i]) XOR C[i-1]. El ultimo bloque se retiene hasta finalize()
+    para poder quitar el padding PKCS#7.
+    """
+
+    def _descifrar(self, datos):
+        """Descifra un buffer cuyo tamano es multiplo de 8 bytes."""
+        n = len(datos) // DES_BLOCK_SIZE
+        if n == 0:
+            return b""
+        descifrar_bloque = self._descifrar_bloque
+        anterior = self._anterior
+        salida = []
+        for bloque in struct.unpack_from(f'>{n}Q', datos):
+            salida.append(descifrar_bloque(bloque) ^ anterior)
+            anterior = bloque
+        self._anterior = anterior
+        return struct.pack(f'>{n}Q', *salida)
+
+    def update(self, chunk):
+        """Descifra los bloques completos disponibles, reteniendo el ultimo."""
+        self._verificar_abierto()
+        try:
+            return self._update(chunk)
+        except BaseException:
+            self._cerrar()
+            raise
+
+    def _update(self, chunk):
+        datos = memoryview(chunk).cast('B')
+        if not datos:
+            return b""
+        partes = []
+
+        if self._pendiente:
+            faltan = -len(self._pendiente) % DES_BLOCK_SIZE
+            self._pendiente += datos[:faltan]
+            datos = datos[faltan:]
+            if not datos:
+                # Sin datos nuevos despues del bloque: puede ser el ultimo
+                return b""
+            partes.append(self._descifrar(self._pendiente))
+            self._pendiente.clear()
+
+        # Retener el ultimo bloque completo (o el parcial) para la siguiente llamada
+        resto = len(datos) % DES_BLOCK_SIZE or DES_BLOCK_SIZE
+        completos = len(datos) - resto
+        partes.append(self._descifrar(datos[:completos]))
+        self._pendiente += datos[completos:]
+        return b"".join(partes)
+
+    def finalize(self):
+        """Descifra el ultimo bloque y quita el padding PKCS#7."""
+        self._verificar_abierto()
+        completo = len(self._pendiente) == DES_BLOCK_SIZE
+        try:
+            ultimo = self._descifrar(self._pendiente) if completo else b""
+        finally:
+            self._cerrar()
+        if not completo:
+            raise ValueError("El ciphertext no es multiplo de 8 bytes")
+        return unpad(ultimo, DES_BLOCK_SIZE, style='pkcs7')
+
+
+# --- FUNCIONES DE ARCHIVO ---
+
+def _copiar_transformando(entrada, salida, transformador, tam_chunk):
+    """Lee la entrada por trozos reutilizando un buffer y escribe la salida."""
+    buffer = bytearray(tam_chunk)
+    vista = memoryview(buffer)
+    while True:
+        leidos = entrada.readinto(buffer)
+        if not leidos:
+            break
+        salida.write(transformador.update(vista[:leidos]))
+    salida.write(transformador.finalize())
+
+
+def cifrar_archivo(ruta_entrada, ruta_salida, key_bytes, iv=None, tam_chunk=TAM_CHUNK_ARCHIVO):
+    """
+    Cifra un archivo en modo CBC con memoria constante.
+
+    Formato de salida: IV (8 bytes) + Ciphertext
+
+    Returns:
+        bytes: IV usado
+    """
+    with CBCEncryptor(key_bytes, iv) as cifrador, \
+            open(ruta_entrada, 'rb') as entrada, open(ruta_salida, 'wb') as salida:
+        salida.write(cifrador.iv)
+        _copiar_transformando(entrada, salida, cifrador, tam_chunk)
+    return cifrador.iv
+
+
+def descifrar_archivo(ruta_entrada, ruta_salida, key_bytes, tam_chunk=TAM_CHUNK_ARCHIVO):
+    """Descifra un archivo con formato IV (8 bytes) + Ciphertext."""
+    with open(ruta_entrada, 'rb') as entrada, open(ruta_salida, 'wb') as salida:
+        iv = entrada.read(DES_BLOCK_SIZE)
+        with CBCDecryptor(key_bytes, iv) as descifrador:
+            _copiar_transformando(entrada, salida, descifrador, tam_chunk)
+
+
+# --- MAIN ---
+
+if __name__ == "__main__":
+    import tempfile
+    from tripledes_cipher import generate_3des_key
+
+    key = generate_3des_key()
+    mensaje = os.urandom(64 * 1024 + 3)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        original = os.path.join(directorio, 'original.bin')
+        cifrado = os.path.join(directorio, 'cifrado.bin')
+        descifrado = os.path.join(directorio, 'descifrado.bin')
+
+        with open(original, 'wb') as f:
+            f.write(mensaje)
+
+        iv = cifrar_archivo(original, cifrado, key, tam_chunk=4096)
+        descifrar_archivo(cifrado, descifrado, key, tam_chunk=4096)
+
+        with open(descifrado, 'rb') as f:
+            recuperado = f.read()
+
+        print(f"Clave 3DES (hex): {key.hex()}")
+        print(f"IV (hex): {iv.hex()}")
+        print(f"Tamano original: {len(mensaje)} bytes")
+        print(f"Tamano cifrado: {os.path.getsize(cifrado)} bytes (IV + Ciphertext)")
+        print(f"Verificacion: {'OK' if recuperado == mensaje else 'FALLO'}")
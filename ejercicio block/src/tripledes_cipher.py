@@ -29,9 +29,9 @@ if EJERCICIO_BLOCK_DIR not in sys.path:
     sys.path.insert(0, EJERCICIO_BLOCK_DIR)
 
 from utils.utils import ascii_to_bin, bytes_to_bin, bin_to_bytes, xor_blocks
-from utils.des_core import (
-    generar_subclaves, des_block_encrypt, des_block_decrypt, bin_to_hex
-)
+from utils.des_core import des_block_encrypt, des_block_decrypt, bin_to_hex
+from utils.cache_subclaves import CACHE_SUBCLAVES
+from utils.trazas import ImpresorTrazas
 from Crypto.Util.Padding import pad, unpad
 
 
@@ -52,7 +52,7 @@ def read_txt(file_name):
     return data
 
 
-def generar_bloques_64bits(data_bytes):
+def generar_bloques_64bits(data_bytes, observador=None):
     """Aplica padding PKCS#7 usando Crypto.Util.Padding y divide en bloques de 64 bits."""
     bloques_binarios = []
     
@@ -71,7 +71,9 @@ def generar_bloques_64bits(data_bytes):
         bloque_64 = "".join(bin_list)
         bloques_binarios.append(bloque_64)
         
-    print(f"\nTotal de bloques de 64 bits generados: {len(bloques_binarios)}")
+    if observador is not None:
+        observador.mensaje(f"Total de bloques de 64 bits generados: {len(bloques_binarios)}",
+                           separado=True)
     return bloques_binarios
 
 
@@ -114,7 +116,8 @@ def generate_iv():
 
 # --- FUNCIONES 3DES-EDE POR BLOQUE ---
 
-def triple_des_encrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=True, block_num=1):
+def triple_des_encrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=False, block_num=1,
+                             observador=None):
     """
     Cifra un bloque usando 3DES-EDE: E(K1) -> D(K2) -> E(K1).
     Total: 48 rondas (16 + 16 + 16).
@@ -123,48 +126,51 @@ def triple_des_encrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=True, b
         bloque: Bloque binario de 64 bits
         k1_subclaves: 16 subclaves de K1
         k2_subclaves: 16 subclaves de K2
-        verbose: Si True, imprime detalle de cada ronda
+        verbose: Si True, imprime detalle de cada ronda (atajo para ImpresorTrazas)
         block_num: Número de bloque (para el output)
+        observador: ObservadorCifrado que recibe el detalle; None no formatea nada
     
     Returns:
         Bloque cifrado de 64 bits
     """
-    if verbose:
-        print(f"\n{'='*60}")
-        print(f"3DES-EDE ENCRYPTION - Block {block_num}")
-        print(f"{'='*60}")
+    if verbose and observador is None:
+        observador = ImpresorTrazas()
+
+    if observador is not None:
+        observador.seccion(f"3DES-EDE ENCRYPTION - Block {block_num}")
     
     # --- PASO 1: ENCRYPT con K1 (Rondas 1-16) ---
-    if verbose:
-        print(f"\n--- ENCRYPT with K1 (Rounds 1-16) ---")
+    if observador is not None:
+        observador.subseccion("ENCRYPT with K1 (Rounds 1-16)")
     
-    bloque_e1 = des_block_encrypt(bloque, k1_subclaves, verbose=verbose, round_offset=0)
+    bloque_e1 = des_block_encrypt(bloque, k1_subclaves, round_offset=0, observador=observador)
     
-    if verbose:
-        print(f"After E1 (K1): {bin_to_hex(bloque_e1)}")
+    if observador is not None:
+        observador.valor("After E1 (K1)", bloque_e1)
     
     # --- PASO 2: DECRYPT con K2 (Rondas 17-32) ---
-    if verbose:
-        print(f"\n--- DECRYPT with K2 (Rounds 17-32) ---")
+    if observador is not None:
+        observador.subseccion("DECRYPT with K2 (Rounds 17-32)")
     
-    bloque_d = des_block_decrypt(bloque_e1, k2_subclaves, verbose=verbose, round_offset=16)
+    bloque_d = des_block_decrypt(bloque_e1, k2_subclaves, round_offset=16, observador=observador)
     
-    if verbose:
-        print(f"After D (K2): {bin_to_hex(bloque_d)}")
+    if observador is not None:
+        observador.valor("After D (K2)", bloque_d)
     
     # --- PASO 3: ENCRYPT con K1 (Rondas 33-48) ---
-    if verbose:
-        print(f"\n--- ENCRYPT with K1 (Rounds 33-48) ---")
+    if observador is not None:
+        observador.subseccion("ENCRYPT with K1 (Rounds 33-48)")
     
-    bloque_e2 = des_block_encrypt(bloque_d, k1_subclaves, verbose=verbose, round_offset=32)
+    bloque_e2 = des_block_encrypt(bloque_d, k1_subclaves, round_offset=32, observador=observador)
     
-    if verbose:
-        print(f"After E2 (K1): {bin_to_hex(bloque_e2)}")
+    if observador is not None:
+        observador.valor("After E2 (K1)", bloque_e2)
     
     return bloque_e2
 
 
-def triple_des_decrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=True, block_num=1):
+def triple_des_decrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=False, block_num=1,
+                             observador=None):
     """
     Descifra un bloque usando 3DES-DED: D(K1) -> E(K2) -> D(K1).
     Total: 48 rondas (16 + 16 + 16).
@@ -174,50 +180,52 @@ def triple_des_decrypt_block(bloque, k1_subclaves, k2_subclaves, verbose=True, b
         bloque: Bloque cifrado de 64 bits
         k1_subclaves: 16 subclaves de K1
         k2_subclaves: 16 subclaves de K2
-        verbose: Si True, imprime detalle de cada ronda
+        verbose: Si True, imprime detalle de cada ronda (atajo para ImpresorTrazas)
         block_num: Número de bloque (para el output)
+        observador: ObservadorCifrado que recibe el detalle; None no formatea nada
     
     Returns:
         Bloque descifrado de 64 bits
     """
-    if verbose:
-        print(f"\n{'='*60}")
-        print(f"3DES-DED DECRYPTION - Block {block_num}")
-        print(f"{'='*60}")
+    if verbose and observador is None:
+        observador = ImpresorTrazas()
+
+    if observador is not None:
+        observador.seccion(f"3DES-DED DECRYPTION - Block {block_num}")
     
     # --- PASO 1: DECRYPT con K1 (Rondas 1-16) ---
-    if verbose:
-        print(f"\n--- DECRYPT with K1 (Rounds 1-16) ---")
+    if observador is not None:
+        observador.subseccion("DECRYPT with K1 (Rounds 1-16)")
     
-    bloque_d1 = des_block_decrypt(bloque, k1_subclaves, verbose=verbose, round_offset=0)
+    bloque_d1 = des_block_decrypt(bloque, k1_subclaves, round_offset=0, observador=observador)
     
-    if verbose:
-        print(f"After D1 (K1): {bin_to_hex(bloque_d1)}")
+    if observador is not None:
+        observador.valor("After D1 (K1)", bloque_d1)
     
     # --- PASO 2: ENCRYPT con K2 (Rondas 17-32) ---
-    if verbose:
-        print(f"\n--- ENCRYPT with K2 (Rounds 17-32) ---")
+    if observador is not None:
+        observador.subseccion("ENCRYPT with K2 (Rounds 17-32)")
     
-    bloque_e = des_block_encrypt(bloque_d1, k2_subclaves, verbose=verbose, round_offset=16)
+    bloque_e = des_block_encrypt(bloque_d1, k2_subclaves, round_offset=16, observador=observador)
     
-    if verbose:
-        print(f"After E (K2): {bin_to_hex(bloque_e)}")
+    if observador is not None:
+        observador.valor("After E (K2)", bloque_e)
     
     # --- PASO 3: DECRYPT con K1 (Rondas 33-48) ---
-    if verbose:
-        print(f"\n--- DECRYPT with K1 (Rounds 33-48) ---")
+    if observador is not None:
+        observador.subseccion("DECRYPT with K1 (Rounds 33-48)")
     
-    bloque_d2 = des_block_decrypt(bloque_e, k1_subclaves, verbose=verbose, round_offset=32)
+    bloque_d2 = des_block_decrypt(bloque_e, k1_subclaves, round_offset=32, observador=observador)
     
-    if verbose:
-        print(f"After D2 (K1): {bin_to_hex(bloque_d2)}")
+    if observador is not None:
+        observador.valor("After D2 (K1)", bloque_d2)
     
     return bloque_d2
 
 
 # --- FUNCIONES 3DES-CBC ---
 
-def triple_des_cbc_encrypt(bloques_binarios, key_bytes=None, iv=None):
+def triple_des_cbc_encrypt(bloques_binarios, key_bytes=None, iv=None, observador=None):
     """
     Cifra bloques usando 3DES-EDE en modo CBC.
     
@@ -229,6 +237,7 @@ def triple_des_cbc_encrypt(bloques_binarios, key_bytes=None, iv=None):
         bloques_binarios: Lista de bloques de 64 bits
         key_bytes: Clave de 16 bytes (si None, se genera)
         iv: Vector de inicialización de 64 bits (si None, se genera)
+        observador: ObservadorCifrado que recibe el detalle; None no formatea nada
     
     Returns:
         tuple: (bloques_cifrados, key_bytes, iv)
@@ -244,46 +253,46 @@ def triple_des_cbc_encrypt(bloques_binarios, key_bytes=None, iv=None):
     # Obtener K1 y K2 en binario
     k1_bin, k2_bin = split_3des_key(key_bytes)
     
-    # Generar subclaves para K1 y K2
-    k1_subclaves = generar_subclaves(k1_bin)
-    k2_subclaves = generar_subclaves(k2_bin)
-    
     # Mostrar información de claves
-    print(f"\n{'='*60}")
-    print("3DES-CBC ENCRYPTION")
-    print(f"{'='*60}")
-    print(f"Key K1 (64 bits): {bin_to_hex(k1_bin)}")
-    print(f"Key K2 (64 bits): {bin_to_hex(k2_bin)}")
-    print(f"Combined Key (112 bits effective): {bin_to_hex(k1_bin)}{bin_to_hex(k2_bin)}")
-    print(f"IV (64 bits): {bin_to_hex(iv)}")
+    if observador is not None:
+        observador.seccion("3DES-CBC ENCRYPTION")
+        observador.valor("Key K1 (64 bits)", k1_bin)
+        observador.valor("Key K2 (64 bits)", k2_bin)
+        observador.valor("Combined Key (112 bits effective)", k1_bin + k2_bin)
+        observador.valor("IV (64 bits)", iv)
     
     bloques_cifrados = []
     bloque_anterior = iv  # El primer bloque usa el IV
     
-    for i, bloque in enumerate(bloques_binarios):
-        # XOR del bloque actual con el bloque anterior (o IV para el primero)
-        bloque_xor = xor_blocks(bloque, bloque_anterior)
-        
-        if i == 0:
-            print(f"\nBlock {i+1}: P XOR IV = {bin_to_hex(bloque_xor)}")
-        else:
-            print(f"\nBlock {i+1}: P XOR C[{i}] = {bin_to_hex(bloque_xor)}")
+    # Subclaves de K1 y K2 desde el cache LRU (se calculan solo la primera vez)
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        k1_subclaves = esquema.k1.bin
+        k2_subclaves = esquema.k2.bin
         
-        # Cifrar con 3DES-EDE
-        bloque_cifrado = triple_des_encrypt_block(
-            bloque_xor, k1_subclaves, k2_subclaves, 
-            verbose=True, block_num=i+1
-        )
-        
-        print(f"\nCipher Text Block {i+1}: {bin_to_hex(bloque_cifrado)}")
-        
-        bloques_cifrados.append(bloque_cifrado)
-        bloque_anterior = bloque_cifrado  # El siguiente bloque usará este ciphertext
+        for i, bloque in enumerate(bloques_binarios):
+            # XOR del bloque actual con el bloque anterior (o IV para el primero)
+            bloque_xor = xor_blocks(bloque, bloque_anterior)
+            
+            if observador is not None:
+                anterior = "IV" if i == 0 else f"C[{i}]"
+                observador.valor(f"Block {i+1}: P XOR {anterior}", bloque_xor, separado=True)
+            
+            # Cifrar con 3DES-EDE
+            bloque_cifrado = triple_des_encrypt_block(
+                bloque_xor, k1_subclaves, k2_subclaves, 
+                block_num=i+1, observador=observador
+            )
+            
+            if observador is not None:
+                observador.valor(f"Cipher Text Block {i+1}", bloque_cifrado, separado=True)
+            
+            bloques_cifrados.append(bloque_cifrado)
+            bloque_anterior = bloque_cifrado  # El siguiente bloque usará este ciphertext
     
     return bloques_cifrados, key_bytes, iv
 
 
-def triple_des_cbc_decrypt(bloques_cifrados, key_bytes, iv):
+def triple_des_cbc_decrypt(bloques_cifrados, key_bytes, iv, observador=None):
     """
     Descifra bloques usando 3DES-DED en modo CBC.
     
@@ -295,6 +304,7 @@ def triple_des_cbc_decrypt(bloques_cifrados, key_bytes, iv):
         bloques_cifrados: Lista de bloques cifrados de 64 bits
         key_bytes: Clave de 16 bytes
         iv: Vector de inicialización de 64 bits
+        observador: ObservadorCifrado que recibe el detalle; None no formatea nada
     
     Returns:
         Lista de bloques descifrados
@@ -302,40 +312,38 @@ def triple_des_cbc_decrypt(bloques_cifrados, key_bytes, iv):
     # Obtener K1 y K2 en binario
     k1_bin, k2_bin = split_3des_key(key_bytes)
     
-    # Generar subclaves para K1 y K2
-    k1_subclaves = generar_subclaves(k1_bin)
-    k2_subclaves = generar_subclaves(k2_bin)
-    
     # Mostrar información de claves
-    print(f"\n{'='*60}")
-    print("3DES-CBC DECRYPTION")
-    print(f"{'='*60}")
-    print(f"Key K1 (64 bits): {bin_to_hex(k1_bin)}")
-    print(f"Key K2 (64 bits): {bin_to_hex(k2_bin)}")
-    print(f"IV (64 bits): {bin_to_hex(iv)}")
+    if observador is not None:
+        observador.seccion("3DES-CBC DECRYPTION")
+        observador.valor("Key K1 (64 bits)", k1_bin)
+        observador.valor("Key K2 (64 bits)", k2_bin)
+        observador.valor("IV (64 bits)", iv)
     
     bloques_descifrados = []
     bloque_anterior = iv  # El primer bloque usa el IV
     
-    for i, bloque in enumerate(bloques_cifrados):
-        # Descifrar con 3DES-DED
-        bloque_des = triple_des_decrypt_block(
-            bloque, k1_subclaves, k2_subclaves,
-            verbose=True, block_num=i+1
-        )
-        
-        # XOR con el bloque anterior (o IV para el primero)
-        bloque_descifrado = xor_blocks(bloque_des, bloque_anterior)
-        
-        if i == 0:
-            print(f"\nBlock {i+1}: D XOR IV = {bin_to_hex(bloque_descifrado)}")
-        else:
-            print(f"\nBlock {i+1}: D XOR C[{i}] = {bin_to_hex(bloque_descifrado)}")
+    # Subclaves de K1 y K2 desde el cache LRU (se calculan solo la primera vez)
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        k1_subclaves = esquema.k1.bin
+        k2_subclaves = esquema.k2.bin
         
-        print(f"Plain Text Block {i+1}: {bin_to_hex(bloque_descifrado)}")
-        
-        bloques_descifrados.append(bloque_descifrado)
-        bloque_anterior = bloque  # El siguiente bloque usará el ciphertext actual
+        for i, bloque in enumerate(bloques_cifrados):
+            # Descifrar con 3DES-DED
+            bloque_des = triple_des_decrypt_block(
+                bloque, k1_subclaves, k2_subclaves,
+                block_num=i+1, observador=observador
+            )
+            
+            # XOR con el bloque anterior (o IV para el primero)
+            bloque_descifrado = xor_blocks(bloque_des, bloque_anterior)
+            
+            if observador is not None:
+                anterior = "IV" if i == 0 else f"C[{i}]"
+                observador.valor(f"Block {i+1}: D XOR {anterior}", bloque_descifrado, separado=True)
+                observador.valor(f"Plain Text Block {i+1}", bloque_descifrado)
+            
+            bloques_descifrados.append(bloque_descifrado)
+            bloque_anterior = bloque  # El siguiente bloque usará el ciphertext actual
     
     return bloques_descifrados
 
@@ -362,10 +370,8 @@ def pack_ciphertext_with_iv(bloques_cifrados, iv):
     # Convertir IV de binario a bytes
     iv_bytes = bin_to_bytes(iv)
     
-    # Convertir bloques cifrados de binario a bytes
-    ciphertext_bytes = b""
-    for bloque in bloques_cifrados:
-        ciphertext_bytes += bin_to_bytes(bloque)
+    # Convertir bloques cifrados de binario a bytes (join evita copias cuadraticas)
+    ciphertext_bytes = b"".join(bin_to_bytes(bloque) for bloque in bloques_cifrados)
     
     # Empaquetado: IV primero, luego ciphertext
     return iv_bytes + ciphertext_bytes
@@ -406,21 +412,26 @@ if __name__ == "__main__":
     print("TRIPLE DES (3DES-EDE) CON MODO CBC")
     print("="*60)
     
+    # Mostrar el detalle de cada ronda en consola
+    trazas = ImpresorTrazas()
+    
     datos = read_txt('3des.txt')
     
     # 2. Generar bloques de 64 bits con padding
-    lista_de_bloques = generar_bloques_64bits(datos)
+    lista_de_bloques = generar_bloques_64bits(datos, observador=trazas)
     
     # 3. Cifrar con 3DES-CBC (48 rondas por bloque)
-    bloques_cifrados, clave_usada, iv_usado = triple_des_cbc_encrypt(lista_de_bloques)
+    bloques_cifrados, clave_usada, iv_usado = triple_des_cbc_encrypt(
+        lista_de_bloques, observador=trazas
+    )
     
     # 4. Descifrar con 3DES-CBC (verificación)
-    bloques_descifrados = triple_des_cbc_decrypt(bloques_cifrados, clave_usada, iv_usado)
+    bloques_descifrados = triple_des_cbc_decrypt(
+        bloques_cifrados, clave_usada, iv_usado, observador=trazas
+    )
     
     # 5. Convertir bloques descifrados a bytes y remover padding
-    mensaje_descifrado_bytes = b""
-    for bloque in bloques_descifrados:
-        mensaje_descifrado_bytes += bin_to_bytes(bloque)
+    mensaje_descifrado_bytes = b"".join(bin_to_bytes(bloque) for bloque in bloques_descifrados)
     
     mensaje_descifrado_bytes = remove_padding_pkcs7(mensaje_descifrado_bytes)
     
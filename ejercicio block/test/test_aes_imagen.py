@@ -0,0 +1,162 @@
+"""
+test_aes_imagen.py - Pruebas del cifrado de imagenes en una sola llamada (src/aes_cipher.py).
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from Crypto.Cipher import AES
+from PIL import Image
+
+from aes_cipher import (
+    encrypt_image_ecb, encrypt_image_cbc, decrypt_image, generate_aes_key,
+    generate_iv, get_bmp_header_size, encrypt_bmp_mmap, decrypt_bmp_mmap,
+    _transformar_bmp_mmap
+)
+
+
+def transformar_bloque_por_bloque(funcion, pixeles):
+    """Version original: bloque por bloque, ultimo bloque con ceros y truncado."""
+    salida = bytearray()
+    for i in range(0, len(pixeles), 16):
+        block = pixeles[i:i+16]
+        resto = len(block)
+        salida.extend(funcion(block + bytes(16 - resto))[:resto])
+    return bytes(salida)
+
+
+class PruebasImagenAES(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.key = generate_aes_key()
+        self.iv = generate_iv()
+        self.entrada = self.ruta('entrada.png')
+        # 3x3 RGB: filas de 12 bytes -> 36 bytes de pixeles, deja un bloque incompleto
+        Image.frombytes('RGB', (3, 3), os.urandom(27)).save(self.entrada)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio.name, nombre)
+
+    def pixeles(self, ruta):
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        return datos[:get_bmp_header_size(datos)], datos[get_bmp_header_size(datos):]
+
+    def test_ecb_igual_a_bloque_por_bloque(self):
+        encrypt_image_ecb(self.entrada, self.ruta('ecb.bmp'), self.key)
+        Image.open(self.entrada).save(self.ruta('original.bmp'), 'BMP')
+
+        header, originales = self.pixeles(self.ruta('original.bmp'))
+        header_cifrado, cifrados = self.pixeles(self.ruta('ecb.bmp'))
+        self.assertEqual(len(originales) % 16, 4)
+        self.assertEqual(header_cifrado, header)
+        esperado = transformar_bloque_por_bloque(AES.new(self.key, AES.MODE_ECB).encrypt, originales)
+        self.assertEqual(cifrados, esperado)
+
+    def test_cbc_igual_a_bloque_por_bloque(self):
+        encrypt_image_cbc(self.entrada, self.ruta('cbc.bmp'), self.key, self.iv)
+        Image.open(self.entrada).save(self.ruta('original.bmp'), 'BMP')
+
+        _, originales = self.pixeles(self.ruta('original.bmp'))
+        _, cifrados = self.pixeles(self.ruta('cbc.bmp'))
+        cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
+        self.assertEqual(cifrados, transformar_bloque_por_bloque(cipher.encrypt, originales))
+
+    def test_descifrado_en_el_mismo_buffer(self):
+        for modo in ('ecb', 'cbc'):
+            cifrada = self.ruta(f'{modo}.bmp')
+            if modo == 'ecb':
+                encrypt_image_ecb(self.entrada, cifrada, self.key)
+                cipher = AES.new(self.key, AES.MODE_ECB)
+            else:
+                encrypt_image_cbc(self.entrada, cifrada, self.key, self.iv)
+                cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
+
+            decrypt_image(cifrada, self.ruta('descifrada.bmp'), self.key, modo, self.iv)
+            header, cifrados = self.pixeles(cifrada)
+            header_descifrado, descifrados = self.pixeles(self.ruta('descifrada.bmp'))
+            self.assertEqual(header_descifrado, header)
+            self.assertEqual(descifrados, transformar_bloque_por_bloque(cipher.decrypt, cifrados))
+
+
+class PruebasImagenMmap(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.key = generate_aes_key()
+        self.iv = generate_iv()
+        self.entrada = self.ruta('entrada.bmp')
+        # 41x201 RGB: 24924 bytes de pixeles, varios trozos de 4096 y un bloque incompleto
+        Image.frombytes('RGB', (41, 201), os.urandom(41 * 201 * 3)).save(self.entrada, 'BMP')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio.name, nombre)
+
+    def leer(self, ruta):
+        with open(ruta, 'rb') as f:
+            return f.read()
+
+    def test_igual_a_la_version_en_memoria(self):
+        esperado_ecb = encrypt_image_ecb(self.entrada, self.ruta('ecb.bmp'), self.key)
+        esperado_cbc, _ = encrypt_image_cbc(self.entrada, self.ruta('cbc.bmp'), self.key, self.iv)
+
+        encrypt_bmp_mmap(self.entrada, self.ruta('ecb_mmap.bmp'), self.key, 'ecb', tam_chunk=4096)
+        encrypt_bmp_mmap(self.entrada, self.ruta('cbc_mmap.bmp'), self.key, 'cbc', self.iv,
+                         tam_chunk=4096)
+        self.assertEqual(self.leer(self.ruta('ecb_mmap.bmp')), esperado_ecb)
+        self.assertEqual(self.leer(self.ruta('cbc_mmap.bmp')), esperado_cbc)
+
+        decrypt_image(self.ruta('cbc.bmp'), self.ruta('descifrada.bmp'), self.key, 'cbc', self.iv)
+        decrypt_bmp_mmap(self.ruta('cbc.bmp'), self.ruta('descifrada_mmap.bmp'), self.key, 'cbc',
+                         self.iv, tam_chunk=4096)
+        self.assertEqual(self.leer(self.ruta('descifrada_mmap.bmp')),
+                         self.leer(self.ruta('descifrada.bmp')))
+
+    def test_en_el_lugar(self):
+        esperado, _ = encrypt_image_cbc(self.entrada, self.ruta('cbc.bmp'), self.key, self.iv)
+        iv = encrypt_bmp_mmap(self.entrada, self.entrada, self.key, 'cbc', self.iv, tam_chunk=8192)
+        self.assertEqual(iv, self.iv)
+        self.assertEqual(self.leer(self.entrada), esperado)
+
+    def test_entrada_no_bmp(self):
+        ruta = self.ruta('imagen.png')
+        Image.open(self.entrada).save(ruta, 'PNG')
+        with self.assertRaises(ValueError):
+            encrypt_bmp_mmap(ruta, self.ruta('salida.bmp'), self.key)
+
+    def test_entrada_vacia(self):
+        ruta = self.ruta('vacia.bmp')
+        open(ruta, 'wb').close()
+        with self.assertRaisesRegex(ValueError, "vacio"):
+            encrypt_bmp_mmap(ruta, self.ruta('salida.bmp'), self.key)
+        self.assertFalse(os.path.exists(self.ruta('salida.bmp')))
+
+    def test_error_a_mitad_no_deja_salida(self):
+        class CifradorQueFalla:
+            llamadas = 0
+
+            def encrypt(self, datos, output=None):
+                self.llamadas += 1
+                if self.llamadas > 1:
+                    raise RuntimeError("falla simulada")
+                return AES.new(os.urandom(32), AES.MODE_ECB).encrypt(datos, output=output)
+
+        salida = self.ruta('salida.bmp')
+        with self.assertRaises(RuntimeError):
+            _transformar_bmp_mmap(self.entrada, salida, CifradorQueFalla(), 'encrypt', 4096)
+        self.assertFalse(os.path.exists(salida))
+
+
+if __name__ == "__main__":
+    unittest.main()
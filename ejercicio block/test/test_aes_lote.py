@@ -0,0 +1,92 @@
+"""
+test_aes_lote.py - Pruebas del cifrado de imagenes por lotes (src/aes_lote.py).
+"""
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from PIL import Image
+
+from aes_cipher import convert_to_bmp
+from aes_lote import cargar_o_generar_clave, main, resolver_imagenes, rutas_de_salida
+
+
+class PruebasAESLote(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.base = Path(self.directorio.name)
+        self.imagenes = self.base / 'imagenes'
+        self.imagenes.mkdir()
+        for i, tam in enumerate(((5, 4), (17, 9), (32, 32))):
+            Image.frombytes('RGB', tam, os.urandom(tam[0] * tam[1] * 3)).save(
+                self.imagenes / f'foto{i}.png')
+        (self.imagenes / 'notas.txt').write_text("no es imagen")
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def ejecutar(self, *argv):
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            return main([str(a) for a in argv])
+
+    def test_resolver_directorio_y_glob(self):
+        por_directorio = resolver_imagenes([str(self.imagenes)])
+        por_glob = resolver_imagenes([str(self.imagenes / 'foto*.png'), str(self.imagenes)])
+        self.assertEqual([p.name for p in por_directorio], ['foto0.png', 'foto1.png', 'foto2.png'])
+        self.assertEqual(por_glob, por_directorio)
+        with self.assertRaises(FileNotFoundError):
+            resolver_imagenes([str(self.base / 'nada*.png')])
+
+    def test_nombres_repetidos(self):
+        with self.assertRaises(ValueError):
+            rutas_de_salida([Path('a/foto.png'), Path('b/foto.jpg')], 'salida', '_cbc')
+
+    def test_ida_y_vuelta_cbc(self):
+        clave = self.base / 'clave.bin'
+        cifradas, descifradas = self.base / 'cifradas', self.base / 'descifradas'
+        codigo = self.ejecutar('cifrar', self.imagenes, '--salida', cifradas, '--clave', clave,
+                               '--procesos', 2, '--max-pendientes', 1)
+        self.assertEqual(codigo, 0)
+        self.assertEqual(len(clave.read_bytes()), 32)
+
+        ivs = [(cifradas / f'foto{i}_cbc.bmp.iv').read_text().strip() for i in range(3)]
+        self.assertEqual(len(set(ivs)), 3)
+
+        codigo = self.ejecutar('descifrar', cifradas / '*.bmp', '--salida', descifradas,
+                               '--clave', clave, '--procesos', 2)
+        self.assertEqual(codigo, 0)
+        for i in range(3):
+            original = convert_to_bmp(str(self.imagenes / f'foto{i}.png'))
+            descifrada = (descifradas / f'foto{i}_cbc_descifrada.bmp').read_bytes()
+            # El ultimo bloque incompleto no se recupera (se trunca al cifrar)
+            completos = len(original) - (len(original) - 54) % 16
+            self.assertEqual(descifrada[:completos], original[:completos])
+
+    def test_error_sin_iv(self):
+        clave = self.base / 'clave.bin'
+        cifradas = self.base / 'cifradas'
+        self.ejecutar('cifrar', self.imagenes / 'foto0.png', '--salida', cifradas, '--clave', clave)
+        (cifradas / 'foto0_cbc.bmp.iv').unlink()
+        codigo = self.ejecutar('descifrar', cifradas / 'foto0_cbc.bmp', '--salida', self.base / 'x',
+                               '--clave', clave)
+        self.assertEqual(codigo, 1)
+
+    @unittest.skipIf(os.name == 'nt', "Permisos POSIX")
+    def test_clave_nueva_solo_legible_por_el_usuario(self):
+        clave = self.base / 'clave.bin'
+        key = cargar_o_generar_clave(clave, generar=True)
+        self.assertEqual(clave.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(cargar_o_generar_clave(clave, generar=False), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
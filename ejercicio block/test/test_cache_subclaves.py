@@ -0,0 +1,84 @@
+"""
+test_cache_subclaves.py - Pruebas del cache LRU de subclaves (utils/cache_subclaves.py).
+"""
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(TEST_DIR, '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+from utils.utils import bytes_to_bin
+from utils.des_core import generar_subclaves
+from utils.des_int import subclaves_bin_to_int
+from utils.cache_subclaves import CacheSubclaves
+
+
+class PruebasCacheSubclaves(unittest.TestCase):
+    def setUp(self):
+        self.cache = CacheSubclaves(capacidad=2)
+        self.claves = [os.urandom(8) for _ in range(3)]
+
+    def test_subclaves_iguales_al_calculo_directo(self):
+        key = os.urandom(16)
+        with self.cache.usar(key) as esquema:
+            k1 = generar_subclaves(bytes_to_bin(key[:8]))
+            k2 = generar_subclaves(bytes_to_bin(key[8:]))
+            self.assertEqual(esquema.k1.bin, k1)
+            self.assertEqual(esquema.k1.bin_inv, k1[::-1])
+            self.assertEqual(esquema.k2.int, subclaves_bin_to_int(k2))
+            self.assertEqual(esquema.k2.int_inv, subclaves_bin_to_int(k2)[::-1])
+
+    def test_aciertos_y_fallos(self):
+        for _ in range(3):
+            with self.cache.usar(self.claves[0]):
+                pass
+        estadisticas = self.cache.estadisticas()
+        self.assertEqual(estadisticas['fallos'], 1)
+        self.assertEqual(estadisticas['aciertos'], 2)
+        self.assertEqual(estadisticas['entradas'], 1)
+
+    def test_desaloja_la_menos_usada_y_la_borra(self):
+        with self.cache.usar(self.claves[0]) as primero:
+            pass
+        with self.cache.usar(self.claves[1]):
+            pass
+        with self.cache.usar(self.claves[0]):
+            pass
+        with self.cache.usar(self.claves[2]):
+            pass
+        # claves[1] era la menos usada
+        self.assertEqual(self.cache.desalojos, 1)
+        with self.cache.usar(self.claves[0]) as de_nuevo:
+            self.assertIs(de_nuevo, primero)
+        with self.cache.usar(self.claves[1]) as recalculado:
+            self.assertTrue(any(recalculado.k1.int))
+
+    def test_borrado_pospuesto_mientras_esta_en_uso(self):
+        esquema = self.cache.reservar(self.claves[0])
+        esperado = list(esquema.k1.int)
+        self.cache.redimensionar(0)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(esquema.k1.int, esperado)
+        self.cache.liberar(esquema)
+        self.assertEqual(esquema.k1.int, [0] * 16)
+        self.assertEqual(esquema.k1.bin, ['0' * 48] * 16)
+
+    def test_capacidad_cero_no_guarda(self):
+        cache = CacheSubclaves(capacidad=0)
+        with cache.usar(self.claves[0]):
+            pass
+        with cache.usar(self.claves[0]):
+            pass
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.fallos, 2)
+
+    def test_clave_invalida(self):
+        with self.assertRaises(ValueError):
+            self.cache.reservar(os.urandom(12))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+test_des_int.py - Pruebas del motor DES sobre enteros (utils/des_int.py).
+
+Verifica que el motor de enteros produzca exactamente los mismos bits que el
+motor de referencia de cadenas (utils/des_core.py) y que PyCryptodome.
+"""
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(TEST_DIR, '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+from Crypto.Cipher import DES, DES3
+
+from utils.utils import bytes_to_bin, bin_to_bytes
+from utils.des_core import generar_subclaves, des_block_encrypt, des_block_decrypt
+from utils.des_int import (
+    bytes_to_int, subclaves_bin_to_int, generar_subclaves_int,
+    des_block_encrypt_int, des_block_decrypt_int,
+    des_block_encrypt_bytes, des_block_decrypt_bytes,
+    triple_des_encrypt_block_int, triple_des_decrypt_block_int
+)
+
+
+class PruebasDESEnteros(unittest.TestCase):
+    def test_vector_conocido(self):
+        """Vector clasico: K=133457799BBCDFF1, P=0123456789ABCDEF."""
+        subclaves = generar_subclaves_int(bytes.fromhex("133457799BBCDFF1"))
+        cifrado = des_block_encrypt_bytes(bytes.fromhex("0123456789ABCDEF"), subclaves)
+        self.assertEqual(cifrado.hex().upper(), "85E813540F0AB405")
+        self.assertEqual(des_block_decrypt_bytes(cifrado, subclaves).hex().upper(),
+                         "0123456789ABCDEF")
+
+    def test_subclaves_iguales_a_referencia(self):
+        for _ in range(10):
+            clave = os.urandom(8)
+            self.assertEqual(generar_subclaves_int(clave),
+                             subclaves_bin_to_int(generar_subclaves(bytes_to_bin(clave))))
+
+    def test_bloques_iguales_a_referencia(self):
+        for _ in range(20):
+            clave = os.urandom(8)
+            bloque = os.urandom(8)
+            subclaves_bin = generar_subclaves(bytes_to_bin(clave))
+            subclaves = generar_subclaves_int(clave)
+
+            cifrado_ref = bin_to_bytes(des_block_encrypt(bytes_to_bin(bloque), subclaves_bin))
+            descifrado_ref = bin_to_bytes(des_block_decrypt(bytes_to_bin(bloque), subclaves_bin))
+
+            self.assertEqual(des_block_encrypt_int(bytes_to_int(bloque), subclaves),
+                             bytes_to_int(cifrado_ref))
+            self.assertEqual(des_block_decrypt_int(bytes_to_int(bloque), subclaves),
+                             bytes_to_int(descifrado_ref))
+
+    def test_compatible_con_pycryptodome(self):
+        clave = os.urandom(8)
+        datos = os.urandom(64)
+        esperado = DES.new(clave, DES.MODE_ECB).encrypt(datos)
+        subclaves = generar_subclaves_int(clave)
+        obtenido = b"".join(des_block_encrypt_bytes(datos[i:i+8], subclaves)
+                            for i in range(0, len(datos), 8))
+        self.assertEqual(obtenido, esperado)
+
+    def test_3des_compatible_con_pycryptodome(self):
+        clave = DES3.adjust_key_parity(os.urandom(16))
+        bloque = os.urandom(8)
+        k1 = generar_subclaves_int(clave[:8])
+        k2 = generar_subclaves_int(clave[8:])
+        esperado = DES3.new(clave, DES3.MODE_ECB).encrypt(bloque)
+
+        cifrado = triple_des_encrypt_block_int(bytes_to_int(bloque), k1, k2)
+        self.assertEqual(cifrado, bytes_to_int(esperado))
+        self.assertEqual(triple_des_decrypt_block_int(cifrado, k1, k2), bytes_to_int(bloque))
+
+
+if __name__ == "__main__":
+    unittest.main()
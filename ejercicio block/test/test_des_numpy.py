@@ -0,0 +1,68 @@
+"""
+test_des_numpy.py - Pruebas del motor DES vectorizado (utils/des_numpy.py).
+"""
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+EJERCICIO_BLOCK_DIR = os.path.abspath(os.path.join(TEST_DIR, '..'))
+if EJERCICIO_BLOCK_DIR not in sys.path:
+    sys.path.insert(0, EJERCICIO_BLOCK_DIR)
+
+import numpy as np
+from Crypto.Cipher import DES, DES3
+
+from utils.utils import bytes_to_bin
+from utils.des_core import generar_subclaves, des_block_encrypt, bin_to_hex
+from utils.des_int import generar_subclaves_int
+from utils.des_numpy import (
+    des_encrypt_blocks, des_decrypt_blocks, triple_des_encrypt_blocks,
+    triple_des_decrypt_blocks, ecb_encrypt_np, ecb_decrypt_np, ctr_crypt_np
+)
+
+
+class PruebasDESNumPy(unittest.TestCase):
+    def test_vector_conocido(self):
+        subclaves = generar_subclaves_int(bytes.fromhex("133457799BBCDFF1"))
+        bloques = np.frombuffer(bytes.fromhex("0123456789ABCDEF"), dtype=np.uint8).reshape(1, 8)
+        cifrado = des_encrypt_blocks(bloques, subclaves)
+        self.assertEqual(cifrado.tobytes().hex().upper(), "85E813540F0AB405")
+
+    def test_igual_al_motor_de_referencia(self):
+        clave = os.urandom(8)
+        datos = os.urandom(8 * 20)
+        subclaves_bin = generar_subclaves(bytes_to_bin(clave))
+        cifrado = des_encrypt_blocks(datos, generar_subclaves_int(clave))
+        for i in range(20):
+            esperado = bin_to_hex(des_block_encrypt(bytes_to_bin(datos[8*i:8*i+8]), subclaves_bin))
+            self.assertEqual(cifrado[i].tobytes().hex().upper(), esperado.upper())
+
+    def test_ida_y_vuelta(self):
+        k1, k2 = generar_subclaves_int(os.urandom(8)), generar_subclaves_int(os.urandom(8))
+        bloques = np.random.randint(0, 256, size=(100, 8), dtype=np.uint8)
+        self.assertTrue(np.array_equal(des_decrypt_blocks(des_encrypt_blocks(bloques, k1), k1), bloques))
+        cifrado = triple_des_encrypt_blocks(bloques, k1, k2)
+        self.assertTrue(np.array_equal(triple_des_decrypt_blocks(cifrado, k1, k2), bloques))
+
+    def test_ecb_igual_a_pycryptodome(self):
+        key = DES3.adjust_key_parity(os.urandom(16))
+        datos = os.urandom(8 * 9000)  # mas de un sublote (TAM_LOTE)
+        cifrado = ecb_encrypt_np(key, datos)
+        self.assertEqual(cifrado, DES3.new(key, DES3.MODE_ECB).encrypt(datos))
+        self.assertEqual(ecb_decrypt_np(key, cifrado), datos)
+
+    def test_ctr_igual_a_pycryptodome(self):
+        key = os.urandom(8)
+        nonce = os.urandom(5)
+        datos = os.urandom(1001)
+        esperado = DES.new(key, DES.MODE_CTR, nonce=nonce, initial_value=3).encrypt(datos)
+        self.assertEqual(ctr_crypt_np(key, datos, nonce, valor_inicial=3), esperado)
+
+    def test_forma_invalida(self):
+        with self.assertRaises(ValueError):
+            des_encrypt_blocks(np.zeros((4, 7), dtype=np.uint8), [0] * 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+test_des_paralelo.py - Pruebas de los modos CTR, ECB y descifrado CBC en paralelo.
+"""
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from Crypto.Cipher import DES, DES3
+from Crypto.Util.Padding import pad
+
+from des_paralelo import ctr_crypt, ecb_encrypt, ecb_decrypt, cbc_decrypt
+
+
+class PruebasDESParalelo(unittest.TestCase):
+    def setUp(self):
+        self.key = DES3.adjust_key_parity(os.urandom(16))
+        # Varios trozos pequenos para ejercitar el reparto entre procesos
+        self.datos = os.urandom(8 * 50 + 5)
+
+    def test_vector_conocido_ecb(self):
+        key = bytes.fromhex("133457799BBCDFF1")
+        cifrado = ecb_encrypt(key, bytes.fromhex("0123456789ABCDEF"), procesos=1)
+        self.assertEqual(cifrado.hex().upper(), "85E813540F0AB405")
+
+    def test_ctr_igual_a_pycryptodome(self):
+        nonce = os.urandom(3)
+        esperado = DES3.new(self.key, DES3.MODE_CTR, nonce=nonce,
+                            initial_value=7).encrypt(self.datos)
+        for procesos in (1, 2):
+            obtenido = ctr_crypt(self.key, self.datos, nonce, valor_inicial=7,
+                                 procesos=procesos, tam_trozo=64)
+            self.assertEqual(obtenido, esperado)
+
+    def test_ctr_des_sin_nonce(self):
+        key = os.urandom(8)
+        esperado = DES.new(key, DES.MODE_CTR, nonce=b"").encrypt(self.datos)
+        self.assertEqual(ctr_crypt(key, self.datos, procesos=2, tam_trozo=128), esperado)
+
+    def test_ctr_desbordamiento(self):
+        with self.assertRaises(ValueError):
+            ctr_crypt(self.key, bytes(24), os.urandom(7), valor_inicial=254)
+
+    def test_ecb_igual_a_pycryptodome(self):
+        datos = self.datos[:400]
+        esperado = DES3.new(self.key, DES3.MODE_ECB).encrypt(datos)
+        cifrado = ecb_encrypt(self.key, datos, procesos=2, tam_trozo=64)
+        self.assertEqual(cifrado, esperado)
+        self.assertEqual(ecb_decrypt(self.key, cifrado, procesos=2, tam_trozo=64), datos)
+
+    def test_cbc_decrypt_paralelo_igual_a_secuencial(self):
+        iv = os.urandom(8)
+        cifrado = DES3.new(self.key, DES3.MODE_CBC, iv=iv).encrypt(pad(self.datos, 8))
+        secuencial = cbc_decrypt(self.key, iv, cifrado, procesos=1, tam_trozo=64)
+        paralelo = cbc_decrypt(self.key, iv, cifrado, procesos=2, tam_trozo=64)
+        self.assertEqual(secuencial, self.datos)
+        self.assertEqual(paralelo, self.datos)
+
+    def test_entradas_invalidas(self):
+        with self.assertRaises(ValueError):
+            ecb_encrypt(self.key, bytes(7))
+        with self.assertRaises(ValueError):
+            ctr_crypt(self.key, bytes(8), tam_trozo=12)
+        with self.assertRaises(ValueError):
+            cbc_decrypt(self.key, bytes(8), bytes(12))
+
+
+if __name__ == "__main__":
+    unittest.main()
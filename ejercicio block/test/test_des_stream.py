@@ -0,0 +1,129 @@
+"""
+test_des_stream.py - Pruebas del cifrado incremental CBC (src/des_stream.py).
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from Crypto.Cipher import DES, DES3
+from Crypto.Util.Padding import pad
+
+from des_stream import CBCEncryptor, CBCDecryptor, cifrar_archivo, descifrar_archivo
+from tripledes_cipher import (
+    generar_bloques_64bits, triple_des_cbc_encrypt, pack_ciphertext_with_iv
+)
+from utils.utils import bytes_to_bin
+from utils.cache_subclaves import CACHE_SUBCLAVES
+
+
+def cifrar_por_trozos(cifrador, datos, tam):
+    partes = [cifrador.update(datos[i:i+tam]) for i in range(0, len(datos), tam)]
+    partes.append(cifrador.finalize())
+    return b"".join(partes)
+
+
+class PruebasCBCIncremental(unittest.TestCase):
+    def setUp(self):
+        self.key = DES3.adjust_key_parity(os.urandom(16))
+        self.iv = os.urandom(8)
+
+    def test_igual_a_pycryptodome_3des(self):
+        datos = os.urandom(203)
+        esperado = DES3.new(self.key, DES3.MODE_CBC, iv=self.iv).encrypt(pad(datos, 8))
+        self.assertEqual(cifrar_por_trozos(CBCEncryptor(self.key, self.iv), datos, 64), esperado)
+
+    def test_igual_a_pycryptodome_des(self):
+        key = os.urandom(8)
+        datos = os.urandom(40)
+        esperado = DES.new(key, DES.MODE_CBC, iv=self.iv).encrypt(pad(datos, 8))
+        self.assertEqual(cifrar_por_trozos(CBCEncryptor(key, self.iv), datos, 40), esperado)
+
+    def test_igual_a_implementacion_de_referencia(self):
+        datos = b"Mensaje de prueba para 3DES"
+        bloques = generar_bloques_64bits(datos)
+        cifrados, _, iv_bin = triple_des_cbc_encrypt(bloques, self.key, bytes_to_bin(self.iv))
+        esperado = pack_ciphertext_with_iv(cifrados, iv_bin)
+
+        cifrador = CBCEncryptor(self.key, self.iv)
+        obtenido = cifrador.iv + cifrar_por_trozos(cifrador, datos, 5)
+        self.assertEqual(obtenido, esperado)
+
+    def test_trozos_irregulares_ida_y_vuelta(self):
+        for tam_mensaje in (0, 1, 7, 8, 9, 16, 100):
+            datos = os.urandom(tam_mensaje)
+            cifrado = cifrar_por_trozos(CBCEncryptor(self.key, self.iv), datos, 3)
+            for tam_trozo in (1, 5, 8, 13, 1000):
+                descifrador = CBCDecryptor(self.key, self.iv)
+                trozos = [memoryview(cifrado)[i:i+tam_trozo]
+                          for i in range(0, len(cifrado), tam_trozo)]
+                recuperado = b"".join(descifrador.update(t) for t in trozos)
+                recuperado += descifrador.finalize()
+                self.assertEqual(recuperado, datos)
+
+    def test_padding_invalido(self):
+        # El bloque descifrado es todo ceros: byte de padding 0 no es valido
+        cifrado = DES3.new(self.key, DES3.MODE_CBC, iv=self.iv).encrypt(b"\x00" * 8)
+        descifrador = CBCDecryptor(self.key, self.iv)
+        self.assertEqual(descifrador.update(cifrado), b"")
+        with self.assertRaises(ValueError):
+            descifrador.finalize()
+
+    def test_archivos(self):
+        datos = os.urandom(10000)
+        with tempfile.TemporaryDirectory() as directorio:
+            rutas = [os.path.join(directorio, n) for n in ('a', 'b', 'c')]
+            with open(rutas[0], 'wb') as f:
+                f.write(datos)
+            cifrar_archivo(rutas[0], rutas[1], self.key, tam_chunk=777)
+            descifrar_archivo(rutas[1], rutas[2], self.key, tam_chunk=512)
+            with open(rutas[2], 'rb') as f:
+                self.assertEqual(f.read(), datos)
+
+
+
+class PruebasLiberacionClave(unittest.TestCase):
+    """Un flujo abandonado o con error no debe retener su esquema de claves."""
+
+    def setUp(self):
+        self.key = DES3.adjust_key_parity(os.urandom(16))
+        self.iv = os.urandom(8)
+
+    def assertLiberado(self, esquema):
+        self.assertEqual(esquema.en_uso, 0)
+        # Sin reservas, limpiar el cache borra las subclaves de inmediato
+        CACHE_SUBCLAVES.limpiar()
+        self.assertEqual(set(esquema.k1.int), {0})
+
+    def test_abandonado_en_bloque_with(self):
+        with CBCEncryptor(self.key, self.iv) as cifrador:
+            esquema = cifrador._esquema
+            cifrador.update(b"sin finalizar")
+        self.assertLiberado(esquema)
+        with self.assertRaises(ValueError):
+            cifrador.update(b"x")
+
+    def test_cerrar_es_idempotente(self):
+        descifrador = CBCDecryptor(self.key, self.iv)
+        esquema = descifrador._esquema
+        descifrador.cerrar()
+        descifrador.cerrar()
+        self.assertLiberado(esquema)
+
+    def test_error_en_update_libera(self):
+        cifrador = CBCEncryptor(self.key, self.iv)
+        esquema = cifrador._esquema
+        with self.assertRaises(TypeError):
+            cifrador.update("no son bytes")
+        self.assertLiberado(esquema)
+        with self.assertRaises(ValueError):
+            cifrador.finalize()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+test_trazas.py - Pruebas de los observadores de trazas (utils/trazas.py).
+"""
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(TEST_DIR, '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from des_cipher import des_encrypt, des_decrypt, generar_bloques_64bits
+from tripledes_cipher import triple_des_cbc_encrypt
+from utils.trazas import ImpresorTrazas, RegistroTrazas
+from utils.utils import bytes_to_bin
+
+
+class PruebasTrazas(unittest.TestCase):
+    def setUp(self):
+        self.clave_bin = bytes_to_bin(os.urandom(8))
+        self.mensaje = b"mensaje de 24 bytes!!!!!"
+
+    def test_sin_observador_no_imprime(self):
+        salida = io.StringIO()
+        with redirect_stdout(salida):
+            bloques = generar_bloques_64bits(self.mensaje)
+            cifrados, _ = des_encrypt(bloques, self.clave_bin)
+            descifrados = des_decrypt(cifrados, self.clave_bin)
+        self.assertEqual(salida.getvalue(), "")
+        self.assertEqual(descifrados, bloques)
+
+    def test_observador_recibe_las_rondas(self):
+        registro = RegistroTrazas()
+        bloques = generar_bloques_64bits(self.mensaje)
+        cifrados, _ = des_encrypt(bloques, self.clave_bin, observador=registro)
+
+        rondas = [evento for evento in registro.eventos if evento[0] == 'ronda']
+        self.assertEqual(len(rondas), 16 * len(bloques))
+        self.assertEqual([r[1] for r in rondas[:16]], list(range(1, 17)))
+        for _, _, L, R, subclave in rondas:
+            self.assertEqual((len(L), len(R), len(subclave)), (32, 32, 48))
+
+        secciones = [evento for evento in registro.eventos if evento[0] == 'seccion']
+        self.assertEqual(secciones, [('seccion', 'ENCRYPTION')] * len(bloques))
+        self.assertIn(('valor', 'Cipher Text', cifrados[-1]), registro.eventos)
+
+        # El observador no cambia el resultado
+        self.assertEqual(des_encrypt(bloques, self.clave_bin)[0], cifrados)
+
+    def test_impresor_usa_el_destino(self):
+        destino = io.StringIO()
+        salida = io.StringIO()
+        with redirect_stdout(salida):
+            des_encrypt(generar_bloques_64bits(b"12345678"), self.clave_bin,
+                        observador=ImpresorTrazas(destino))
+        self.assertEqual(salida.getvalue(), "")
+        self.assertEqual(destino.getvalue().count("Round "), 16)
+
+
+    def test_etiquetas_sin_formato(self):
+        registro = RegistroTrazas()
+        bloques = generar_bloques_64bits(self.mensaje, observador=registro)
+        des_encrypt(bloques, self.clave_bin, observador=registro)
+        triple_des_cbc_encrypt(bloques, os.urandom(16), observador=registro)
+        for evento in registro.eventos:
+            if evento[0] in ('valor', 'mensaje'):
+                self.assertFalse(evento[1].startswith("\n"), evento)
+        self.assertIn(('valor', 'Cipher Text Block 1'), [e[:2] for e in registro.eventos])
+
+    def test_ancho_de_seccion(self):
+        destino = io.StringIO()
+        impresor = ImpresorTrazas(destino, ancho_seccion=50, cerrar_seccion=False)
+        impresor.seccion("ENCRYPTION")
+        impresor.valor("Clave", '0' * 64, separado=True)
+        self.assertEqual(destino.getvalue(),
+                         f"\n{'=' * 50}\nENCRYPTION\n\nClave: 0000000000000000\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
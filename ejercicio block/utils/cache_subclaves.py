@@ -0,0 +1,211 @@
+"""
+cache_subclaves.py - Cache LRU de subclaves DES / 3DES ya calculadas.
+
+generar_subclaves hace PC-1, 16 rotaciones y 16 PC-2 sobre cadenas binarias
+cada vez que se cifra o descifra un mensaje. Cuando se cifran muchos mensajes
+cortos con un conjunto pequeno de claves conviene calcular cada esquema una
+sola vez y reutilizarlo.
+
+Cada entrada guarda las subclaves en orden de cifrado y de descifrado, tanto
+en cadenas binarias (motor de referencia des_core) como en enteros (des_int).
+Para claves de 16 bytes (3DES 2-key) la entrada guarda el par K1/K2.
+
+Las entradas se identifican con un BLAKE2b con clave aleatoria por proceso,
+asi el diccionario no conserva los bytes de la clave. Al desalojar una entrada
+se sobrescriben sus listas de subclaves; Python no permite borrar de memoria
+las cadenas/enteros inmutables, por lo que el borrado es de mejor esfuerzo.
+
+Uso:
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        cifrar(..., esquema.k1.bin)
+
+Mientras un esquema esta en uso su borrado se pospone hasta liberarlo, asi un
+desalojo no altera las subclaves de una operacion en curso.
+"""
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import blake2b
+
+from utils.utils import bytes_to_bin
+from utils.des_core import generar_subclaves
+from utils.des_int import subclaves_bin_to_int
+
+
+CAPACIDAD_POR_DEFECTO = 32
+
+
+class SubclavesDES:
+    """Las 16 subclaves de una clave DES de 8 bytes, en todas sus formas."""
+
+    __slots__ = ('bin', 'bin_inv', 'int', 'int_inv')
+
+    def __init__(self, clave_bytes):
+        self.bin = generar_subclaves(bytes_to_bin(clave_bytes))
+        self.bin_inv = self.bin[::-1]
+        self.int = subclaves_bin_to_int(self.bin)
+        self.int_inv = self.int[::-1]
+
+    def borrar(self):
+        """Sobrescribe las listas de subclaves (borrado de mejor esfuerzo)."""
+        for lista in (self.bin, self.bin_inv):
+            lista[:] = ['0' * 48] * len(lista)
+        for lista in (self.int, self.int_inv):
+            lista[:] = [0] * len(lista)
+
+
+class EsquemaClave:
+    """Esquema completo: k1 para DES; k1 y k2 para 3DES-EDE (K3 = K1)."""
+
+    __slots__ = ('k1', 'k2', 'en_uso', 'desalojado')
+
+    def __init__(self, key_bytes):
+        self.en_uso = 0
+        self.desalojado = False
+        if len(key_bytes) == 8:
+            self.k1 = SubclavesDES(key_bytes)
+            self.k2 = None
+        elif len(key_bytes) == 16:
+            self.k1 = SubclavesDES(key_bytes[:8])
+            self.k2 = SubclavesDES(key_bytes[8:16])
+        else:
+            raise ValueError("La clave debe tener 8 bytes (DES) o 16 bytes (3DES)")
+
+    def borrar(self):
+        self.k1.borrar()
+        if self.k2 is not None:
+            self.k2.borrar()
+
+
+class CacheSubclaves:
+    """
+    Cache LRU acotado de esquemas de clave.
+
+    Args:
+        capacidad: Numero maximo de claves en cache (0 desactiva el cache)
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        if capacidad < 0:
+            raise ValueError("La capacidad no puede ser negativa")
+        self._capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._sal = os.urandom(32)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    @property
+    def capacidad(self):
+        return self._capacidad
+
+    def _identificador(self, key_bytes):
+        return blake2b(bytes(key_bytes), key=self._sal, digest_size=16).digest()
+
+    def reservar(self, key_bytes):
+        """
+        Retorna el EsquemaClave de la clave (calculandolo si no esta en cache)
+        y lo marca en uso. El llamador debe llamar a liberar() al terminar.
+
+        Args:
+            key_bytes: 8 bytes (DES) o 16 bytes (3DES 2-key)
+        """
+        identificador = self._identificador(key_bytes)
+        with self._lock:
+            esquema = self._entradas.get(identificador)
+            if esquema is not None:
+                self._entradas.move_to_end(identificador)
+                self.aciertos += 1
+                esquema.en_uso += 1
+                return esquema
+            self.fallos += 1
+
+        # Calcular fuera del lock para no bloquear a otros hilos
+        nuevo = EsquemaClave(key_bytes)
+
+        with self._lock:
+            # Otro hilo pudo insertar la misma clave mientras se calculaba
+            esquema = self._entradas.get(identificador)
+            if esquema is not None:
+                self._entradas.move_to_end(identificador)
+                nuevo.borrar()
+            else:
+                esquema = nuevo
+                if self._capacidad > 0:
+                    self._entradas[identificador] = esquema
+                    self._desalojar_excedente()
+                else:
+                    esquema.desalojado = True
+            esquema.en_uso += 1
+        return esquema
+
+    @contextmanager
+    def usar(self, key_bytes):
+        """
+        Reserva el esquema de la clave durante el bloque with.
+
+        Si la entrada se desaloja mientras esta reservada, su borrado se
+        hace al liberarla.
+        """
+        esquema = self.reservar(key_bytes)
+        try:
+            yield esquema
+        finally:
+            self.liberar(esquema)
+
+    def liberar(self, esquema):
+        """Libera una reserva; borra el esquema si ya fue desalojado."""
+        with self._lock:
+            esquema.en_uso -= 1
+            if esquema.en_uso == 0 and esquema.desalojado:
+                esquema.borrar()
+
+    def _desalojar_excedente(self):
+        while len(self._entradas) > self._capacidad:
+            _, esquema = self._entradas.popitem(last=False)
+            esquema.desalojado = True
+            if esquema.en_uso == 0:
+                esquema.borrar()
+            self.desalojos += 1
+
+    def redimensionar(self, capacidad):
+        """Cambia la capacidad; desaloja las entradas menos usadas si sobran."""
+        if capacidad < 0:
+            raise ValueError("La capacidad no puede ser negativa")
+        with self._lock:
+            self._capacidad = capacidad
+            self._desalojar_excedente()
+
+    def limpiar(self):
+        """Borra y elimina todas las entradas."""
+        with self._lock:
+            for esquema in self._entradas.values():
+                esquema.desalojado = True
+                if esquema.en_uso == 0:
+                    esquema.borrar()
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """Retorna un diccionario con el tamano actual y los contadores."""
+        with self._lock:
+            return {
+                'capacidad': self._capacidad,
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+            }
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+# Cache compartido por des_cipher, tripledes_cipher y des_stream
+CACHE_SUBCLAVES = CacheSubclaves()
+
+
+def configurar_cache(capacidad):
+    """Cambia la capacidad del cache compartido."""
+    CACHE_SUBCLAVES.redimensionar(capacidad)
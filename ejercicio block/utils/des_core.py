@@ -145,25 +145,31 @@ def generar_subclaves(clave_bin):
     return subclaves
 
 
-def des_block_encrypt(bloque, subclaves, verbose=False, round_offset=0, label="ENCRYPT"):
+def des_block_encrypt(bloque, subclaves, verbose=False, round_offset=0, label="ENCRYPT", observador=None):
     """
     Cifra UN bloque de 64 bits usando DES con 16 rondas.
     
     Args:
         bloque: Cadena binaria de 64 bits
         subclaves: Lista de 16 subclaves de 48 bits
-        verbose: Si True, imprime detalle de cada ronda
+        verbose: Si True, imprime detalle de cada ronda (atajo para ImpresorTrazas)
         round_offset: Offset para numerar las rondas (para 3DES)
         label: Etiqueta para el output
+        observador: ObservadorCifrado que recibe el estado de cada ronda.
+            Si es None y verbose es False no se formatea nada.
     
     Returns:
         Bloque cifrado de 64 bits (cadena binaria)
     """
+    if verbose and observador is None:
+        from utils.trazas import ImpresorTrazas
+        observador = ImpresorTrazas()
+
     # Permutación Inicial (IP)
     bloque_ip = ''.join(bloque[i-1] for i in IP_TABLE)
     
-    if verbose:
-        print(f"After initial permutation: {bin_to_hex(bloque_ip)}")
+    if observador is not None:
+        observador.valor("After initial permutation", bloque_ip)
     
     # Dividir en L0 y R0
     L = bloque_ip[:32]
@@ -181,8 +187,8 @@ def des_block_encrypt(bloque, subclaves, verbose=False, round_offset=0, label="E
         f_result = f_function(R_prev, subclaves[ronda])
         R = format(int(L_prev, 2) ^ int(f_result, 2), '032b')
         
-        if verbose:
-            print(f"Round {ronda+1+round_offset:2d}   {bin_to_hex(L)}   {bin_to_hex(R)}   {bin_to_hex(subclaves[ronda])}")
+        if observador is not None:
+            observador.ronda(ronda + 1 + round_offset, L, R, subclaves[ronda])
     
     # Intercambio final (R16 + L16) y Permutación Inversa
     pre_output = R + L  # Nota: se intercambian R y L
@@ -191,25 +197,31 @@ def des_block_encrypt(bloque, subclaves, verbose=False, round_offset=0, label="E
     return bloque_cifrado
 
 
-def des_block_decrypt(bloque, subclaves, verbose=False, round_offset=0, label="DECRYPT"):
+def des_block_decrypt(bloque, subclaves, verbose=False, round_offset=0, label="DECRYPT", observador=None):
     """
     Descifra UN bloque de 64 bits usando DES con 16 rondas (subclaves en orden inverso).
     
     Args:
         bloque: Cadena binaria de 64 bits (cifrada)
         subclaves: Lista de 16 subclaves de 48 bits
-        verbose: Si True, imprime detalle de cada ronda
+        verbose: Si True, imprime detalle de cada ronda (atajo para ImpresorTrazas)
         round_offset: Offset para numerar las rondas (para 3DES)
         label: Etiqueta para el output
+        observador: ObservadorCifrado que recibe el estado de cada ronda.
+            Si es None y verbose es False no se formatea nada.
     
     Returns:
         Bloque descifrado de 64 bits (cadena binaria)
     """
+    if verbose and observador is None:
+        from utils.trazas import ImpresorTrazas
+        observador = ImpresorTrazas()
+
     # Permutación Inicial (IP)
     bloque_ip = ''.join(bloque[i-1] for i in IP_TABLE)
     
-    if verbose:
-        print(f"After initial permutation: {bin_to_hex(bloque_ip)}")
+    if observador is not None:
+        observador.valor("After initial permutation", bloque_ip)
     
     # Dividir en L0 y R0
     L = bloque_ip[:32]
@@ -227,8 +239,8 @@ def des_block_decrypt(bloque, subclaves, verbose=False, round_offset=0, label="D
         f_result = f_function(R_prev, subclaves[15 - ronda])
         R = format(int(L_prev, 2) ^ int(f_result, 2), '032b')
         
-        if verbose:
-            print(f"Round {ronda+1+round_offset:2d}   {bin_to_hex(L)}   {bin_to_hex(R)}   {bin_to_hex(subclaves[15-ronda])}")
+        if observador is not None:
+            observador.ronda(ronda + 1 + round_offset, L, R, subclaves[15 - ronda])
     
     # Intercambio final (R16 + L16) y Permutación Inversa
     pre_output = R + L
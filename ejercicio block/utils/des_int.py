@@ -0,0 +1,242 @@
+"""
+des_int.py - Motor DES sobre enteros de 64 bits con tablas precalculadas.
+
+Version paralela a des_core.py: los bloques, subclaves y valores intermedios
+se manejan como enteros (no como cadenas de '0'/'1'). Las permutaciones se
+resuelven con tablas indexadas por byte y la sustitucion + permutacion P de
+cada ronda con 8 SP-boxes combinadas.
+
+des_core.py sigue siendo la implementacion de referencia; este modulo debe
+producir exactamente los mismos bits.
+"""
+from utils.des_core import (
+    IP_TABLE, IP_INV_TABLE, E_TABLE, P_TABLE, PC1_TABLE, PC2_TABLE,
+    SHIFTS_TABLE, S_BOXES
+)
+
+
+# --- CONSTRUCCION DE TABLAS ---
+
+def construir_tablas_permutacion(tabla, bits_entrada):
+    """
+    Precalcula una permutacion como tablas indexadas por byte.
+
+    Para cada byte de la entrada se guarda, para sus 256 valores posibles,
+    el resultado parcial de la permutacion. El resultado completo es el OR
+    de una consulta por byte.
+
+    Args:
+        tabla: Tabla de permutacion DES (posiciones 1-indexadas desde el MSB)
+        bits_entrada: Tamano de la entrada en bits (multiplo de 8)
+
+    Returns:
+        Lista de (bits_entrada // 8) listas de 256 enteros
+    """
+    bits_salida = len(tabla)
+    tablas = []
+    for indice_byte in range(bits_entrada // 8):
+        parcial = []
+        for valor in range(256):
+            salida = 0
+            for pos_salida, pos_entrada in enumerate(tabla):
+                # Solo interesan los bits de entrada que caen en este byte
+                if (pos_entrada - 1) // 8 != indice_byte:
+                    continue
+                bit = (valor >> (7 - (pos_entrada - 1) % 8)) & 1
+                if bit:
+                    salida |= 1 << (bits_salida - 1 - pos_salida)
+            parcial.append(salida)
+        tablas.append(parcial)
+    return tablas
+
+
+def construir_sp_boxes():
+    """
+    Combina cada S-Box con la permutacion P.
+
+    SP[i][x] es la salida de 32 bits (ya permutada por P) que produce la
+    S-Box i para la entrada de 6 bits x. Como P es lineal, el resultado de
+    la funcion F es el OR de las 8 consultas.
+    """
+    sp_boxes = []
+    for i in range(8):
+        caja = []
+        for entrada in range(64):
+            fila = ((entrada >> 4) & 0b10) | (entrada & 1)
+            columna = (entrada >> 1) & 0xF
+            valor = S_BOXES[i][fila][columna] << (28 - 4 * i)
+
+            salida = 0
+            for pos_salida, pos_entrada in enumerate(P_TABLE):
+                if (valor >> (32 - pos_entrada)) & 1:
+                    salida |= 1 << (31 - pos_salida)
+            caja.append(salida)
+        sp_boxes.append(caja)
+    return sp_boxes
+
+
+def permutar(valor, tablas, bits_entrada):
+    """Aplica una permutacion precalculada con construir_tablas_permutacion."""
+    salida = 0
+    desplazamiento = bits_entrada - 8
+    for tabla in tablas:
+        salida |= tabla[(valor >> desplazamiento) & 0xFF]
+        desplazamiento -= 8
+    return salida
+
+
+IP_TABLAS = construir_tablas_permutacion(IP_TABLE, 64)
+IP_INV_TABLAS = construir_tablas_permutacion(IP_INV_TABLE, 64)
+E_TABLAS = construir_tablas_permutacion(E_TABLE, 32)
+SP_BOXES = construir_sp_boxes()
+
+
+# --- CONVERSIONES ---
+
+def bytes_to_int(bloque_bytes):
+    """Convierte un bloque de 8 bytes a entero de 64 bits."""
+    return int.from_bytes(bloque_bytes, 'big')
+
+
+def int_to_bytes(bloque):
+    """Convierte un entero de 64 bits a un bloque de 8 bytes."""
+    return bloque.to_bytes(8, 'big')
+
+
+def subclaves_bin_to_int(subclaves_bin):
+    """Convierte las subclaves binarias de des_core.generar_subclaves a enteros."""
+    return [int(subclave, 2) for subclave in subclaves_bin]
+
+
+# --- SUBCLAVES ---
+
+def generar_subclaves_int(clave):
+    """
+    Genera las 16 subclaves de 48 bits como enteros.
+
+    Args:
+        clave: Clave de 64 bits (8 bytes o entero)
+
+    Returns:
+        Lista de 16 enteros de 48 bits (orden de cifrado)
+    """
+    if isinstance(clave, (bytes, bytearray, memoryview)):
+        clave = bytes_to_int(clave)
+
+    # PC-1 (64 -> 56 bits)
+    clave_56 = 0
+    for pos in PC1_TABLE:
+        clave_56 = (clave_56 << 1) | ((clave >> (64 - pos)) & 1)
+
+    c = clave_56 >> 28
+    d = clave_56 & 0xFFFFFFF
+
+    subclaves = []
+    for desplazamiento in SHIFTS_TABLE:
+        # Rotacion circular de 28 bits
+        c = ((c << desplazamiento) | (c >> (28 - desplazamiento))) & 0xFFFFFFF
+        d = ((d << desplazamiento) | (d >> (28 - desplazamiento))) & 0xFFFFFFF
+
+        # PC-2 (56 -> 48 bits)
+        cd = (c << 28) | d
+        subclave = 0
+        for pos in PC2_TABLE:
+            subclave = (subclave << 1) | ((cd >> (56 - pos)) & 1)
+        subclaves.append(subclave)
+
+    return subclaves
+
+
+# --- CIFRADO POR BLOQUE ---
+
+def _des_rondas(bloque, subclaves):
+    """IP, 16 rondas Feistel con las subclaves en el orden dado, e IP^-1."""
+    ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_TABLAS
+    fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = IP_INV_TABLAS
+    e0, e1, e2, e3 = E_TABLAS
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_BOXES
+
+    # Permutacion Inicial (IP)
+    bloque = (ip0[bloque >> 56] | ip1[(bloque >> 48) & 0xFF] |
+              ip2[(bloque >> 40) & 0xFF] | ip3[(bloque >> 32) & 0xFF] |
+              ip4[(bloque >> 24) & 0xFF] | ip5[(bloque >> 16) & 0xFF] |
+              ip6[(bloque >> 8) & 0xFF] | ip7[bloque & 0xFF])
+
+    L = bloque >> 32
+    R = bloque & 0xFFFFFFFF
+
+    for k in subclaves:
+        # Expansion E (32 -> 48) y XOR con la subclave
+        x = (e0[R >> 24] | e1[(R >> 16) & 0xFF] |
+             e2[(R >> 8) & 0xFF] | e3[R & 0xFF]) ^ k
+
+        # S-Boxes + P en una sola consulta por caja
+        f = (sp0[x >> 42] | sp1[(x >> 36) & 0x3F] |
+             sp2[(x >> 30) & 0x3F] | sp3[(x >> 24) & 0x3F] |
+             sp4[(x >> 18) & 0x3F] | sp5[(x >> 12) & 0x3F] |
+             sp6[(x >> 6) & 0x3F] | sp7[x & 0x3F])
+
+        L, R = R, L ^ f
+
+    # Intercambio final (R16 + L16) y Permutacion Inversa
+    bloque = (R << 32) | L
+    return (fp0[bloque >> 56] | fp1[(bloque >> 48) & 0xFF] |
+            fp2[(bloque >> 40) & 0xFF] | fp3[(bloque >> 32) & 0xFF] |
+            fp4[(bloque >> 24) & 0xFF] | fp5[(bloque >> 16) & 0xFF] |
+            fp6[(bloque >> 8) & 0xFF] | fp7[bloque & 0xFF])
+
+
+def des_block_encrypt_int(bloque, subclaves):
+    """
+    Cifra UN bloque de 64 bits (entero) con DES.
+
+    Args:
+        bloque: Entero de 64 bits
+        subclaves: Lista de 16 subclaves de generar_subclaves_int
+
+    Returns:
+        Bloque cifrado (entero de 64 bits)
+    """
+    return _des_rondas(bloque, subclaves)
+
+
+def des_block_decrypt_int(bloque, subclaves):
+    """
+    Descifra UN bloque de 64 bits (entero) con DES (subclaves en orden inverso).
+
+    Args:
+        bloque: Entero de 64 bits cifrado
+        subclaves: Lista de 16 subclaves de generar_subclaves_int
+
+    Returns:
+        Bloque descifrado (entero de 64 bits)
+    """
+    return _des_rondas(bloque, subclaves[::-1])
+
+
+def des_block_encrypt_bytes(bloque, subclaves):
+    """Cifra un bloque de 8 bytes con DES y retorna 8 bytes."""
+    return int_to_bytes(_des_rondas(bytes_to_int(bloque), subclaves))
+
+
+def des_block_decrypt_bytes(bloque, subclaves):
+    """Descifra un bloque de 8 bytes con DES y retorna 8 bytes."""
+    return int_to_bytes(_des_rondas(bytes_to_int(bloque), subclaves[::-1]))
+
+
+# --- 3DES-EDE POR BLOQUE ---
+
+def triple_des_encrypt_block_int(bloque, k1_subclaves, k2_subclaves):
+    """Cifra un bloque con 3DES-EDE: E(K1) -> D(K2) -> E(K1)."""
+    bloque = _des_rondas(bloque, k1_subclaves)
+    bloque = _des_rondas(bloque, k2_subclaves[::-1])
+    return _des_rondas(bloque, k1_subclaves)
+
+
+def triple_des_decrypt_block_int(bloque, k1_subclaves, k2_subclaves):
+    """Descifra un bloque con 3DES-DED: D(K1) -> E(K2) -> D(K1)."""
+    k1_inversas = k1_subclaves[::-1]
+    bloque = _des_rondas(bloque, k1_inversas)
+    bloque = _des_rondas(bloque, k2_subclaves)
+    return _des_rondas(bloque, k1_inversas)
+
@@ -0,0 +1,202 @@
+"""
+des_numpy.py - Motor DES / 3DES vectorizado con NumPy para lotes de bloques.
+
+Usa las mismas tablas que des_int.py (permutaciones indexadas por byte y
+SP-boxes), pero cada consulta se hace sobre un arreglo de N bloques a la vez
+(table-gather con np.take). Un lote de N bloques se procesa con unas pocas
+operaciones de NumPy por ronda, en lugar de un bucle de Python por bloque.
+
+Entrada y salida: arreglos (N, 8) de uint8 (un bloque por fila) o bytes.
+Internamente cada bloque es un uint64 big-endian. Los lotes grandes se
+procesan en sublotes de TAM_LOTE bloques para que los arreglos temporales
+quepan en cache (medido: ~3x mas rapido que procesar 1M bloques de una vez).
+
+des_core.py sigue siendo la referencia; test/test_des_numpy.py compara este
+motor con des_block_encrypt y con PyCryptodome.
+"""
+import numpy as np
+
+from utils.des_int import IP_TABLAS, IP_INV_TABLAS, E_TABLAS, SP_BOXES
+from utils.cache_subclaves import CACHE_SUBCLAVES
+
+
+# --- CONSTANTES ---
+TAM_LOTE = 8192                     # bloques por sublote (64 KB por arreglo)
+
+
+# --- TABLAS COMO ARREGLOS ---
+_IP = np.array(IP_TABLAS, dtype=np.uint64)
+_IP_INV = np.array(IP_INV_TABLAS, dtype=np.uint64)
+_E = np.array(E_TABLAS, dtype=np.uint64)
+_SP = np.array(SP_BOXES, dtype=np.uint64)
+
+_MASCARA_8 = np.uint64(0xFF)
+_MASCARA_6 = np.uint64(0x3F)
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+_DESPLAZAMIENTOS_64 = [np.uint64(d) for d in range(56, -1, -8)]
+_DESPLAZAMIENTOS_32 = [np.uint64(d) for d in range(24, -1, -8)]
+_DESPLAZAMIENTOS_48 = [np.uint64(d) for d in range(42, -1, -6)]
+_TREINTA_Y_DOS = np.uint64(32)
+
+
+# --- CONVERSIONES ---
+
+def bloques_a_uint64(bloques):
+    """
+    Convierte bytes o un arreglo (N, 8) de uint8 a un arreglo de N uint64.
+
+    Args:
+        bloques: bytes/bytearray (multiplo de 8) o arreglo (N, 8) uint8
+    """
+    if isinstance(bloques, (bytes, bytearray, memoryview)):
+        if len(bloques) % 8:
+            raise ValueError("Los datos deben ser multiplo de 8 bytes")
+        return np.frombuffer(bloques, dtype='>u8').astype(np.uint64)
+    bloques = np.ascontiguousarray(bloques, dtype=np.uint8)
+    if bloques.ndim != 2 or bloques.shape[1] != 8:
+        raise ValueError("Se esperaba un arreglo (N, 8) de uint8")
+    return bloques.view('>u8').reshape(-1).astype(np.uint64)
+
+
+def uint64_a_bloques(valores):
+    """Convierte un arreglo de N uint64 a un arreglo (N, 8) de uint8."""
+    return valores.astype('>u8').view(np.uint8).reshape(-1, 8)
+
+
+# --- RONDAS ---
+
+def _permutar(valores, tablas, desplazamientos):
+    """OR de una consulta por byte a las tablas de permutacion."""
+    salida = np.zeros_like(valores)
+    for tabla, desplazamiento in zip(tablas, desplazamientos):
+        salida |= np.take(tabla, (valores >> desplazamiento) & _MASCARA_8)
+    return salida
+
+
+def _des_rondas_lote(valores, subclaves):
+    """IP, 16 rondas Feistel con las subclaves dadas e IP^-1 sobre un sublote uint64."""
+    bloque = _permutar(valores, _IP, _DESPLAZAMIENTOS_64)
+    L = bloque >> _TREINTA_Y_DOS
+    R = bloque & _MASCARA_32
+
+    for k in subclaves:
+        # Expansion E y XOR con la subclave
+        x = _permutar(R, _E, _DESPLAZAMIENTOS_32) ^ np.uint64(k)
+
+        # S-Boxes + P en una consulta por caja
+        f = np.zeros_like(x)
+        for caja, desplazamiento in zip(_SP, _DESPLAZAMIENTOS_48):
+            f |= np.take(caja, (x >> desplazamiento) & _MASCARA_6)
+
+        L, R = R, L ^ f
+
+    # Intercambio final (R16 + L16) y Permutacion Inversa
+    return _permutar((R << _TREINTA_Y_DOS) | L, _IP_INV, _DESPLAZAMIENTOS_64)
+
+
+def _des_rondas_np(valores, subclaves):
+    """Aplica _des_rondas_lote a N bloques uint64, por sublotes de TAM_LOTE."""
+    if len(valores) <= TAM_LOTE:
+        return _des_rondas_lote(valores, subclaves)
+    salida = np.empty_like(valores)
+    for inicio in range(0, len(valores), TAM_LOTE):
+        fin = inicio + TAM_LOTE
+        salida[inicio:fin] = _des_rondas_lote(valores[inicio:fin], subclaves)
+    return salida
+
+
+# --- CIFRADO POR LOTES ---
+
+def des_encrypt_blocks(bloques, subclaves):
+    """
+    Cifra N bloques con DES.
+
+    Args:
+        bloques: bytes (multiplo de 8) o arreglo (N, 8) uint8
+        subclaves: 16 subclaves enteras (generar_subclaves_int o esquema.k1.int)
+
+    Returns:
+        Arreglo (N, 8) uint8 con los bloques cifrados
+    """
+    return uint64_a_bloques(_des_rondas_np(bloques_a_uint64(bloques), subclaves))
+
+
+def des_decrypt_blocks(bloques, subclaves):
+    """Descifra N bloques con DES (mismas subclaves que para cifrar)."""
+    return uint64_a_bloques(_des_rondas_np(bloques_a_uint64(bloques), subclaves[::-1]))
+
+
+def triple_des_encrypt_blocks(bloques, k1_subclaves, k2_subclaves):
+    """Cifra N bloques con 3DES-EDE: E(K1) -> D(K2) -> E(K1)."""
+    valores = _des_rondas_np(bloques_a_uint64(bloques), k1_subclaves)
+    valores = _des_rondas_np(valores, k2_subclaves[::-1])
+    return uint64_a_bloques(_des_rondas_np(valores, k1_subclaves))
+
+
+def triple_des_decrypt_blocks(bloques, k1_subclaves, k2_subclaves):
+    """Descifra N bloques con 3DES-EDE: D(K1) -> E(K2) -> D(K1)."""
+    valores = _des_rondas_np(bloques_a_uint64(bloques), k1_subclaves[::-1])
+    valores = _des_rondas_np(valores, k2_subclaves)
+    return uint64_a_bloques(_des_rondas_np(valores, k1_subclaves[::-1]))
+
+
+# --- MODOS ---
+
+def _cifrar_valores(esquema, valores):
+    """Cifra N uint64 con DES o 3DES segun el esquema de clave."""
+    if esquema.k2 is None:
+        return _des_rondas_np(valores, esquema.k1.int)
+    valores = _des_rondas_np(valores, esquema.k1.int)
+    valores = _des_rondas_np(valores, esquema.k2.int_inv)
+    return _des_rondas_np(valores, esquema.k1.int)
+
+
+def _descifrar_valores(esquema, valores):
+    """Descifra N uint64 con DES o 3DES segun el esquema de clave."""
+    if esquema.k2 is None:
+        return _des_rondas_np(valores, esquema.k1.int_inv)
+    valores = _des_rondas_np(valores, esquema.k1.int_inv)
+    valores = _des_rondas_np(valores, esquema.k2.int)
+    return _des_rondas_np(valores, esquema.k1.int_inv)
+
+
+def ecb_encrypt_np(key_bytes, datos):
+    """
+    Cifra en modo ECB sin padding (datos multiplo de 8 bytes).
+
+    Args:
+        key_bytes: 8 bytes (DES) o 16 bytes (3DES 2-key)
+        datos: bytes a cifrar
+
+    Returns:
+        bytes: Ciphertext del mismo tamano
+    """
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        return _cifrar_valores(esquema, bloques_a_uint64(datos)).astype('>u8').tobytes()
+
+
+def ecb_decrypt_np(key_bytes, datos):
+    """Descifra en modo ECB sin quitar padding."""
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        return _descifrar_valores(esquema, bloques_a_uint64(datos)).astype('>u8').tobytes()
+
+
+def ctr_crypt_np(key_bytes, datos, nonce=b"", valor_inicial=0):
+    """
+    Cifra o descifra en modo CTR; bloque de contador nonce || contador,
+    como ctr_crypt de des_paralelo.py y DES3.MODE_CTR de PyCryptodome.
+    """
+    if len(nonce) >= 8:
+        raise ValueError("El nonce debe tener menos de 8 bytes")
+    bits_contador = 8 * (8 - len(nonce))
+    n = -(-len(datos) // 8)
+    if valor_inicial < 0 or valor_inicial + n > 1 << bits_contador:
+        raise ValueError("El contador se desbordaria con este nonce y tamano de mensaje")
+
+    base = (int.from_bytes(nonce, 'big') << bits_contador) + valor_inicial
+    contadores = np.arange(n, dtype=np.uint64) + np.uint64(base)
+
+    with CACHE_SUBCLAVES.usar(key_bytes) as esquema:
+        flujo = _cifrar_valores(esquema, contadores).astype('>u8').view(np.uint8)
+
+    return (np.frombuffer(datos, dtype=np.uint8) ^ flujo[:len(datos)]).tobytes()
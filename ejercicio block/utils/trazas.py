@@ -0,0 +1,98 @@
+"""
+trazas.py - Observadores para seguir el detalle de los cifradores por bloques.
+
+Las funciones de DES, 3DES y AES reciben un parametro opcional `observador`.
+Si es None (valor por defecto) no se formatea ni se imprime nada; si se pasa
+un observador, este recibe los valores intermedios sin formatear (cadenas
+binarias del motor de referencia) y decide que hacer con ellos.
+
+- ObservadorCifrado: interfaz base, todos los metodos son no-op
+- ImpresorTrazas: imprime el mismo detalle que mostraban los scripts originales
+  (el ancho y el cierre de las secciones se configuran: DES usaba 50 '=' sin
+  linea de cierre, 3DES 60 '=' con cierre)
+- RegistroTrazas: guarda los eventos en una lista (util para pruebas)
+"""
+import sys
+
+from utils.des_core import bin_to_hex
+
+
+class ObservadorCifrado:
+    """Interfaz base. Se sobrescriben solo los eventos que interesan."""
+
+    def seccion(self, titulo):
+        """Inicio de una operacion (cifrado de un bloque, modo CBC, etc.)."""
+
+    def subseccion(self, titulo):
+        """Inicio de una etapa dentro de la operacion (E-D-E de 3DES)."""
+
+    def valor(self, etiqueta, bloque, separado=False):
+        """
+        Valor intermedio: bloque binario (cadena de '0'/'1').
+
+        separado es solo una pista de presentacion (linea en blanco antes);
+        los observadores que no imprimen la ignoran.
+        """
+
+    def ronda(self, numero, L, R, subclave):
+        """Estado al terminar una ronda Feistel (cadenas binarias)."""
+
+    def mensaje(self, texto, separado=False):
+        """Texto informativo libre (tamanos, rutas, etc.)."""
+
+
+class ImpresorTrazas(ObservadorCifrado):
+    """
+    Imprime las trazas en hexadecimal, con el formato de los scripts originales.
+
+    Args:
+        destino: Archivo de salida (por defecto sys.stdout)
+        ancho_seccion: Cantidad de '=' de las lineas de seccion
+        cerrar_seccion: Si True, repite la linea de '=' despues del titulo
+    """
+
+    def __init__(self, destino=None, ancho_seccion=60, cerrar_seccion=True):
+        self.destino = destino
+        self.ancho_seccion = ancho_seccion
+        self.cerrar_seccion = cerrar_seccion
+
+    def _imprimir(self, texto):
+        print(texto, file=self.destino if self.destino is not None else sys.stdout)
+
+    def seccion(self, titulo):
+        linea = '=' * self.ancho_seccion
+        self._imprimir(f"\n{linea}\n{titulo}" + (f"\n{linea}" if self.cerrar_seccion else ""))
+
+    def subseccion(self, titulo):
+        self._imprimir(f"\n--- {titulo} ---")
+
+    def valor(self, etiqueta, bloque, separado=False):
+        self._imprimir(f"{chr(10) if separado else ''}{etiqueta}: {bin_to_hex(bloque)}")
+
+    def ronda(self, numero, L, R, subclave):
+        self._imprimir(f"Round {numero:2d}   {bin_to_hex(L)}   {bin_to_hex(R)}   {bin_to_hex(subclave)}")
+
+    def mensaje(self, texto, separado=False):
+        self._imprimir(f"\n{texto}" if separado else texto)
+
+
+class RegistroTrazas(ObservadorCifrado):
+    """Guarda cada evento como tupla (tipo, *argumentos) en self.eventos."""
+
+    def __init__(self):
+        self.eventos = []
+
+    def seccion(self, titulo):
+        self.eventos.append(('seccion', titulo))
+
+    def subseccion(self, titulo):
+        self.eventos.append(('subseccion', titulo))
+
+    def valor(self, etiqueta, bloque, separado=False):
+        self.eventos.append(('valor', etiqueta, bloque))
+
+    def ronda(self, numero, L, R, subclave):
+        self.eventos.append(('ronda', numero, L, R, subclave))
+
+    def mensaje(self, texto, separado=False):
+        self.eventos.append(('mensaje', texto))
@@ -0,0 +1,335 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import Crypto
+from Crypto.Hash import BLAKE2b
+
+from explorar_hashes import ALGORITMOS
+
+# Benchmark de funciones hash para elegir el algoritmo de los manifiestos
+# con datos: throughput (MB/s) y latencia por llamada de cada algoritmo, en
+# sus variantes PyCryptodome y hashlib, para mensajes de 16 B a 1 GB, con uno
+# o varios hilos.
+#
+# Cada medicion hashea un mensaje completo por llamada (new + update + digest).
+# Los mensajes de mas de TAM_BUFFER se hashean pasando el mismo buffer varias
+# veces, asi 1 GB no necesita 1 GB de memoria. Con N hilos, cada hilo hashea
+# su propio mensaje en paralelo y se reporta el throughput total.
+#
+# Cada caso se mide --repeticiones veces, intercalando las variantes para
+# que una perturbacion pasajera no caiga toda sobre un mismo caso; se reporta
+# la mediana y el rango (minimo-maximo) de las muestras.
+#
+# --guardar-base guarda el resultado como referencia; --comparar lo compara
+# contra una referencia y marca regresion solo si la mediana baja mas que la
+# tolerancia y ademas queda por debajo del minimo medido en la base.
+
+TAM_BUFFER = 16 * 1024 * 1024
+TAMANOS = ["16", "256", "4K", "64K", "1M", "16M", "1G"]
+TIEMPO_MINIMO = 0.2
+REPETICIONES = 5
+TOLERANCIA = 0.10
+UNIDADES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def _variantes():
+    # (algoritmo, implementacion) -> funcion que crea un objeto hash nuevo
+    variantes = {}
+    for nombre, modulo in ALGORITMOS:
+        variantes[(nombre, "pycryptodome")] = modulo.new
+        variantes[(nombre, "hashlib")] = lambda n=nombre.lower(): hashlib.new(n)
+    variantes[("BLAKE2b", "pycryptodome")] = lambda: BLAKE2b.new(digest_bits=512)
+    variantes[("BLAKE2b", "hashlib")] = hashlib.blake2b
+    variantes[("BLAKE2s", "hashlib")] = hashlib.blake2s
+    return variantes
+
+
+VARIANTES = _variantes()
+
+
+def parsear_tamano(texto):
+    texto = texto.strip().upper().rstrip("B")
+    factor = UNIDADES.get(texto[-1:], 1)
+    numero = texto[:-1] if texto[-1:] in UNIDADES else texto
+    tamano = int(numero) * factor
+    if tamano < 1:
+        raise ValueError(f"Tamano invalido: {texto}")
+    return tamano
+
+
+def _hashear_mensaje(crear, buffer, tamano):
+    resumen = crear()
+    vista = memoryview(buffer)
+    restante = tamano
+    while restante > 0:
+        parte = min(restante, len(buffer))
+        resumen.update(vista[:parte])
+        restante -= parte
+    return resumen.digest()
+
+
+def medir(crear, tamano, hilos=1, tiempo_minimo=TIEMPO_MINIMO):
+    # Retorna (llamadas, segundos). Cada hilo repite llamadas hasta que pasa
+    # tiempo_minimo (al menos una llamada).
+    buffers = [os.urandom(min(tamano, TAM_BUFFER)) for _ in range(hilos)]
+    llamadas = [0] * hilos
+    inicio_comun = threading.Barrier(hilos + 1)
+
+    def trabajar(indice):
+        buffer = buffers[indice]
+        inicio_comun.wait()
+        limite = time.perf_counter() + tiempo_minimo
+        cuenta = 0
+        # Lotes para que perf_counter no domine con mensajes pequenos
+        lote = max(1, min(1000, TAM_BUFFER // tamano // 64))
+        while True:
+            for _ in range(lote):
+                _hashear_mensaje(crear, buffer, tamano)
+            cuenta += lote
+            if time.perf_counter() >= limite:
+                break
+        llamadas[indice] = cuenta
+
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    inicio_comun.wait()
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.join()
+    return sum(llamadas), time.perf_counter() - inicio
+
+
+def ejecutar(variantes, tamanos, lista_hilos, tiempo_minimo=TIEMPO_MINIMO,
+             repeticiones=REPETICIONES, informar=None):
+    resultados = []
+    for hilos in lista_hilos:
+        for tamano in tamanos:
+            muestras = {clave: [] for clave in variantes}
+            for _ in range(repeticiones):
+                for clave, crear in variantes.items():
+                    llamadas, segundos = medir(crear, tamano, hilos, tiempo_minimo)
+                    muestras[clave].append((llamadas * tamano / segundos / 1e6,
+                                            segundos * hilos / llamadas * 1e6))
+            for (algoritmo, implementacion), valores in muestras.items():
+                mb_s = [valor[0] for valor in valores]
+                resultado = {
+                    "algoritmo": algoritmo,
+                    "implementacion": implementacion,
+                    "tamano": tamano,
+                    "hilos": hilos,
+                    "repeticiones": repeticiones,
+                    "mb_s": round(statistics.median(mb_s), 2),
+                    "mb_s_min": round(min(mb_s), 2),
+                    "mb_s_max": round(max(mb_s), 2),
+                    # Tiempo de una llamada visto por un hilo
+                    "latencia_us": round(statistics.median(valor[1] for valor in valores), 3),
+                }
+                resultados.append(resultado)
+                if informar:
+                    informar(resultado)
+    return resultados
+
+
+def datos_plataforma():
+    return {
+        "python": platform.python_version(),
+        "implementacion": platform.python_implementation(),
+        "sistema": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "pycryptodome": Crypto.__version__,
+        "openssl": __import__("ssl").OPENSSL_VERSION,
+    }
+
+
+def validar_base(base):
+    # Retorna la lista de resultados de una base, o lanza ValueError
+    resultados = base.get("resultados") if isinstance(base, dict) else None
+    if not isinstance(resultados, list) or not all(
+        isinstance(r, dict) and {"algoritmo", "implementacion", "tamano", "hilos", "mb_s"} <= r.keys()
+        for r in resultados
+    ):
+        raise ValueError("no tiene una lista 'resultados' con el formato de benchmark_hashes.py")
+    return resultados
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    # Casos (mismo algoritmo, implementacion, tamano e hilos) cuya mediana de
+    # throughput bajo mas que la tolerancia y ademas quedo por debajo del
+    # minimo de la base (fuera de su dispersion)
+    referencia = {
+        (r["algoritmo"], r["implementacion"], r["tamano"], r["hilos"]): r
+        for r in validar_base(base)
+    }
+    regresiones = []
+    for resultado in resultados:
+        clave = (
+            resultado["algoritmo"], resultado["implementacion"], resultado["tamano"], resultado["hilos"]
+        )
+        anterior = referencia.get(clave)
+        if not anterior or not anterior["mb_s"]:
+            continue
+        cambio = resultado["mb_s"] / anterior["mb_s"] - 1
+        resultado["cambio_vs_base"] = round(cambio, 4)
+        if cambio < -tolerancia and resultado["mb_s"] < anterior.get("mb_s_min", anterior["mb_s"]):
+            resultado["regresion"] = True
+            regresiones.append(resultado)
+    return regresiones
+
+
+def formatear_tamano(tamano):
+    for sufijo, factor in sorted(UNIDADES.items(), key=lambda x: -x[1]):
+        if tamano >= factor and tamano % factor == 0:
+            return f"{tamano // factor}{sufijo}"
+    return str(tamano)
+
+
+def imprimir_resultado(resultado):
+    cambio = resultado.get("cambio_vs_base")
+    texto_cambio = f"{cambio:+8.1%}" if cambio is not None else ""
+    if resultado.get("regresion"):
+        texto_cambio += "  REGRESION"
+    rango = f"{resultado['mb_s_min']:.1f}-{resultado['mb_s_max']:.1f}"
+    print(
+        f"{resultado['algoritmo']:<10}{resultado['implementacion']:<16}"
+        f"{formatear_tamano(resultado['tamano']):>6}{resultado['hilos']:>6}"
+        f"{resultado['mb_s']:>12.1f}{rango:>16}{resultado['latencia_us']:>16.3f}  {texto_cambio}",
+        file=sys.stderr,
+    )
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Mide throughput y latencia de MD5, SHA-1, SHA-256, SHA3-256 y BLAKE2 "
+        "(PyCryptodome y hashlib)."
+    )
+    parser.add_argument(
+        "--algoritmos",
+        nargs="+",
+        help="Filtra por algoritmo (por ejemplo SHA256 BLAKE2b). Por defecto, todos.",
+    )
+    parser.add_argument(
+        "--implementaciones",
+        nargs="+",
+        choices=["pycryptodome", "hashlib"],
+        help="Filtra por implementacion. Por defecto, ambas.",
+    )
+    parser.add_argument(
+        "--tamanos",
+        nargs="+",
+        default=TAMANOS,
+        help=f"Tamanos de mensaje, con sufijo K, M o G (por defecto {' '.join(TAMANOS)}).",
+    )
+    parser.add_argument(
+        "--hilos",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="Cantidades de hilos a medir (por ejemplo 1 4).",
+    )
+    parser.add_argument(
+        "--tiempo",
+        type=float,
+        default=TIEMPO_MINIMO,
+        help=f"Segundos minimos de cada muestra (por defecto {TIEMPO_MINIMO}).",
+    )
+    parser.add_argument(
+        "--repeticiones",
+        type=int,
+        default=REPETICIONES,
+        help=f"Muestras por caso; se reporta la mediana (por defecto {REPETICIONES}).",
+    )
+    parser.add_argument("--salida", help="Ruta del resultado JSON. Si se omite, se imprime.")
+    parser.add_argument("--guardar-base", help="Guarda el resultado como base de comparacion.")
+    parser.add_argument("--comparar", help="Base JSON contra la cual detectar regresiones.")
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=TOLERANCIA,
+        help=f"Caida de la mediana aceptada antes de marcar regresion (por defecto {TOLERANCIA}).",
+    )
+    return parser
+
+
+def main():
+    parser = construir_parser()
+    args = parser.parse_args()
+
+    try:
+        tamanos = [parsear_tamano(texto) for texto in args.tamanos]
+    except ValueError as error:
+        parser.error(str(error))
+    if any(hilos < 1 for hilos in args.hilos) or args.tiempo <= 0 or args.repeticiones < 1:
+        parser.error("--hilos, --tiempo y --repeticiones deben ser mayores a 0.")
+
+    variantes = {
+        (algoritmo, implementacion): crear
+        for (algoritmo, implementacion), crear in VARIANTES.items()
+        if (not args.algoritmos or algoritmo.upper() in {a.upper() for a in args.algoritmos})
+        and (not args.implementaciones or implementacion in args.implementaciones)
+    }
+    if not variantes:
+        parser.error("Ningun algoritmo coincide con el filtro.")
+
+    base = None
+    if args.comparar:
+        try:
+            base = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+            validar_base(base)
+        except (OSError, ValueError) as error:
+            print(f"Error: no se pudo leer la base {args.comparar}: {error}", file=sys.stderr)
+            return 1
+
+    print(
+        f"{'Algoritmo':<10}{'Implementacion':<16}{'Tamano':>6}{'Hilos':>6}"
+        f"{'MB/s':>12}{'Rango MB/s':>16}{'Latencia (us)':>16}  {'vs base' if base else ''}",
+        file=sys.stderr,
+    )
+    resultados = ejecutar(
+        variantes,
+        tamanos,
+        args.hilos,
+        args.tiempo,
+        args.repeticiones,
+        informar=None if base else imprimir_resultado,
+    )
+
+    reporte = {"plataforma": datos_plataforma(), "resultados": resultados}
+    regresiones = []
+    if base:
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for resultado in resultados:
+            imprimir_resultado(resultado)
+        reporte["comparacion"] = {
+            "base": args.comparar,
+            "tolerancia": args.tolerancia,
+            "regresiones": len(regresiones),
+        }
+        print(
+            f"\nRegresiones (mediana con caida > {args.tolerancia:.0%} y bajo el minimo de la base): "
+            f"{len(regresiones)}",
+            file=sys.stderr,
+        )
+
+    texto = json.dumps(reporte, indent=2)
+    if args.guardar_base:
+        Path(args.guardar_base).write_text(texto + "\n", encoding="utf-8")
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+    elif not args.guardar_base:
+        print(texto)
+
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+import argparse
+import http.client
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.parse import urlsplit
+
+from Crypto.Hash import SHA1
+
+# Cliente concurrente para la API de rangos de Pwned Passwords
+# (GET /range/<prefijo de 5 hex del SHA-1>).
+#
+# - Un pool de hilos revisa varias contrasenas a la vez; cada hilo mantiene
+#   su propia conexion HTTP keep-alive y la reutiliza entre consultas; las
+#   conexiones de hilos que ya terminaron se cierran al final de revisar().
+# - Cache por prefijo con TTL y capacidad acotada (LRU): muchas contrasenas
+#   comparten prefijo y una respuesta sirve para todas. Se guarda el texto
+#   de la respuesta (~30 KB con padding) y se busca el sufijo con find, que
+#   ocupa menos memoria que un dict por rango.
+# - Coalescencia: si un prefijo ya se esta descargando, los demas hilos que
+#   lo piden esperan esa misma respuesta en vez de repetir la consulta.
+# - Reintentos con backoff exponencial y jitter ante errores de red, 429
+#   (respetando Retry-After) y 5xx.
+#
+# Se puede probar sin Internet con `filtraciones_local.py servir`.
+
+URL_API = "https://api.pwnedpasswords.com"
+HILOS = 8
+TTL = 15 * 60
+CAPACIDAD = 2048
+REINTENTOS = 4
+BACKOFF = 0.5
+TIMEOUT = 10
+CABECERAS = {"User-Agent": "CI-Criptografia/1.0", "Add-Padding": "true"}
+
+
+class ClienteRangos:
+    def __init__(self, url_base=URL_API, ttl=TTL, capacidad=CAPACIDAD, reintentos=REINTENTOS,
+                 backoff=BACKOFF, timeout=TIMEOUT):
+        partes = urlsplit(url_base)
+        if partes.scheme not in ("http", "https") or not partes.hostname:
+            raise ValueError(f"URL base invalida: {url_base}")
+        self._clase_conexion = (
+            http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = partes.hostname
+        self._puerto = partes.port
+        self._ruta = partes.path.rstrip("/")
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # prefijo -> (expira, texto normalizado del rango)
+        self._en_vuelo = {}          # prefijo -> Future de la descarga en curso
+        self._conexiones = []         # (hilo, conexion) abiertas
+        self.estadisticas = {
+            "consultas_http": 0,
+            "conexiones_abiertas": 0,
+            "aciertos_cache": 0,
+            "coalescidas": 0,
+            "reintentos": 0,
+        }
+
+    # --- HTTP ---
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = self._clase_conexion(self._host, self._puerto, timeout=self.timeout)
+            self._local.conexion = conexion
+            with self._lock:
+                self._conexiones.append((threading.current_thread(), conexion))
+                self.estadisticas["conexiones_abiertas"] += 1
+        return conexion
+
+    def _descartar_conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+            with self._lock:
+                self._conexiones = [par for par in self._conexiones if par[1] is not conexion]
+
+    def _cerrar_conexiones_huerfanas(self):
+        # Cierra las conexiones de hilos que ya terminaron (p. ej. los de un pool cerrado)
+        with self._lock:
+            huerfanas = [conexion for hilo, conexion in self._conexiones if not hilo.is_alive()]
+            self._conexiones = [par for par in self._conexiones if par[0].is_alive()]
+        for conexion in huerfanas:
+            conexion.close()
+
+    def _get(self, prefijo):
+        # Una consulta; retorna (estado, cuerpo, cabeceras)
+        conexion = self._conexion()
+        try:
+            conexion.request("GET", f"{self._ruta}/range/{prefijo}", headers=CABECERAS)
+            respuesta = conexion.getresponse()
+            cuerpo = respuesta.read()  # leer completo para reutilizar la conexion
+        except (OSError, http.client.HTTPException):
+            self._descartar_conexion()
+            raise
+        with self._lock:
+            self.estadisticas["consultas_http"] += 1
+        if respuesta.will_close:
+            self._descartar_conexion()
+        return respuesta.status, cuerpo, respuesta.headers
+
+    def _descargar(self, prefijo):
+        for intento in range(self.reintentos + 1):
+            espera = self.backoff * 2 ** intento * random.uniform(0.5, 1.5)
+            try:
+                estado, cuerpo, cabeceras = self._get(prefijo)
+            except (OSError, http.client.HTTPException) as error:
+                motivo = error
+            else:
+                if estado == 200:
+                    return parsear_rango(cuerpo.decode("utf-8"))
+                motivo = f"HTTP {estado}"
+                if estado != 429 and estado < 500:
+                    raise URLError(motivo)
+                if estado == 429 and cabeceras.get("Retry-After", "").isdigit():
+                    espera = float(cabeceras["Retry-After"])
+            if intento == self.reintentos:
+                raise URLError(f"{motivo} (tras {self.reintentos} reintentos)")
+            with self._lock:
+                self.estadisticas["reintentos"] += 1
+            time.sleep(espera)
+
+    # --- cache y coalescencia ---
+
+    def rango(self, prefijo):
+        # Texto normalizado del rango del prefijo, desde el cache o la API
+        prefijo = prefijo.upper()
+        with self._lock:
+            entrada = self._cache.get(prefijo)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._cache.move_to_end(prefijo)
+                self.estadisticas["aciertos_cache"] += 1
+                return entrada[1]
+            futuro = self._en_vuelo.get(prefijo)
+            propio = futuro is None
+            if propio:
+                futuro = self._en_vuelo[prefijo] = Future()
+            else:
+                self.estadisticas["coalescidas"] += 1
+
+        if not propio:
+            return futuro.result()
+
+        try:
+            datos = self._descargar(prefijo)
+        except BaseException as error:
+            with self._lock:
+                del self._en_vuelo[prefijo]
+            futuro.set_exception(error)
+            raise
+
+        with self._lock:
+            self._cache[prefijo] = (time.monotonic() + self.ttl, datos)
+            self._cache.move_to_end(prefijo)
+            while len(self._cache) > self.capacidad:
+                self._cache.popitem(last=False)
+            del self._en_vuelo[prefijo]
+        futuro.set_result(datos)
+        return datos
+
+    def apariciones(self, hash_sha1):
+        hash_sha1 = hash_sha1.upper()
+        return buscar_sufijo(self.rango(hash_sha1[:5]), hash_sha1[5:])
+
+    def revisar(self, contrasenas, hilos=HILOS):
+        # Retorna [(contrasena, apariciones o excepcion)] en el mismo orden
+        def revisar_una(contrasena):
+            try:
+                return contrasena, self.apariciones(SHA1.new(contrasena.encode()).hexdigest())
+            except (URLError, OSError, http.client.HTTPException) as error:
+                return contrasena, error
+
+        with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+            resultados = list(pool.map(revisar_una, contrasenas))
+        # Al salir del with los hilos del pool terminaron; sus conexiones no se reutilizan
+        self._cerrar_conexiones_huerfanas()
+        return resultados
+
+    def cerrar(self):
+        with self._lock:
+            for _, conexion in self._conexiones:
+                conexion.close()
+            self._conexiones.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def parsear_rango(contenido):
+    # "\nSUFIJO:CUENTA\nSUFIJO:CUENTA\n..." en mayusculas, sin \r, para buscar con find
+    return "\n" + contenido.upper().replace("\r", "").strip("\n") + "\n"
+
+
+def buscar_sufijo(rango, sufijo):
+    inicio = rango.find(f"\n{sufijo}:")
+    if inicio < 0:
+        return 0
+    inicio += len(sufijo) + 2
+    return int(rango[inicio:rango.index("\n", inicio)])
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Revisa contrasenas contra la API de rangos de Pwned Passwords en paralelo."
+    )
+    parser.add_argument("contrasenas", nargs="*")
+    parser.add_argument("--archivo", help="Archivo con una contrasena por linea.")
+    parser.add_argument("--url-base", default=URL_API, help="Por ejemplo, el servidor de filtraciones_local.py.")
+    parser.add_argument("--hilos", type=int, default=HILOS)
+    parser.add_argument("--ttl", type=float, default=TTL, help="Segundos que se guarda cada rango.")
+    parser.add_argument("--reintentos", type=int, default=REINTENTOS)
+    return parser
+
+
+def main():
+    parser = construir_parser()
+    args = parser.parse_args()
+
+    contrasenas = list(args.contrasenas)
+    if args.archivo:
+        with open(args.archivo, "r", encoding="utf-8") as archivo:
+            contrasenas += [linea.rstrip("\r\n") for linea in archivo]
+    if not contrasenas:
+        parser.error("Debes indicar contrasenas o --archivo.")
+    if args.hilos < 1 or args.reintentos < 0:
+        parser.error("--hilos debe ser mayor a 0 y --reintentos no puede ser negativo.")
+
+    try:
+        cliente = ClienteRangos(args.url_base, ttl=args.ttl, reintentos=args.reintentos)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    with cliente:
+        resultados = cliente.revisar(contrasenas, args.hilos)
+    segundos = time.perf_counter() - inicio
+
+    errores = 0
+    for contrasena, apariciones in resultados:
+        if isinstance(apariciones, Exception):
+            errores += 1
+            print(f"{contrasena}: no se pudo consultar la API: {apariciones}")
+        elif len(resultados) <= 50 or apariciones:
+            print(f"{contrasena}: aparece {apariciones} veces")
+    print(f"\n{len(resultados)} contrasenas en {segundos:.2f} s; {cliente.estadisticas}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,12 @@
 from Crypto.Hash import MD5, SHA1, SHA256, SHA3_256
 
+ALGORITMOS = [
+    ("MD5", MD5),
+    ("SHA1", SHA1),
+    ("SHA256", SHA256),
+    ("SHA3_256", SHA3_256),
+]
+
 
 def calculo_hash():
     mensaje = b"MediSoft-v2.1.0"
@@ -10,17 +17,10 @@ def calculo_hash():
         minuscula,
     ]
 
-    algoritmos = [
-        ("MD5", MD5),
-        ("SHA1", SHA1),
-        ("SHA256", SHA256),
-        ("SHA3_256", SHA3_256),
-    ]
-
     resultados = []
     for dato in mensajes:
         texto = dato.decode()
-        for nombre, algoritmo in algoritmos:
+        for nombre, algoritmo in ALGORITMOS:
             hash_hex = algoritmo.new(dato).hexdigest()
             longitud_hex = len(hash_hex)
             longitud_bits = longitud_hex * 4
@@ -42,4 +42,5 @@ def calculo_hash():
         print(f"{texto:<18}{nombre:<12}{bits:<16}{longitud_hex:<15}{hash_hex}")
 
 
-calculo_hash()
+if __name__ == "__main__":
+    calculo_hash()
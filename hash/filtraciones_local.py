@@ -0,0 +1,282 @@
+import argparse
+import bisect
+import hashlib
+import mmap
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Consulta de contrasenas filtradas sin conexion (k-anonimato de Pwned Passwords).
+#
+# `importar` convierte un dataset SHA-1 descargado a un archivo binario
+# compacto. El dataset puede ser:
+# - un directorio con un archivo por rango (00000.txt ... FFFFF.txt, lineas
+#   "SUFIJO35:CUENTA"), como lo deja el descargador oficial
+# - un solo archivo "HASH40:CUENTA" ordenado por hash
+#
+# Formato del archivo binario:
+# [4 bytes: MAGIC "PWN1"] [4 bytes: cantidad de registros]
+# [indice: (2^20 + 1) x 4 bytes, registro inicial de cada prefijo de 5 hex]
+# [registros de 22 bytes: bytes 2..19 del SHA-1 (18) + cuenta (4)], ordenados
+#
+# `BaseFiltraciones` abre el archivo con mmap: el indice da el rango del
+# prefijo y dentro de ese rango se hace busqueda binaria sobre registros de
+# ancho fijo, sin cargar el archivo en memoria.
+#
+# `servir` levanta un servidor HTTP local con el mismo formato que
+# GET https://api.pwnedpasswords.com/range/<prefijo>, para probar el camino
+# en linea sin depender de Internet.
+
+MAGIC = b"PWN1"
+PREFIJOS = 1 << 20
+CABECERA = struct.Struct(">4sI")
+ENTRADA_INDICE = struct.Struct(">I")
+REGISTRO = struct.Struct(">18sI")
+INICIO_REGISTROS = CABECERA.size + (PREFIJOS + 1) * ENTRADA_INDICE.size
+
+
+def sha1_hex(contrasena):
+    return hashlib.sha1(contrasena.encode("utf-8")).hexdigest().upper()
+
+
+def _lineas_dataset(origen):
+    # Genera (hash40, cuenta) en orden desde un directorio de rangos o un archivo
+    origen = Path(origen)
+    if origen.is_dir():
+        for ruta in sorted(origen.glob("*.txt")):
+            prefijo = ruta.stem.upper()
+            if len(prefijo) != 5:
+                continue
+            with ruta.open("r", encoding="utf-8") as archivo:
+                for linea in archivo:
+                    linea = linea.strip()
+                    if linea:
+                        sufijo, cuenta = linea.split(":")
+                        yield prefijo + sufijo.upper(), int(cuenta)
+    else:
+        with origen.open("r", encoding="utf-8") as archivo:
+            for linea in archivo:
+                linea = linea.strip()
+                if linea:
+                    hash_sha1, cuenta = linea.split(":")
+                    yield hash_sha1.upper(), int(cuenta)
+
+
+def importar_dataset(origen, ruta_salida):
+    # Escribe el archivo binario en una sola pasada; el dataset debe venir
+    # ordenado por hash (como lo publica Pwned Passwords)
+    ruta_salida = Path(ruta_salida)
+    temporal = ruta_salida.with_name(ruta_salida.name + ".tmp")
+    inicio_prefijo = [0] * (PREFIJOS + 1)
+    total = 0
+    anterior = b""
+
+    try:
+        with temporal.open("wb") as salida:
+            salida.write(b"\0" * INICIO_REGISTROS)
+            for numero, (hash_sha1, cuenta) in enumerate(_lineas_dataset(origen), start=1):
+                if len(hash_sha1) != 40:
+                    raise ValueError(f"Registro {numero}: se esperaba un SHA-1 de 40 hex.")
+                if cuenta < 0:
+                    raise ValueError(f"Registro {numero}: cuenta invalida ({cuenta}).")
+                digest = bytes.fromhex(hash_sha1)
+                if digest <= anterior:
+                    raise ValueError(f"Registro {numero}: el dataset no esta ordenado por hash.")
+                anterior = digest
+                inicio_prefijo[(int.from_bytes(digest[:3], "big") >> 4) + 1] += 1
+                salida.write(REGISTRO.pack(digest[2:], min(cuenta, 0xFFFFFFFF)))
+                total += 1
+
+            # Conteos por prefijo -> registro inicial de cada prefijo
+            for prefijo in range(PREFIJOS):
+                inicio_prefijo[prefijo + 1] += inicio_prefijo[prefijo]
+            salida.seek(0)
+            salida.write(CABECERA.pack(MAGIC, total))
+            salida.write(struct.pack(f">{PREFIJOS + 1}I", *inicio_prefijo))
+
+        temporal.replace(ruta_salida)
+    except BaseException:
+        # Un dataset invalido o desordenado no deja un .tmp parcial (puede pesar cientos de MB)
+        temporal.unlink(missing_ok=True)
+        raise
+    return total
+
+
+class _ClavesRango:
+    # Vista de los registros [inicio, fin) como secuencia de claves para bisect
+    def __init__(self, datos, inicio, fin):
+        self.datos = datos
+        self.inicio = inicio
+        self.fin = fin
+
+    def __len__(self):
+        return self.fin - self.inicio
+
+    def __getitem__(self, i):
+        posicion = INICIO_REGISTROS + (self.inicio + i) * REGISTRO.size
+        return self.datos[posicion:posicion + 18]
+
+
+class BaseFiltraciones:
+    def __init__(self, ruta):
+        self._archivo = open(ruta, "rb")
+        try:
+            self._datos = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"Archivo vacio: {ruta}")
+        magic, self.total = CABECERA.unpack_from(self._datos, 0)
+        if magic != MAGIC or len(self._datos) != INICIO_REGISTROS + self.total * REGISTRO.size:
+            self.cerrar()
+            raise ValueError(f"No es una base de filtraciones valida: {ruta}")
+
+    def _rango(self, prefijo):
+        posicion = CABECERA.size + prefijo * ENTRADA_INDICE.size
+        return struct.unpack_from(">II", self._datos, posicion)
+
+    def apariciones(self, hash_sha1):
+        # Cantidad de veces que aparece el SHA-1 (40 hex); 0 si no esta
+        digest = bytes.fromhex(hash_sha1)
+        inicio, fin = self._rango(int.from_bytes(digest[:3], "big") >> 4)
+        claves = _ClavesRango(self._datos, inicio, fin)
+        i = bisect.bisect_left(claves, digest[2:])
+        if i < len(claves) and claves[i] == digest[2:]:
+            posicion = INICIO_REGISTROS + (inicio + i) * REGISTRO.size
+            return REGISTRO.unpack_from(self._datos, posicion)[1]
+        return 0
+
+    def apariciones_contrasena(self, contrasena):
+        return self.apariciones(sha1_hex(contrasena))
+
+    def rango(self, prefijo_hex):
+        # Lineas "SUFIJO35:CUENTA" del prefijo, como las devuelve la API
+        prefijo = int(prefijo_hex, 16)
+        inicio, fin = self._rango(prefijo)
+        lineas = []
+        for i in range(inicio, fin):
+            clave, cuenta = REGISTRO.unpack_from(self._datos, INICIO_REGISTROS + i * REGISTRO.size)
+            lineas.append(f"{clave.hex().upper()[1:]}:{cuenta}")
+        return lineas
+
+    def cerrar(self):
+        self._datos.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def crear_servidor(base, host="127.0.0.1", puerto=0):
+    # Servidor HTTP que imita GET /range/<prefijo> de Pwned Passwords.
+    # Retorna el servidor sin iniciar; usar serve_forever() o iniciar_servidor().
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # conexiones keep-alive
+        # Cabeceras y cuerpo salen en dos escrituras; sin esto, Nagle + ACK
+        # retardado agregan ~40 ms a cada respuesta en una conexion reutilizada
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            partes = self.path.split("?")[0].strip("/").split("/")
+            prefijo = partes[-1].upper() if len(partes) == 2 and partes[0] == "range" else ""
+            if len(prefijo) != 5 or any(c not in "0123456789ABCDEF" for c in prefijo):
+                self.send_error(400, "El prefijo debe tener 5 caracteres hexadecimales")
+                return
+            cuerpo = "\r\n".join(base.rango(prefijo)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, puerto), Manejador)
+
+
+def iniciar_servidor(base, host="127.0.0.1", puerto=0):
+    # Inicia el servidor en un hilo; retorna (servidor, url_base)
+    servidor = crear_servidor(base, host, puerto)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    host, puerto = servidor.server_address[:2]
+    return servidor, f"http://{host}:{puerto}"
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Base local de hashes SHA-1 filtrados (Pwned Passwords) para consultas sin conexion."
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    importar = subparsers.add_parser("importar", help="Convierte un dataset descargado a la base binaria.")
+    importar.add_argument("origen", help="Directorio de rangos XXXXX.txt o archivo HASH:CUENTA ordenado.")
+    importar.add_argument("--salida", required=True, help="Ruta de la base binaria.")
+
+    consultar = subparsers.add_parser("consultar", help="Consulta contrasenas contra la base.")
+    consultar.add_argument("base", help="Ruta de la base binaria.")
+    consultar.add_argument("contrasenas", nargs="*")
+    consultar.add_argument("--archivo", help="Archivo con una contrasena por linea.")
+
+    servir = subparsers.add_parser("servir", help="Sirve la base como la API /range/<prefijo>.")
+    servir.add_argument("base", help="Ruta de la base binaria.")
+    servir.add_argument("--host", default="127.0.0.1")
+    servir.add_argument("--puerto", type=int, default=8080)
+    return parser
+
+
+def main():
+    parser = construir_parser()
+    args = parser.parse_args()
+
+    try:
+        if args.comando == "importar":
+            inicio = time.perf_counter()
+            total = importar_dataset(args.origen, args.salida)
+            print(f"Registros importados: {total} en {time.perf_counter() - inicio:.1f} s")
+            print(f"Base guardada en: {args.salida}")
+
+        elif args.comando == "consultar":
+            if not args.contrasenas and not args.archivo:
+                parser.error("Debes indicar contrasenas o --archivo.")
+            with BaseFiltraciones(args.base) as base:
+                for contrasena in args.contrasenas:
+                    print(f"{contrasena}: aparece {base.apariciones_contrasena(contrasena)} veces")
+                if args.archivo:
+                    inicio = time.perf_counter()
+                    revisadas = filtradas = 0
+                    with open(args.archivo, "r", encoding="utf-8") as archivo:
+                        for linea in archivo:
+                            revisadas += 1
+                            filtradas += base.apariciones_contrasena(linea.rstrip("\r\n")) > 0
+                    segundos = time.perf_counter() - inicio
+                    print(
+                        f"{revisadas} contrasenas revisadas, {filtradas} filtradas "
+                        f"({revisadas / segundos if segundos else 0:.0f} por segundo)"
+                    )
+
+        else:
+            with BaseFiltraciones(args.base) as base:
+                servidor = crear_servidor(base, args.host, args.puerto)
+                print(f"Sirviendo {base.total} hashes en http://{args.host}:{args.puerto}/range/<prefijo>")
+                try:
+                    servidor.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    servidor.server_close()
+
+    except (ValueError, OSError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
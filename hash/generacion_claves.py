@@ -3,6 +3,7 @@ from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
 contrasenas = ["admin", "123456", "hospital", "medisoft2024"]
+URL_API = "https://api.pwnedpasswords.com"
 
 
 def generar_claves_hash(contrasenas):
@@ -13,10 +14,11 @@ def generar_claves_hash(contrasenas):
     return claves_hash
 
 
-def llamar_api(clave_hash):
+def llamar_api(clave_hash, url_base=URL_API):
+    # url_base permite usar el servidor local de filtraciones_local.py
     prefijo = clave_hash[:5].upper()
     sufijo = clave_hash[5:].upper()
-    url = f"https://api.pwnedpasswords.com/range/{prefijo}"
+    url = f"{url_base}/range/{prefijo}"
     headers = {
         "User-Agent": "CI-Criptografia/1.0",
         "Add-Padding": "true",
@@ -33,18 +35,33 @@ def llamar_api(clave_hash):
     return 0
 
 
-def revisar_filtraciones(contrasenas):
+def revisar_filtraciones(contrasenas, url_base=URL_API, base_local=None, cliente=None):
+    # base_local: BaseFiltraciones de filtraciones_local.py para consultar sin conexion.
+    # cliente: ClienteRangos de cliente_filtraciones.py; consulta todas las
+    # contrasenas en paralelo, con cache por prefijo, y luego imprime en orden.
+    resultados = dict(cliente.revisar(contrasenas)) if cliente is not None else {}
+
     for contrasena, hash_sha256 in generar_claves_hash(contrasenas):
         hash_sha1_api = SHA1.new(contrasena.encode()).hexdigest().upper()
 
         try:
-            apariciones = llamar_api(hash_sha1_api)
+            if cliente is not None:
+                apariciones = resultados[contrasena]
+                if isinstance(apariciones, Exception):
+                    raise apariciones
+            elif base_local is not None:
+                apariciones = base_local.apariciones(hash_sha1_api)
+            else:
+                apariciones = llamar_api(hash_sha1_api, url_base)
             print(f"{contrasena}: {hash_sha256}")
             print(f"Aparece {apariciones} veces en filtraciones conocidas.\n")
-        except (HTTPError, URLError, TimeoutError) as error:
+        except (HTTPError, URLError, TimeoutError, OSError) as error:
             print(f"{contrasena}: {hash_sha256}")
             print(f"No se pudo consultar la API: {error}\n")
 
 
 if __name__ == "__main__":
-    revisar_filtraciones(contrasenas)
+    from cliente_filtraciones import ClienteRangos
+
+    with ClienteRangos(URL_API) as cliente:
+        revisar_filtraciones(contrasenas, cliente=cliente)
@@ -1,33 +1,71 @@
 import argparse
+import hashlib
 import os
 import sys
-from hashlib import sha256
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
+BASE_DIR = Path(__file__).resolve().parent
 BUFFER_SIZE = 65536
+HILOS = min(32, (os.cpu_count() or 1) + 4)
 
+# Algoritmo -> nombre del manifiesto que genera
+MANIFIESTOS = {
+    "sha256": "SHA256SUMS.txt",
+    "sha512": "SHA512SUMS.txt",
+    "blake2b": "B2SUMS.txt",
+}
+EXTENSIONES_IGNORADAS = (".sig",)
 
-def calcular_sha256_archivo(ruta_archivo):
-    resumen = sha256()
-    with ruta_archivo.open("rb") as archivo:
+
+def calcular_hashes_archivo(ruta_archivo, algoritmos=("sha256",), buffer_size=BUFFER_SIZE):
+    # Una sola lectura del archivo alimenta todos los algoritmos. hashlib
+    # libera el GIL al procesar cada bloque, por eso varios hilos avanzan
+    # en paralelo.
+    resumenes = [hashlib.new(algoritmo) for algoritmo in algoritmos]
+    bloque = bytearray(buffer_size)
+    vista = memoryview(bloque)
+    with ruta_archivo.open("rb", buffering=0) as archivo:
         while True:
-            bloque = archivo.read(BUFFER_SIZE)
-            if not bloque:
+            leidos = archivo.readinto(bloque)
+            if not leidos:
                 break
-            resumen.update(bloque)
-    return resumen.hexdigest()
+            for resumen in resumenes:
+                resumen.update(vista[:leidos])
+    return {
+        algoritmo: resumen.hexdigest()
+        for algoritmo, resumen in zip(algoritmos, resumenes)
+    }
+
+
+def calcular_sha256_archivo(ruta_archivo):
+    return calcular_hashes_archivo(ruta_archivo)["sha256"]
 
 
-def resolver_archivos(rutas):
-    archivos = []
+def resolver_archivos(rutas, excluir=()):
+    # Los directorios se recorren recursivamente. Se omiten los manifiestos
+    # que se van a escribir y las firmas, para no hashearlos a ellos mismos.
+    excluir = {Path(ruta).resolve() for ruta in excluir}
+    archivos = set()
     for ruta in rutas:
         archivo = Path(ruta).resolve()
         if not archivo.exists():
             raise FileNotFoundError(f"No existe el archivo: {archivo}")
-        if not archivo.is_file():
+        if archivo.is_dir():
+            candidatos = (
+                candidato
+                for candidato in archivo.rglob("*")
+                if candidato.is_file()
+                and candidato.name not in MANIFIESTOS.values()
+                and candidato.suffix not in EXTENSIONES_IGNORADAS
+            )
+        elif archivo.is_file():
+            candidatos = [archivo]
+        else:
             raise IsADirectoryError(f"La ruta no es un archivo: {archivo}")
-        archivos.append(archivo)
-    return archivos
+        archivos.update(candidato.resolve() for candidato in candidatos)
+    return sorted(archivos - excluir)
 
 
 def obtener_ruta_manifiesto(archivos, ruta_salida):
@@ -46,22 +84,118 @@ def obtener_ruta_manifiesto(archivos, ruta_salida):
     return directorio_comun / "SHA256SUMS.txt"
 
 
+def obtener_rutas_manifiestos(rutas, ruta_salida, algoritmos):
+    # --manifiesto define la ruta del primer algoritmo; los demas se crean
+    # en el mismo directorio con su nombre estandar.
+    if ruta_salida:
+        directorio = Path(ruta_salida).resolve().parent
+    else:
+        # Un directorio de entrada cuenta como su propia carpeta; un archivo, como su padre
+        carpetas = [
+            Path(ruta).resolve() if Path(ruta).is_dir() else Path(ruta).resolve().parent
+            for ruta in rutas
+        ]
+        try:
+            directorio = Path(os.path.commonpath([str(carpeta) for carpeta in carpetas]))
+        except ValueError as error:
+            raise ValueError(
+                "Los archivos deben estar en la misma unidad o debes indicar --manifiesto."
+            ) from error
+
+    manifiestos = {}
+    for algoritmo in algoritmos:
+        if ruta_salida and not manifiestos:
+            manifiestos[algoritmo] = Path(ruta_salida).resolve()
+        else:
+            manifiestos[algoritmo] = directorio / MANIFIESTOS[algoritmo]
+
+    # Dos algoritmos en el mismo archivo mezclarian sus lineas (y sus firmas)
+    if len(set(manifiestos.values())) != len(manifiestos):
+        raise ValueError(
+            "--manifiesto coincide con el manifiesto estandar de otro algoritmo; "
+            "usa otro nombre o cambia el orden de --algoritmos."
+        )
+    return manifiestos
+
+
 def nombre_para_manifiesto(ruta_archivo, ruta_manifiesto):
     relativo = os.path.relpath(ruta_archivo, start=ruta_manifiesto.parent)
     return relativo.replace("\\", "/")
 
 
-def agregar_registros_al_manifiesto(archivos, ruta_manifiesto):
-    ruta_manifiesto.parent.mkdir(parents=True, exist_ok=True)
+def iterar_hashes(archivos, algoritmos=("sha256",), hilos=HILOS, buffer_size=BUFFER_SIZE):
+    # Genera {algoritmo: hash} en el mismo orden que archivos, a medida que
+    # cada uno esta listo (los siguientes se siguen hasheando en el pool)
+    with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+        yield from pool.map(
+            lambda archivo: calcular_hashes_archivo(archivo, algoritmos, buffer_size),
+            archivos,
+        )
+
+
+def hashear_archivos(archivos, algoritmos=("sha256",), hilos=HILOS, buffer_size=BUFFER_SIZE):
+    # Retorna una lista de {algoritmo: hash} en el mismo orden que archivos
+    return list(iterar_hashes(archivos, algoritmos, hilos, buffer_size))
+
+
+def iniciar_resumen_firma(ruta_manifiesto):
+    # SHA-256 para firmar el manifiesto. Como los registros se agregan al
+    # final, primero se incluye el contenido que el archivo ya tenia.
+    from Crypto.Hash import SHA256
+
+    resumen = SHA256.new()
+    if ruta_manifiesto.exists():
+        with ruta_manifiesto.open("rb") as archivo:
+            while True:
+                bloque = archivo.read(BUFFER_SIZE)
+                if not bloque:
+                    break
+                resumen.update(bloque)
+    return resumen
+
+
+def agregar_registros_al_manifiesto(
+    archivos,
+    ruta_manifiesto,
+    algoritmos=("sha256",),
+    hilos=HILOS,
+    buffer_size=BUFFER_SIZE,
+    manifiestos=None,
+    resumenes=None,
+):
+    # manifiestos: {algoritmo: ruta}; por defecto un solo manifiesto en ruta_manifiesto.
+    # resumenes: {algoritmo: hash para firmar}; cada linea se agrega al resumen
+    # al escribirla, asi el manifiesto no se vuelve a leer para firmarlo.
+    if manifiestos is None:
+        manifiestos = {algoritmos[0]: ruta_manifiesto}
+    algoritmos = list(manifiestos)
+    resumenes = resumenes or {}
+
+    # Orden determinista: por nombre relativo al manifiesto principal
+    archivos = sorted(
+        archivos, key=lambda archivo: nombre_para_manifiesto(archivo, ruta_manifiesto)
+    )
+
+    with ExitStack() as pila:
+        abiertos = {}
+        for algoritmo, ruta in manifiestos.items():
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            abiertos[algoritmo] = pila.enter_context(ruta.open("a", encoding="utf-8"))
 
-    with ruta_manifiesto.open("a", encoding="utf-8") as manifiesto:
-        for archivo in archivos:
-            hash_archivo = calcular_sha256_archivo(archivo)
+        for archivo, hashes_archivo in zip(
+            archivos, iterar_hashes(archivos, algoritmos, hilos, buffer_size)
+        ):
+            for algoritmo, ruta in manifiestos.items():
+                linea = f"{hashes_archivo[algoritmo]} {nombre_para_manifiesto(archivo, ruta)}\n"
+                abiertos[algoritmo].write(linea)
+                if algoritmo in resumenes:
+                    # En modo texto "\n" se escribe como os.linesep
+                    resumenes[algoritmo].update(linea.replace("\n", os.linesep).encode("utf-8"))
             nombre_archivo = nombre_para_manifiesto(archivo, ruta_manifiesto)
-            manifiesto.write(f"{hash_archivo} {nombre_archivo}\n")
-            print(f"{nombre_archivo} -> {hash_archivo}")
+            print(f"{nombre_archivo} -> {hashes_archivo[algoritmos[0]]}")
 
-    print(f"\nSe agregaron {len(archivos)} registros a {ruta_manifiesto}")
+    for ruta in manifiestos.values():
+        print(f"\nSe agregaron {len(archivos)} registros a {ruta}")
 
 
 def construir_parser():
@@ -71,27 +205,91 @@ def construir_parser():
     parser.add_argument(
         "archivos",
         nargs="+",
-        help="Rutas de los archivos que formaran parte del paquete.",
+        help="Rutas de los archivos (o directorios, recorridos recursivamente) del paquete.",
     )
     parser.add_argument(
         "--manifiesto",
         help="Ruta del archivo SHA256SUMS.txt. Si se omite, se crea en el directorio comun.",
     )
+    parser.add_argument(
+        "--algoritmos",
+        nargs="+",
+        choices=list(MANIFIESTOS),
+        default=["sha256"],
+        help="Algoritmos a calcular en una sola lectura; cada uno genera su manifiesto.",
+    )
+    parser.add_argument(
+        "--hilos",
+        type=int,
+        default=HILOS,
+        help=f"Cantidad de hilos que hashean archivos en paralelo (por defecto {HILOS}).",
+    )
+    parser.add_argument(
+        "--buffer",
+        type=int,
+        default=BUFFER_SIZE,
+        help=f"Tamano del buffer de lectura en bytes (por defecto {BUFFER_SIZE}).",
+    )
+    parser.add_argument(
+        "--firmar",
+        action="store_true",
+        help="Firma cada manifiesto al terminar (mismo .sig que firmar_manifiesto.py), "
+        "sin volver a leerlo.",
+    )
+    parser.add_argument(
+        "--clave-privada",
+        default=str(BASE_DIR / "medisoft_priv.pem"),
+        help="Clave privada RSA usada con --firmar.",
+    )
     return parser
 
 
+def firmar_resumenes(resumenes, manifiestos, clave_privada):
+    from firmar_manifiesto import firmar_hash
+
+    for algoritmo, resumen in resumenes.items():
+        ruta_firma = manifiestos[algoritmo].with_suffix(".sig")
+        ruta_firma.write_bytes(firmar_hash(resumen, clave_privada))
+        print(f"Manifiesto firmado: {manifiestos[algoritmo]} -> {ruta_firma}")
+        print(f"SHA-256 del manifiesto: {resumen.hexdigest()}")
+
+
 def main():
     parser = construir_parser()
     args = parser.parse_args()
 
-    if len(args.archivos) < 5:
-        parser.error("Debes proporcionar al menos 5 archivos.")
+    if args.hilos < 1 or args.buffer < 1:
+        parser.error("--hilos y --buffer deben ser mayores a 0.")
+
+    algoritmos = list(dict.fromkeys(args.algoritmos))
 
     try:
-        archivos = resolver_archivos(args.archivos)
-        ruta_manifiesto = obtener_ruta_manifiesto(archivos, args.manifiesto)
-        agregar_registros_al_manifiesto(archivos, ruta_manifiesto)
-    except (FileNotFoundError, IsADirectoryError, ValueError) as error:
+        manifiestos = obtener_rutas_manifiestos(args.archivos, args.manifiesto, algoritmos)
+        archivos = resolver_archivos(args.archivos, excluir=manifiestos.values())
+        if len(archivos) < 5:
+            parser.error("Debes proporcionar al menos 5 archivos.")
+
+        resumenes = None
+        if args.firmar:
+            from firmar_manifiesto import cargar_clave_privada
+
+            # La clave se carga antes de hashear para fallar de inmediato si no sirve
+            clave_privada = cargar_clave_privada(Path(args.clave_privada).resolve())
+            resumenes = {
+                algoritmo: iniciar_resumen_firma(ruta) for algoritmo, ruta in manifiestos.items()
+            }
+
+        agregar_registros_al_manifiesto(
+            archivos,
+            manifiestos[algoritmos[0]],
+            hilos=args.hilos,
+            buffer_size=args.buffer,
+            manifiestos=manifiestos,
+            resumenes=resumenes,
+        )
+        if resumenes:
+            firmar_resumenes(resumenes, manifiestos, clave_privada)
+    except (FileNotFoundError, IsADirectoryError, ValueError, TypeError, OSError) as error:
         print(f"Error: {error}", file=sys.stderr)
         return 1
 
@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+
+# Hash por bloques de archivos grandes. Cada bloque se lee con os.pread (no
+# usa la posicion compartida del descriptor), asi varios hilos leen y hashean
+# bloques distintos del mismo archivo a la vez; hashlib libera el GIL durante
+# update(). En sistemas sin os.pread (Windows) cada hilo abre su propio
+# manejador del archivo y usa seek + read.
+
+TAM_BLOQUE = 8 * 1024 * 1024
+TAM_LECTURA = 1024 * 1024  # un bloque se lee en partes para acotar la memoria por hilo
+HILOS = min(32, (os.cpu_count() or 1) + 4)
+
+TIENE_PREAD = hasattr(os, "pread")
+
+
+def _leer_pread(fd, inicio, tam):
+    partes = []
+    while tam > 0:
+        datos = os.pread(fd, min(tam, TAM_LECTURA), inicio)
+        if not datos:
+            break
+        partes.append(datos)
+        inicio += len(datos)
+        tam -= len(datos)
+    return b"".join(partes)
+
+
+def leer_bloque(ruta_archivo, indice, tam_bloque):
+    inicio = indice * tam_bloque
+    if TIENE_PREAD:
+        fd = os.open(ruta_archivo, os.O_RDONLY)
+        try:
+            return _leer_pread(fd, inicio, tam_bloque)
+        finally:
+            os.close(fd)
+    with open(ruta_archivo, "rb") as archivo:
+        archivo.seek(inicio)
+        return archivo.read(tam_bloque)
+
+
+def _hash_rango(leer, inicio, tam, prefijo):
+    resumen = sha256(prefijo)
+    fin = inicio + tam
+    while inicio < fin:
+        datos = leer(inicio, min(TAM_LECTURA, fin - inicio))
+        if not datos:
+            break
+        resumen.update(datos)
+        inicio += len(datos)
+    return resumen.digest()
+
+
+def hashear_bloques(ruta_archivo, tam_bloque=TAM_BLOQUE, prefijo=b"", hilos=HILOS):
+    # Retorna el SHA-256 (prefijo || bloque) de cada bloque, en orden.
+    # prefijo = b"\x00" da las hojas de Merkle de RFC 6962.
+    tam = os.path.getsize(ruta_archivo)
+    total = max(1, -(-tam // tam_bloque))
+
+    if TIENE_PREAD:
+        fd = os.open(ruta_archivo, os.O_RDONLY)
+
+        def hashear(indice):
+            return _hash_rango(
+                lambda inicio, n: os.pread(fd, n, inicio), indice * tam_bloque, tam_bloque, prefijo
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+                return list(pool.map(hashear, range(total)))
+        finally:
+            os.close(fd)
+
+    def hashear(indice):
+        with open(ruta_archivo, "rb") as archivo:
+
+            def leer(inicio, n):
+                archivo.seek(inicio)
+                return archivo.read(n)
+
+            return _hash_rango(leer, indice * tam_bloque, tam_bloque, prefijo)
+
+    with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+        return list(pool.map(hashear, range(total)))
+
+
+def rangos_distintos(esperados, obtenidos, tam_bloque, tam_archivo):
+    # Rangos de bytes [inicio, fin] (inclusive) de los bloques que no coinciden.
+    # Bloques contiguos se unen en un solo rango; bloques de mas o de menos
+    # (el archivo cambio de tamano) tambien cuentan como distintos.
+    rangos = []
+    total = max(len(esperados), len(obtenidos))
+    for indice in range(total):
+        esperado = esperados[indice] if indice < len(esperados) else None
+        obtenido = obtenidos[indice] if indice < len(obtenidos) else None
+        if esperado == obtenido:
+            continue
+        inicio = indice * tam_bloque
+        fin = max(inicio, min((indice + 1) * tam_bloque, max(tam_archivo, 1)) - 1)
+        if rangos and rangos[-1][1] + 1 == inicio:
+            rangos[-1][1] = fin
+        else:
+            rangos.append([inicio, fin])
+    return [tuple(rango) for rango in rangos]
@@ -0,0 +1,369 @@
+import argparse
+import json
+import sys
+from hashlib import sha256
+from pathlib import Path
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import pkcs1_15
+
+from generar_manifiesto import (
+    HILOS,
+    calcular_sha256_archivo,
+    hashear_archivos,
+    nombre_para_manifiesto,
+    resolver_archivos,
+)
+from hash_bloques import TAM_BLOQUE, hashear_bloques, leer_bloque, rangos_distintos
+
+# Manifiesto como arbol de Merkle (RFC 6962):
+#   hoja  = SHA-256(0x00 || datos)
+#   nodo  = SHA-256(0x01 || izquierdo || derecho)
+# Las hojas son las entradas de los archivos ordenadas por nombre. Solo se
+# firma la raiz, y un archivo (o un bloque de un archivo grande) se verifica
+# con una prueba de inclusion de O(log n) hashes, sin leer el manifiesto
+# completo ni el resto del paquete.
+#
+# Archivos de mas de tam_bloque bytes se dividen en bloques: su hash es la
+# raiz de otro arbol cuyas hojas son los bloques, asi un bloque tambien se
+# verifica por separado. Los bloques de un archivo se hashean en paralelo
+# (hash_bloques) y una diferencia se reporta como rango de bytes.
+
+VERSION = 1
+BASE_DIR = Path(__file__).resolve().parent
+NOMBRE_MANIFIESTO = "MERKLE.json"
+
+
+def hash_hoja(datos):
+    return sha256(b"\x00" + datos).digest()
+
+
+def hash_nodo(izquierdo, derecho):
+    return sha256(b"\x01" + izquierdo + derecho).digest()
+
+
+def construir_niveles(hojas):
+    # Niveles de abajo hacia arriba. Un nodo sin pareja sube sin cambios, lo
+    # que da el mismo arbol que la division en potencias de 2 de RFC 6962.
+    if not hojas:
+        raise ValueError("El arbol de Merkle necesita al menos una hoja.")
+    niveles = [list(hojas)]
+    while len(niveles[-1]) > 1:
+        anterior = niveles[-1]
+        nivel = [
+            hash_nodo(anterior[i], anterior[i + 1]) for i in range(0, len(anterior) - 1, 2)
+        ]
+        if len(anterior) % 2:
+            nivel.append(anterior[-1])
+        niveles.append(nivel)
+    return niveles
+
+
+def ruta_inclusion(niveles, indice):
+    ruta = []
+    for nivel in niveles[:-1]:
+        hermano = indice ^ 1
+        if hermano < len(nivel):
+            ruta.append(nivel[hermano])
+        indice //= 2
+    return ruta
+
+
+def raiz_desde_ruta(hoja, indice, tamano, ruta):
+    # Algoritmo de verificacion de RFC 9162, seccion 2.1.3.2
+    if not 0 <= indice < tamano:
+        raise ValueError("Indice fuera del arbol.")
+    fn, sn, resultado = indice, tamano - 1, hoja
+    for hermano in ruta:
+        if sn == 0:
+            raise ValueError("La prueba tiene hashes de mas.")
+        if fn & 1 or fn == sn:
+            resultado = hash_nodo(hermano, resultado)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            resultado = hash_nodo(resultado, hermano)
+        fn >>= 1
+        sn >>= 1
+    if sn != 0:
+        raise ValueError("A la prueba le faltan hashes.")
+    return resultado
+
+
+def datos_entrada(entrada):
+    # Lo que se hashea como hoja: incluye el tamano de bloque para que no se
+    # pueda presentar un arbol de bloques como hash de archivo ni al reves
+    return f"{entrada['hash']} {entrada['tam']} {entrada['tam_bloque']} {entrada['nombre']}".encode(
+        "utf-8"
+    )
+
+
+def hojas_de_bloques(ruta_archivo, tam_bloque, hilos=HILOS):
+    return hashear_bloques(ruta_archivo, tam_bloque, prefijo=b"\x00", hilos=hilos)
+
+
+def mensaje_raiz(tamano, raiz_hex):
+    # Lo que se firma: version, cantidad de hojas y raiz
+    return f"MERKLE-SHA256-V{VERSION}\n{tamano} {raiz_hex}\n".encode("ascii")
+
+
+def generar_manifiesto_merkle(archivos, ruta_manifiesto, tam_bloque=0, hilos=HILOS):
+    # tam_bloque = 0: cada archivo es una hoja con su SHA-256 de siempre
+    archivos = sorted(
+        archivos, key=lambda archivo: nombre_para_manifiesto(archivo, ruta_manifiesto)
+    )
+    tamanos = [archivo.stat().st_size for archivo in archivos]
+    con_bloques = [bool(tam_bloque) and tam > tam_bloque for tam in tamanos]
+
+    simples = [archivo for archivo, bloques in zip(archivos, con_bloques) if not bloques]
+    hashes_simples = iter(hashear_archivos(simples, hilos=hilos))
+
+    entradas = []
+    for archivo, tam, bloques in zip(archivos, tamanos, con_bloques):
+        entrada = {"nombre": nombre_para_manifiesto(archivo, ruta_manifiesto), "tam": tam}
+        if bloques:
+            hojas = hojas_de_bloques(archivo, tam_bloque, hilos)
+            entrada.update(
+                hash=construir_niveles(hojas)[-1][0].hex(),
+                tam_bloque=tam_bloque,
+                bloques=[hoja.hex() for hoja in hojas],
+            )
+        else:
+            entrada.update(hash=next(hashes_simples)["sha256"], tam_bloque=0)
+        entradas.append(entrada)
+
+    niveles = construir_niveles([hash_hoja(datos_entrada(entrada)) for entrada in entradas])
+    manifiesto = {
+        "version": VERSION,
+        "tamano": len(entradas),
+        "raiz": niveles[-1][0].hex(),
+        "archivos": entradas,
+    }
+    ruta_manifiesto.parent.mkdir(parents=True, exist_ok=True)
+    with ruta_manifiesto.open("w", encoding="utf-8") as salida:
+        json.dump(manifiesto, salida, indent=1, ensure_ascii=False)
+    return manifiesto
+
+
+def cargar_manifiesto(ruta_manifiesto):
+    with ruta_manifiesto.open("r", encoding="utf-8") as archivo:
+        manifiesto = json.load(archivo)
+    if manifiesto.get("version") != VERSION:
+        raise ValueError("Version de manifiesto Merkle no soportada.")
+    return manifiesto
+
+
+def firmar_raiz(manifiesto, clave_privada):
+    resumen = SHA256.new(mensaje_raiz(manifiesto["tamano"], manifiesto["raiz"]))
+    return pkcs1_15.new(clave_privada).sign(resumen)
+
+
+def verificar_firma_raiz(tamano, raiz_hex, firma, clave_publica):
+    # Lanza ValueError si la firma no corresponde
+    resumen = SHA256.new(mensaje_raiz(tamano, raiz_hex))
+    pkcs1_15.new(clave_publica).verify(resumen, firma)
+
+
+def generar_prueba(manifiesto, nombre_archivo, bloque=None):
+    # Prueba de inclusion de un archivo, o de un bloque de ese archivo
+    entradas = manifiesto["archivos"]
+    indices = {entrada["nombre"]: indice for indice, entrada in enumerate(entradas)}
+    if nombre_archivo not in indices:
+        raise ValueError(f"El archivo no esta en el manifiesto: {nombre_archivo}")
+    indice = indices[nombre_archivo]
+    entrada = entradas[indice]
+
+    niveles = construir_niveles([hash_hoja(datos_entrada(e)) for e in entradas])
+    prueba = {
+        "version": VERSION,
+        "tamano": manifiesto["tamano"],
+        "raiz": manifiesto["raiz"],
+        "indice": indice,
+        "entrada": {clave: entrada[clave] for clave in ("nombre", "tam", "tam_bloque", "hash")},
+        "ruta": [nodo.hex() for nodo in ruta_inclusion(niveles, indice)],
+    }
+
+    if bloque is not None:
+        if not entrada["tam_bloque"]:
+            raise ValueError(f"El archivo no esta dividido en bloques: {nombre_archivo}")
+        hojas = [bytes.fromhex(hoja) for hoja in entrada["bloques"]]
+        if not 0 <= bloque < len(hojas):
+            raise ValueError(f"El archivo tiene {len(hojas)} bloques.")
+        prueba["bloque"] = {
+            "indice": bloque,
+            "total": len(hojas),
+            "ruta": [nodo.hex() for nodo in ruta_inclusion(construir_niveles(hojas), bloque)],
+        }
+    return prueba
+
+
+def verificar_prueba(prueba, directorio_base):
+    # Recalcula solo el archivo (o bloque) de la prueba y sube hasta la raiz.
+    # Retorna (correcto, detalle). No verifica la firma de la raiz.
+    entrada = prueba["entrada"]
+    ruta_archivo = (directorio_base / Path(entrada["nombre"])).resolve()
+    if not ruta_archivo.is_file():
+        return False, "FALTANTE"
+
+    # 1. La entrada del archivo pertenece al arbol con esa raiz
+    raiz = raiz_desde_ruta(
+        hash_hoja(datos_entrada(entrada)),
+        prueba["indice"],
+        prueba["tamano"],
+        [bytes.fromhex(nodo) for nodo in prueba["ruta"]],
+    )
+    if raiz.hex() != prueba["raiz"]:
+        return False, "la ruta de inclusion no lleva a la raiz"
+
+    # 2. El contenido en disco corresponde a la entrada
+    bloque = prueba.get("bloque")
+    if bloque is not None:
+        tam_bloque = entrada["tam_bloque"]
+        datos = leer_bloque(ruta_archivo, bloque["indice"], tam_bloque)
+        raiz_bloques = raiz_desde_ruta(
+            hash_hoja(datos),
+            bloque["indice"],
+            bloque["total"],
+            [bytes.fromhex(nodo) for nodo in bloque["ruta"]],
+        )
+        if raiz_bloques.hex() != entrada["hash"]:
+            inicio = bloque["indice"] * tam_bloque
+            return False, f"bloque {bloque['indice']} (bytes {inicio}-{inicio + len(datos) - 1})"
+        return True, f"bloque {bloque['indice']} de {bloque['total']}"
+
+    if ruta_archivo.stat().st_size != entrada["tam"]:
+        return False, "tamano distinto"
+    if entrada["tam_bloque"]:
+        hojas = hojas_de_bloques(ruta_archivo, entrada["tam_bloque"])
+        obtenido = construir_niveles(hojas)[-1][0].hex()
+    else:
+        obtenido = calcular_sha256_archivo(ruta_archivo)
+    if obtenido != entrada["hash"]:
+        return False, "hash distinto"
+    return True, "archivo completo"
+
+
+def verificar_manifiesto(manifiesto, directorio_base, hilos=HILOS):
+    # Verifica todos los archivos del manifiesto. Lanza ValueError si las
+    # entradas no corresponden a la raiz. Retorna un resultado por archivo
+    # (mismo formato que verificar_paquete.comprobar_registros, mas "rangos"
+    # con los bytes alterados de los archivos divididos en bloques).
+    entradas = manifiesto["archivos"]
+    niveles = construir_niveles([hash_hoja(datos_entrada(entrada)) for entrada in entradas])
+    if len(entradas) != manifiesto["tamano"] or niveles[-1][0].hex() != manifiesto["raiz"]:
+        raise ValueError("Las entradas del manifiesto no corresponden a su raiz.")
+
+    rutas = [(directorio_base / Path(entrada["nombre"])).resolve() for entrada in entradas]
+    existe = [ruta.is_file() for ruta in rutas]
+
+    # Archivos simples: varios a la vez; archivos con bloques: uno a la vez
+    # con sus bloques en paralelo
+    simples = [
+        ruta for ruta, entrada, ok in zip(rutas, entradas, existe) if ok and not entrada["tam_bloque"]
+    ]
+    hashes_simples = iter(hashear_archivos(simples, hilos=hilos))
+
+    resultados = []
+    for entrada, ruta, ok in zip(entradas, rutas, existe):
+        resultado = {"archivo": entrada["nombre"], "esperado": entrada["hash"], "rangos": []}
+        if not ok:
+            resultado.update(estado="FALTANTE", obtenido=None)
+        elif not entrada["tam_bloque"]:
+            obtenido = next(hashes_simples)["sha256"]
+            resultado.update(
+                estado="OK" if obtenido == entrada["hash"] else "NO COINCIDE", obtenido=obtenido
+            )
+        else:
+            hojas = hojas_de_bloques(ruta, entrada["tam_bloque"], hilos)
+            obtenido = construir_niveles(hojas)[-1][0].hex()
+            resultado.update(
+                estado="OK" if obtenido == entrada["hash"] else "NO COINCIDE", obtenido=obtenido
+            )
+            if obtenido != entrada["hash"]:
+                resultado["rangos"] = rangos_distintos(
+                    entrada["bloques"],
+                    [hoja.hex() for hoja in hojas],
+                    entrada["tam_bloque"],
+                    max(entrada["tam"], ruta.stat().st_size),
+                )
+        resultados.append(resultado)
+    return resultados
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Manifiesto como arbol de Merkle: raiz firmada y pruebas de inclusion."
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    generar = subparsers.add_parser("generar", help="Genera MERKLE.json.")
+    generar.add_argument("archivos", nargs="+", help="Archivos o directorios del paquete.")
+    generar.add_argument("--manifiesto", required=True, help="Ruta del MERKLE.json a crear.")
+    generar.add_argument(
+        "--tam-bloque",
+        type=int,
+        default=0,
+        help=f"Divide en bloques de este tamano los archivos mas grandes (0 = no dividir; "
+        f"sugerido {TAM_BLOQUE}, 8 MiB).",
+    )
+    generar.add_argument("--hilos", type=int, default=HILOS)
+
+    firmar = subparsers.add_parser("firmar", help="Firma la raiz del manifiesto.")
+    firmar.add_argument("manifiesto")
+    firmar.add_argument("--clave-privada", default=str(BASE_DIR / "medisoft_priv.pem"))
+    firmar.add_argument("--salida", help="Por defecto MERKLE.sig junto al manifiesto.")
+
+    prueba = subparsers.add_parser("prueba", help="Genera la prueba de inclusion de un archivo.")
+    prueba.add_argument("manifiesto")
+    prueba.add_argument("archivo", help="Nombre del archivo tal como aparece en el manifiesto.")
+    prueba.add_argument("--bloque", type=int, help="Prueba solo para este bloque del archivo.")
+    prueba.add_argument("--salida", required=True, help="Ruta del JSON de la prueba.")
+    return parser
+
+
+def main():
+    parser = construir_parser()
+    args = parser.parse_args()
+
+    try:
+        if args.comando == "generar":
+            if args.tam_bloque < 0 or args.hilos < 1:
+                parser.error("--tam-bloque debe ser >= 0 y --hilos mayor a 0.")
+            ruta_manifiesto = Path(args.manifiesto).resolve()
+            archivos = resolver_archivos(args.archivos, excluir=[ruta_manifiesto])
+            archivos = [archivo for archivo in archivos if archivo.name != NOMBRE_MANIFIESTO]
+            manifiesto = generar_manifiesto_merkle(
+                archivos, ruta_manifiesto, args.tam_bloque, args.hilos
+            )
+            print(f"Archivos: {manifiesto['tamano']}")
+            print(f"Raiz: {manifiesto['raiz']}")
+            print(f"Manifiesto: {ruta_manifiesto}")
+
+        elif args.comando == "firmar":
+            ruta_manifiesto = Path(args.manifiesto).resolve()
+            ruta_salida = (
+                Path(args.salida).resolve() if args.salida else ruta_manifiesto.with_suffix(".sig")
+            )
+            manifiesto = cargar_manifiesto(ruta_manifiesto)
+            clave_privada = RSA.import_key(Path(args.clave_privada).read_bytes())
+            ruta_salida.write_bytes(firmar_raiz(manifiesto, clave_privada))
+            print(f"Raiz firmada: {manifiesto['raiz']}")
+            print(f"Firma guardada en: {ruta_salida}")
+
+        else:
+            manifiesto = cargar_manifiesto(Path(args.manifiesto).resolve())
+            prueba = generar_prueba(manifiesto, args.archivo, args.bloque)
+            Path(args.salida).write_text(json.dumps(prueba, indent=1, ensure_ascii=False), "utf-8")
+            print(f"Prueba de {len(prueba['ruta'])} hashes guardada en: {args.salida}")
+
+    except (FileNotFoundError, IsADirectoryError, ValueError, TypeError, OSError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
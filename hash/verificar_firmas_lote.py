@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Crypto.PublicKey import RSA
+
+from verificar_firma import BASE_DIR, calcular_hash_archivo, verificar_firma
+
+# Verifica muchas firmas de manifiestos en una sola ejecucion. Cada clave
+# publica se lee del disco una vez y cada proceso del pool la importa una
+# sola vez (initializer); luego solo se hashea cada manifiesto y se
+# verifica su firma. El resultado es un unico reporte JSON.
+
+_claves_trabajador = {}
+
+
+def _inicializar_trabajador(claves_pem):
+    global _claves_trabajador
+    _claves_trabajador = {}
+    for ruta, pem in claves_pem.items():
+        try:
+            _claves_trabajador[ruta] = RSA.import_key(pem)
+        except (ValueError, IndexError, TypeError):
+            pass  # cada par con esta clave se reporta como ERROR
+
+
+def verificar_par(trabajo):
+    ruta_manifiesto, ruta_firma, ruta_clave = trabajo
+    resultado = {"manifiesto": ruta_manifiesto, "firma": ruta_firma, "clave_publica": ruta_clave}
+    try:
+        resumen_hash = calcular_hash_archivo(Path(ruta_manifiesto))
+        firma = Path(ruta_firma).read_bytes()
+    except OSError as error:
+        resultado.update(estado="ERROR", motivo=str(error))
+        return resultado
+
+    resultado["sha256"] = resumen_hash.hexdigest()
+    if ruta_clave not in _claves_trabajador:
+        resultado.update(estado="ERROR", motivo=f"Clave publica no disponible o invalida: {ruta_clave}")
+        return resultado
+    try:
+        verificar_firma(resumen_hash, firma, _claves_trabajador[ruta_clave])
+    except (ValueError, TypeError) as error:
+        resultado.update(estado="INVALIDA", motivo=str(error))
+        return resultado
+    resultado["estado"] = "VALIDA"
+    return resultado
+
+
+def separar_linea(linea):
+    # Como un shell: las rutas con espacios van entre comillas y # inicia un
+    # comentario. La barra invertida no escapa, para aceptar rutas de Windows.
+    lexer = shlex.shlex(linea, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ""
+    return list(lexer)
+
+
+def leer_lista(ruta_lista, clave_por_defecto):
+    # Cada linea: <manifiesto> [<firma> [<clave_publica>]]; rutas relativas al archivo de lista
+    trabajos = []
+    base = ruta_lista.parent
+    with ruta_lista.open("r", encoding="utf-8") as lista:
+        for numero_linea, linea in enumerate(lista, start=1):
+            try:
+                partes = separar_linea(linea)
+            except ValueError as error:
+                raise ValueError(f"Linea {numero_linea}: {error}.") from error
+            if not partes:
+                continue
+            if len(partes) > 3:
+                raise ValueError(
+                    f"Linea {numero_linea}: se esperaba '<manifiesto> [<firma> [<clave_publica>]]'."
+                )
+            rutas = [(base / parte).resolve() for parte in partes]
+            trabajos.append(armar_trabajo(rutas[0], *rutas[1:], clave_por_defecto=clave_por_defecto))
+    return trabajos
+
+
+def armar_trabajo(ruta_manifiesto, ruta_firma=None, ruta_clave=None, clave_por_defecto=None):
+    return (
+        str(ruta_manifiesto),
+        str(ruta_firma or ruta_manifiesto.with_suffix(".sig")),
+        str(ruta_clave or clave_por_defecto),
+    )
+
+
+def cargar_claves(trabajos):
+    # Lee cada clave publica distinta una sola vez; las que no existen se omiten
+    claves = {}
+    for _, _, ruta_clave in trabajos:
+        if ruta_clave not in claves:
+            try:
+                claves[ruta_clave] = Path(ruta_clave).read_bytes()
+            except OSError:
+                claves[ruta_clave] = None
+    return {ruta: pem for ruta, pem in claves.items() if pem is not None}
+
+
+def verificar_lote(trabajos, procesos=None):
+    claves_pem = cargar_claves(trabajos)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(trabajos) < 2:
+        _inicializar_trabajador(claves_pem)
+        return [verificar_par(trabajo) for trabajo in trabajos]
+
+    # Trozos grandes: el costo por tarea del pool es mayor que una verificacion RSA
+    trozo = max(1, len(trabajos) // (procesos * 4))
+    with ProcessPoolExecutor(
+        max_workers=procesos, initializer=_inicializar_trabajador, initargs=(claves_pem,)
+    ) as pool:
+        return list(pool.map(verificar_par, trabajos, chunksize=trozo))
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        description="Verifica en lote las firmas digitales de muchos manifiestos y emite un reporte JSON."
+    )
+    parser.add_argument(
+        "manifiestos",
+        nargs="*",
+        help="Manifiestos a verificar; la firma se busca junto a cada uno (.sig).",
+    )
+    parser.add_argument(
+        "--lista",
+        help="Archivo con una linea '<manifiesto> [<firma> [<clave_publica>]]' por par.",
+    )
+    parser.add_argument(
+        "--clave-publica",
+        default=str(BASE_DIR / "medisoft_pub.pem"),
+        help="Clave publica usada cuando un par no indica la suya.",
+    )
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=None,
+        help="Procesos que verifican en paralelo (por defecto, uno por CPU).",
+    )
+    parser.add_argument(
+        "--salida",
+        help="Ruta del reporte JSON. Si se omite, se imprime en la salida estandar.",
+    )
+    return parser
+
+
+def main():
+    parser = construir_parser()
+    args = parser.parse_args()
+
+    if not args.manifiestos and not args.lista:
+        parser.error("Debes indicar manifiestos o --lista.")
+    if args.procesos is not None and args.procesos < 1:
+        parser.error("--procesos debe ser mayor a 0.")
+
+    clave_por_defecto = Path(args.clave_publica).resolve()
+    inicio = time.perf_counter()
+    try:
+        trabajos = [
+            armar_trabajo(Path(ruta).resolve(), clave_por_defecto=clave_por_defecto)
+            for ruta in args.manifiestos
+        ]
+        if args.lista:
+            trabajos += leer_lista(Path(args.lista).resolve(), clave_por_defecto)
+        resultados = verificar_lote(trabajos, args.procesos)
+    except (ValueError, OSError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    segundos = time.perf_counter() - inicio
+
+    estados = [resultado["estado"] for resultado in resultados]
+    reporte = {
+        "total": len(resultados),
+        "validas": estados.count("VALIDA"),
+        "invalidas": estados.count("INVALIDA"),
+        "errores": estados.count("ERROR"),
+        "claves_publicas": len({trabajo[2] for trabajo in trabajos}),
+        "segundos": round(segundos, 3),
+        "firmas_por_segundo": round(len(resultados) / segundos, 1) if segundos else None,
+        "resultados": resultados,
+    }
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+        print(
+            f"Firmas validas: {reporte['validas']}, invalidas: {reporte['invalidas']}, "
+            f"errores: {reporte['errores']} -> {args.salida}"
+        )
+    else:
+        print(texto)
+
+    return 0 if reporte["validas"] == reporte["total"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,31 @@
 import argparse
+import json
+import os
 import string
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
 from pathlib import Path
 
+BASE_DIR = Path(__file__).resolve().parent
 BUFFER_SIZE = 65536
+VERSION_CACHE = 1
+# Un archivo modificado menos de MARGEN_RACY_NS antes de hashearlo puede volver
+# a cambiar sin que cambie su mtime (resolucion del sistema de archivos), asi
+# que esa entrada del cache no se usa y el archivo se vuelve a hashear.
+MARGEN_RACY_NS = 2_000_000_000
+HILOS = min(32, (os.cpu_count() or 1) + 4)
 
 
-def calcular_sha256_archivo(ruta_archivo):
+def calcular_sha256_archivo(ruta_archivo, detener=None):
+    # detener: threading.Event opcional; si se activa a mitad del archivo retorna None
     resumen = sha256()
     with ruta_archivo.open("rb") as archivo:
         while True:
+            if detener is not None and detener.is_set():
+                return None
             bloque = archivo.read(BUFFER_SIZE)
             if not bloque:
                 break
@@ -51,33 +66,222 @@ def cargar_ultimos_registros(ruta_manifiesto):
     return list(registros.items())
 
 
-def verificar_registros(registros, directorio_base):
-    correctos = 0
-    incorrectos = 0
-    faltantes = 0
+def firma_stat(estado):
+    # Cualquier escritura cambia mtime o ctime; reemplazar el archivo cambia el inodo
+    return [estado.st_size, estado.st_mtime_ns, estado.st_ctime_ns, estado.st_ino, estado.st_dev]
 
+
+def cargar_cache(ruta_cache):
+    # Un cache ausente, corrupto o de otra version se ignora (se rehashea todo)
+    try:
+        with ruta_cache.open("r", encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(datos, dict) or datos.get("version") != VERSION_CACHE:
+        return {}
+    entradas = datos.get("archivos")
+    return entradas if isinstance(entradas, dict) else {}
+
+
+def guardar_cache(ruta_cache, entradas):
+    ruta_cache.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta_cache.with_name(ruta_cache.name + ".tmp")
+    with temporal.open("w", encoding="utf-8") as archivo:
+        json.dump({"version": VERSION_CACHE, "archivos": entradas}, archivo)
+    os.replace(temporal, ruta_cache)
+
+
+def calcular_sha256_con_cache(ruta_archivo, cache, cache_nuevo, detener=None):
+    # Retorna (hash, reutilizado). cache_nuevo recibe la entrada actualizada.
+    clave = str(ruta_archivo)
+    estado = ruta_archivo.stat()
+    firma = firma_stat(estado)
+    entrada = cache.get(clave)
+    if (
+        isinstance(entrada, dict)
+        and entrada.get("stat") == firma
+        and entrada.get("hasheado_ns", 0) - estado.st_mtime_ns > MARGEN_RACY_NS
+    ):
+        cache_nuevo[clave] = entrada
+        return entrada["sha256"], True
+
+    hasheado_ns = time.time_ns()
+    hash_obtenido = calcular_sha256_archivo(ruta_archivo, detener)
+    # Si el archivo cambio mientras se leia, no se guarda en el cache
+    if hash_obtenido is not None and firma_stat(ruta_archivo.stat()) == firma:
+        cache_nuevo[clave] = {"stat": firma, "hasheado_ns": hasheado_ns, "sha256": hash_obtenido}
+    return hash_obtenido, False
+
+
+class Progreso:
+    # Linea de progreso en stderr, actualizada como maximo cada `intervalo` segundos
+    def __init__(self, total, intervalo=0.5, salida=sys.stderr):
+        self.total = total
+        self.intervalo = intervalo
+        self.salida = salida
+        self.hechos = 0
+        self.bytes = 0
+        self.inicio = time.monotonic()
+        self._ultimo = 0.0
+        self._lock = threading.Lock()
+
+    def avanzar(self, bytes_leidos=0):
+        with self._lock:
+            self.hechos += 1
+            self.bytes += bytes_leidos
+            ahora = time.monotonic()
+            if ahora - self._ultimo < self.intervalo and self.hechos < self.total:
+                return
+            self._ultimo = ahora
+            segundos = max(ahora - self.inicio, 1e-9)
+            self.salida.write(
+                f"\r{self.hechos}/{self.total} archivos, "
+                f"{self.bytes / 1e6:.1f} MB, {self.bytes / 1e6 / segundos:.1f} MB/s"
+            )
+            self.salida.flush()
+
+    def limpiar(self):
+        # Borra la linea de progreso antes de imprimir otra cosa en la terminal
+        with self._lock:
+            self.salida.write("\r\033[K")
+            self.salida.flush()
+
+    def terminar(self):
+        self.salida.write("\n")
+        self.salida.flush()
+
+
+def verificar_archivo(nombre_archivo, hash_esperado, directorio_base, cache, cache_nuevo, detener):
+    # Retorna el resultado de un registro, o None si se cancelo con detener
+    if detener.is_set():
+        return None
+    resultado = {"archivo": nombre_archivo, "esperado": hash_esperado}
+    ruta_archivo = (directorio_base / Path(nombre_archivo)).resolve()
+
+    if not ruta_archivo.exists() or not ruta_archivo.is_file():
+        resultado.update(estado="FALTANTE", obtenido=None, bytes=0, cache=False)
+        return resultado
+
+    reutilizado = False
+    if cache is None:
+        hash_obtenido = calcular_sha256_archivo(ruta_archivo, detener)
+    else:
+        hash_obtenido, reutilizado = calcular_sha256_con_cache(
+            ruta_archivo, cache, cache_nuevo, detener
+        )
+    if hash_obtenido is None:
+        return None
+
+    resultado.update(
+        estado="OK" if hash_obtenido == hash_esperado else "NO COINCIDE",
+        obtenido=hash_obtenido,
+        bytes=0 if reutilizado else ruta_archivo.stat().st_size,
+        cache=reutilizado,
+    )
+    return resultado
+
+
+def comprobar_registros(registros, directorio_base, cache=None, hilos=1,
+                        fail_fast=False, progreso=None, al_terminar=None):
+    # Verifica los registros en un pool de hilos. Retorna la lista de
+    # resultados en el orden del manifiesto; los registros cancelados por
+    # fail_fast quedan como None. al_terminar(resultado) se llama en orden
+    # apenas cada resultado esta listo.
+    detener = threading.Event()
+    cache_nuevo = {}
+
+    def tarea(registro):
+        resultado = verificar_archivo(*registro, directorio_base, cache, cache_nuevo, detener)
+        if resultado is not None:
+            if fail_fast and resultado["estado"] != "OK":
+                detener.set()
+            if progreso:
+                progreso.avanzar(resultado["bytes"])
+        return resultado
+
+    resultados = []
+    with ThreadPoolExecutor(max_workers=max(1, hilos)) as pool:
+        futuros = [pool.submit(tarea, registro) for registro in registros]
+        for futuro in futuros:
+            resultado = None if futuro.cancelled() else futuro.result()
+            resultados.append(resultado)
+            if resultado is not None and al_terminar:
+                al_terminar(resultado)
+            if detener.is_set():
+                for pendiente in futuros:
+                    pendiente.cancel()
+
+    if progreso:
+        progreso.terminar()
+    if cache is not None:
+        actualizar_cache(cache, cache_nuevo, registros, resultados, directorio_base)
+    return resultados
+
+
+def actualizar_cache(cache, cache_nuevo, registros, resultados, directorio_base):
+    # Dentro de directorio_base se descartan las entradas de archivos que ya no
+    # estan en el manifiesto y las de los que se volvieron a comprobar (su
+    # entrada nueva esta en cache_nuevo); los registros omitidos por fail_fast
+    # conservan la anterior. Las entradas de otros arboles no se tocan, asi un
+    # mismo --cache sirve para varios paquetes.
+    directorio_base = Path(directorio_base).resolve()
+    rutas = [str((directorio_base / Path(nombre)).resolve()) for nombre, _ in registros]
+    conservar = {ruta for ruta, resultado in zip(rutas, resultados) if resultado is None}
+    for clave in list(cache):
+        if clave not in conservar and Path(clave).is_relative_to(directorio_base):
+            del cache[clave]
+    cache.update(cache_nuevo)
+
+
+def resumir(resultados):
+    resumen = {"correctos": 0, "incorrectos": 0, "faltantes": 0, "omitidos": 0, "desde_cache": 0}
+    claves = {"OK": "correctos", "NO COINCIDE": "incorrectos", "FALTANTE": "faltantes"}
+    for resultado in resultados:
+        if resultado is None:
+            resumen["omitidos"] += 1
+            continue
+        resumen[claves[resultado["estado"]]] += 1
+        resumen["desde_cache"] += resultado["cache"]
+    return resumen
+
+
+def imprimir_resultado(resultado):
+    if resultado["estado"] == "OK":
+        print(f"OK           {resultado['archivo']}")
+    elif resultado["estado"] == "FALTANTE":
+        print(f"FALTANTE     {resultado['archivo']}")
+    else:
+        print(f"NO COINCIDE  {resultado['archivo']}")
+        print(f"Esperado: {resultado['esperado']}")
+        print(f"Obtenido: {resultado['obtenido']}")
+
+
+def verificar_registros(registros, directorio_base, cache=None, hilos=1,
+                        fail_fast=False, progreso=None):
+    # cache: dict cargado con cargar_cache, o None para hashear todo. Al terminar
+    # queda con solo las entradas de los archivos verificados.
     print(f"Directorio verificado: {directorio_base}")
     print("-" * 72)
 
-    for nombre_archivo, hash_esperado in registros:
-        ruta_archivo = (directorio_base / Path(nombre_archivo)).resolve()
+    def al_terminar(resultado):
+        if progreso is None:
+            imprimir_resultado(resultado)
+        elif resultado["estado"] != "OK":
+            progreso.limpiar()
+            imprimir_resultado(resultado)
 
-        if not ruta_archivo.exists() or not ruta_archivo.is_file():
-            print(f"FALTANTE     {nombre_archivo}")
-            faltantes += 1
-            continue
+    resultados = comprobar_registros(
+        registros, directorio_base, cache, hilos, fail_fast, progreso, al_terminar
+    )
+    resumen = resumir(resultados)
 
-        hash_obtenido = calcular_sha256_archivo(ruta_archivo)
-        if hash_obtenido == hash_esperado:
-            print(f"OK           {nombre_archivo}")
-            correctos += 1
-        else:
-            print(f"NO COINCIDE  {nombre_archivo}")
-            print(f"Esperado: {hash_esperado}")
-            print(f"Obtenido: {hash_obtenido}")
-            incorrectos += 1
+    if cache is not None:
+        print(f"Hashes tomados del cache: {resumen['desde_cache']} de {len(registros)}")
+    if resumen["omitidos"]:
+        print(f"Registros no verificados por --fail-fast: {resumen['omitidos']}")
 
-    return correctos, incorrectos, faltantes
+    return resumen["correctos"], resumen["incorrectos"], resumen["faltantes"]
 
 
 def construir_parser():
@@ -91,15 +295,166 @@ def construir_parser():
     )
     parser.add_argument(
         "--directorio",
-        help="Directorio donde estan los archivos del paquete. Por defecto usa la carpeta del manifiesto.",
+        help="Directorio donde estan los archivos del paquete. Por defecto usa la carpeta del manifiesto "
+        "(o de la prueba, con --prueba).",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Archivo JSON con tamano, mtime, ctime e inodo de cada archivo ya hasheado. "
+        "Los archivos sin cambios no se vuelven a hashear.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignora el cache y rehashea todos los archivos (el cache se reescribe).",
+    )
+    parser.add_argument(
+        "--hilos",
+        type=int,
+        default=HILOS,
+        help=f"Cantidad de archivos verificados en paralelo (por defecto {HILOS}).",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Detiene la verificacion en el primer archivo incorrecto o faltante.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Imprime solo un resultado JSON con el resumen y el estado de cada archivo.",
+    )
+    parser.add_argument(
+        "--progreso",
+        action="store_true",
+        help="Muestra el avance en stderr (como maximo dos veces por segundo) "
+        "y solo imprime los archivos con problemas.",
+    )
+    parser.add_argument(
+        "--prueba",
+        help="Verifica un solo archivo o bloque con una prueba de inclusion de "
+        "manifiesto_merkle.py (no lee el manifiesto). Requiere --firma.",
+    )
+    parser.add_argument(
+        "--merkle",
+        help="Verifica todo el paquete contra un MERKLE.json de manifiesto_merkle.py. Los "
+        "archivos divididos en bloques se verifican por bloques en paralelo y una "
+        "diferencia se reporta como rango de bytes.",
+    )
+    parser.add_argument(
+        "--firma",
+        help="Firma de la raiz Merkle (MERKLE.sig). Obligatoria con --prueba, opcional con --merkle.",
+    )
+    parser.add_argument(
+        "--clave-publica",
+        default=str(BASE_DIR / "medisoft_pub.pem"),
+        help="Clave publica RSA para verificar la firma de la raiz (con --prueba).",
     )
     return parser
 
 
+def verificar_con_prueba(ruta_prueba, ruta_firma, ruta_clave_publica, directorio_base):
+    from Crypto.PublicKey import RSA
+
+    from manifiesto_merkle import verificar_firma_raiz, verificar_prueba
+
+    prueba = json.loads(ruta_prueba.read_text(encoding="utf-8"))
+    nombre_archivo = prueba["entrada"]["nombre"]
+    clave_publica = RSA.import_key(ruta_clave_publica.read_bytes())
+    try:
+        verificar_firma_raiz(prueba["tamano"], prueba["raiz"], ruta_firma.read_bytes(), clave_publica)
+    except ValueError:
+        print(f"FIRMA INVALIDA  raiz {prueba['raiz']}")
+        return 1
+
+    correcto, detalle = verificar_prueba(prueba, directorio_base)
+    estado = "OK" if correcto else "NO COINCIDE"
+    if detalle == "FALTANTE":
+        estado, detalle = "FALTANTE", "no existe en el directorio"
+    print(f"{estado:<12} {nombre_archivo} ({detalle}, {len(prueba['ruta'])} hashes de prueba)")
+    return 0 if correcto else 1
+
+
+def verificar_con_merkle(ruta_manifiesto, ruta_firma, ruta_clave_publica, directorio_base,
+                         hilos, como_json):
+    from Crypto.PublicKey import RSA
+
+    from manifiesto_merkle import cargar_manifiesto, verificar_firma_raiz, verificar_manifiesto
+
+    manifiesto = cargar_manifiesto(ruta_manifiesto)
+    if ruta_firma:
+        clave_publica = RSA.import_key(ruta_clave_publica.read_bytes())
+        try:
+            verificar_firma_raiz(
+                manifiesto["tamano"], manifiesto["raiz"], ruta_firma.read_bytes(), clave_publica
+            )
+        except ValueError:
+            print(f"FIRMA INVALIDA  raiz {manifiesto['raiz']}")
+            return 1
+
+    resultados = verificar_manifiesto(manifiesto, directorio_base, hilos)
+    resumen = resumir([dict(resultado, cache=False) for resultado in resultados])
+    valido = resumen["incorrectos"] == 0 and resumen["faltantes"] == 0
+
+    if como_json:
+        print(json.dumps(
+            {"manifiesto": str(ruta_manifiesto), "directorio": str(directorio_base),
+             "raiz": manifiesto["raiz"], "firma_verificada": bool(ruta_firma),
+             "valido": valido, **resumen, "archivos": resultados},
+            indent=2,
+            ensure_ascii=False,
+        ))
+        return 0 if valido else 1
+
+    print(f"Directorio verificado: {directorio_base}")
+    print(f"Raiz Merkle: {manifiesto['raiz']}" + (" (firma valida)" if ruta_firma else ""))
+    print("-" * 72)
+    for resultado in resultados:
+        imprimir_resultado(resultado)
+        for inicio, fin in resultado["rangos"]:
+            print(f"  Bytes alterados: {inicio}-{fin}")
+    print("-" * 72)
+    print(
+        f"Resumen -> correctos: {resumen['correctos']}, incorrectos: {resumen['incorrectos']}, "
+        f"faltantes: {resumen['faltantes']}"
+    )
+    return 0 if valido else 1
+
+
 def main():
     parser = construir_parser()
     args = parser.parse_args()
 
+    if args.prueba:
+        if not args.firma:
+            parser.error("--prueba requiere --firma.")
+        ruta_prueba = Path(args.prueba).resolve()
+        try:
+            return verificar_con_prueba(
+                ruta_prueba,
+                Path(args.firma).resolve(),
+                Path(args.clave_publica).resolve(),
+                Path(args.directorio).resolve() if args.directorio else ruta_prueba.parent,
+            )
+        except (ValueError, KeyError, TypeError, OSError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+
+    if args.merkle:
+        ruta_merkle = Path(args.merkle).resolve()
+        try:
+            return verificar_con_merkle(
+                ruta_merkle,
+                Path(args.firma).resolve() if args.firma else None,
+                Path(args.clave_publica).resolve(),
+                Path(args.directorio).resolve() if args.directorio else ruta_merkle.parent,
+                args.hilos,
+                args.json,
+            )
+        except (ValueError, KeyError, TypeError, OSError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+
     ruta_manifiesto = Path(args.manifiesto).resolve()
     if not ruta_manifiesto.exists():
         print(f"Error: no existe el manifiesto {ruta_manifiesto}", file=sys.stderr)
@@ -109,15 +464,61 @@ def main():
         Path(args.directorio).resolve() if args.directorio else ruta_manifiesto.parent
     )
 
+    ruta_cache = Path(args.cache).resolve() if args.cache else None
+    cache = None
+    if ruta_cache:
+        cache = cargar_cache(ruta_cache)
+        if args.full:
+            # Se rehashea todo este arbol; las entradas de otros arboles se conservan
+            cache = {
+                clave: entrada
+                for clave, entrada in cache.items()
+                if not Path(clave).is_relative_to(directorio_base)
+            }
+
+    if args.hilos < 1:
+        parser.error("--hilos debe ser mayor a 0.")
+
     try:
         registros = cargar_ultimos_registros(ruta_manifiesto)
-        correctos, incorrectos, faltantes = verificar_registros(
-            registros, directorio_base
-        )
-    except ValueError as error:
+        progreso = Progreso(len(registros)) if args.progreso else None
+        if args.json:
+            inicio = time.monotonic()
+            resultados = comprobar_registros(
+                registros, directorio_base, cache, args.hilos, args.fail_fast, progreso
+            )
+            resumen = resumir(resultados)
+            correctos, incorrectos, faltantes = (
+                resumen["correctos"], resumen["incorrectos"], resumen["faltantes"]
+            )
+        else:
+            correctos, incorrectos, faltantes = verificar_registros(
+                registros, directorio_base, cache, args.hilos, args.fail_fast, progreso
+            )
+        if ruta_cache:
+            guardar_cache(ruta_cache, cache)
+    except (ValueError, OSError) as error:
         print(f"Error: {error}", file=sys.stderr)
         return 1
 
+    if args.json:
+        informe = {
+            "manifiesto": str(ruta_manifiesto),
+            "directorio": str(directorio_base),
+            "valido": incorrectos == 0 and faltantes == 0 and resumen["omitidos"] == 0,
+            **resumen,
+            "segundos": round(time.monotonic() - inicio, 3),
+            "bytes_leidos": sum(r["bytes"] for r in resultados if r is not None),
+            "archivos": [
+                {clave: r[clave] for clave in ("archivo", "estado", "esperado", "obtenido")}
+                if r is not None
+                else {"archivo": nombre, "estado": "OMITIDO"}
+                for (nombre, _), r in zip(registros, resultados)
+            ],
+        }
+        print(json.dumps(informe, indent=2, ensure_ascii=False))
+        return 0 if informe["valido"] else 1
+
     print("-" * 72)
     print(
         f"Resumen -> correctos: {correctos}, incorrectos: {incorrectos}, faltantes: {faltantes}"